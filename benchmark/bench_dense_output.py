@@ -0,0 +1,55 @@
+"""Compare per-point and batched dense output of an adaptive solve on a dense `t_span`.
+
+python benchmark/bench_dense_output.py --pred_len 10000
+"""
+import argparse
+import functools
+import time
+
+import paddle
+
+from paddlexde.solver.adaptive_solver import Bosh3, Dopri5, Dopri8
+from paddlexde.solver.base_adaptive_solver import AdaptiveSolver
+from paddlexde.utils.ode_utils import _rms_norm
+from paddlexde.xde import BaseODE
+
+SOLVERS = {"bosh3": Bosh3, "dopri5": Dopri5, "dopri8": Dopri8}
+
+
+def run(solver, y0, t_span, options, per_point):
+    xde = BaseODE(lambda t, y: paddle.cos(t) * y, y0=y0, t_span=t_span)
+    s = solver(xde=xde, y0=y0, **options)
+    if per_point:
+        # the former loop, one `step` and one interpolation per output time
+        s._write_outputs = functools.partial(AdaptiveSolver._write_outputs, s)
+    start = time.perf_counter()
+    y = s.integrate(t_span)
+    y.numpy()  # wait for the device
+    return time.perf_counter() - start, y
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--solver", type=str, default="dopri5", choices=SOLVERS)
+    parser.add_argument("--batch_size", type=int, default=16)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--pred_len", type=int, default=10000)
+    args = parser.parse_args()
+
+    paddle.seed(42)
+    y0 = paddle.randn([args.batch_size, args.dim])
+    t_span = paddle.linspace(0.0, 10.0, args.pred_len)
+    options = {"rtol": 1e-5, "atol": 1e-7, "norm": _rms_norm}
+    solver = SOLVERS[args.solver]
+
+    per_point, y_ref = run(solver, y0, t_span, options, per_point=True)
+    batched, y = run(solver, y0, t_span, options, per_point=False)
+    print("solver: {}, pred_len: {}".format(args.solver, args.pred_len))
+    print("per-point: {:.3f} s/solve".format(per_point))
+    print("batched:   {:.3f} s/solve".format(batched))
+    print("speedup:   {:.2f}x".format(per_point / batched))
+    print("max diff:  {:.3e}".format((y - y_ref).abs().max().item()))
+
+
+if __name__ == "__main__":
+    main()
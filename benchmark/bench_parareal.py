@@ -0,0 +1,90 @@
+"""Parallel-in-time Parareal solves against the serial fine solve.
+
+PYTHONPATH=. python benchmark/bench_parareal.py --processes 8 --n_slices 16
+"""
+import argparse
+import time
+
+import paddle
+
+from paddlexde.functional import odeint, parareal
+from paddlexde.solver.fixed_solver import RK4, Euler
+from paddlexde.utils.ode_utils import _rms_norm
+
+
+class DampedMLP(paddle.nn.Layer):
+    def __init__(self, dim, hidden):
+        super(DampedMLP, self).__init__()
+        self.net = paddle.nn.Sequential(
+            paddle.nn.Linear(dim, hidden),
+            paddle.nn.Tanh(),
+            paddle.nn.Linear(hidden, dim),
+        )
+
+    def forward(self, t, y):
+        return self.net(y) - 0.5 * y
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--n_slices", type=int, default=None)
+    parser.add_argument("--t_end", type=float, default=20.0)
+    parser.add_argument("--pred_len", type=int, default=81)
+    parser.add_argument("--fine_step", type=float, default=0.005)
+    parser.add_argument("--coarse_step", type=float, default=0.1)
+    parser.add_argument("--batch_size", type=int, default=16)
+    parser.add_argument("--dim", type=int, default=32)
+    parser.add_argument("--hidden", type=int, default=128)
+    parser.add_argument("--rtol", type=float, default=1e-5)
+    parser.add_argument("--atol", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    paddle.seed(42)
+    f = DampedMLP(args.dim, args.hidden)
+    y0 = paddle.rand([args.batch_size, 1, args.dim])
+    t = paddle.linspace(0, args.t_end, args.pred_len)
+
+    start = time.perf_counter()
+    with paddle.no_grad():
+        sol = odeint(
+            f,
+            y0,
+            t,
+            solver=RK4,
+            options={"norm": _rms_norm, "step_size": args.fine_step, "layout": "time"},
+        )
+    serial = time.perf_counter() - start
+
+    y, stats = parareal(
+        f,
+        y0,
+        t,
+        n_slices=args.n_slices,
+        coarse_solver=Euler,
+        fine_solver=RK4,
+        rtol=args.rtol,
+        atol=args.atol,
+        coarse_options={"step_size": args.coarse_step},
+        fine_options={"step_size": args.fine_step},
+        processes=args.processes,
+        return_stats=True,
+    )
+    print("serial RK4: {:.3f} s".format(serial))
+    print(
+        "parareal: {:.3f} s, {} iterations, converged: {}, max error: {:.3e}".format(
+            stats.wall_time,
+            stats.iterations,
+            stats.converged,
+            (y - sol).abs().max().item(),
+        )
+    )
+    print(
+        "speedup: {:.2f} (serial solve: {:.2f}), ideal speedup: {:.2f}".format(
+            stats.speedup, serial / stats.wall_time, stats.ideal_speedup
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
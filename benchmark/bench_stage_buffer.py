@@ -0,0 +1,59 @@
+"""Time adaptive Runge-Kutta steps on large states, where combining the stages dominates.
+
+python benchmark/bench_stage_buffer.py --batch_size 64 --dim 16384
+"""
+import argparse
+import time
+
+import paddle
+
+from paddlexde.solver.adaptive_solver import Dopri5, Dopri8
+from paddlexde.utils.ode_utils import _rms_norm
+from paddlexde.xde import BaseODE
+
+SOLVERS = {"dopri5": Dopri5, "dopri8": Dopri8}
+
+
+def run(solver, y0, t_span, options, repeat, no_grad):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        # a cheap elementwise derivative, so the time is spent in the solver itself
+        xde = BaseODE(lambda t, y: -0.5 * y, y0=y0, t_span=t_span)
+        s = solver(xde=xde, y0=y0, **options)
+        if no_grad:
+            with paddle.no_grad():
+                y = s.integrate(t_span)
+        else:
+            y = s.integrate(t_span)
+            y.mean().backward()
+    y.numpy()  # wait for the device
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--dim", type=int, default=16384)
+    parser.add_argument("--pred_len", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paddle.seed(42)
+    y0 = paddle.randn([args.batch_size, args.dim])
+    y0.stop_gradient = False
+    t_span = paddle.linspace(0.0, 1.0, args.pred_len)
+    options = {"rtol": 1e-5, "atol": 1e-7, "norm": _rms_norm}
+
+    print("state: [{}, {}]".format(args.batch_size, args.dim))
+    for name, solver in SOLVERS.items():
+        for no_grad in [True, False]:
+            elapsed = run(solver, y0, t_span, options, args.repeat, no_grad)
+            print(
+                "{:8s} {:9s} {:.3f} ms/solve".format(
+                    name, "no_grad" if no_grad else "backward", elapsed * 1e3
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare explicit and implicit adaptive solvers on stiff problems.
+
+PYTHONPATH=. python benchmark/bench_stiff.py --problem robertson
+PYTHONPATH=. python benchmark/bench_stiff.py --problem diffusion --num_nodes 256
+"""
+import argparse
+import time
+
+import paddle
+
+from paddlexde.functional import odeint
+from paddlexde.solver.adaptive_solver import SDIRK4, TRBDF2, Dopri5
+from paddlexde.utils.ode_utils import _rms_norm
+from tests.testing_utils import construct_problem
+
+SOLVERS = {
+    "dopri5": (Dopri5, {}),
+    "trbdf2": (TRBDF2, {"linear_solver": "dense"}),
+    "sdirk4": (SDIRK4, {"linear_solver": "dense"}),
+    "sdirk4_krylov": (SDIRK4, {"linear_solver": "krylov"}),
+}
+
+
+class GraphDiffusion(paddle.nn.Layer):
+    """Diffusion with a reaction term on a ring graph, stiff through the diffusivity."""
+
+    def __init__(self, num_nodes, diffusivity):
+        super(GraphDiffusion, self).__init__()
+        eye = paddle.eye(num_nodes)
+        adjacency = paddle.roll(eye, 1, axis=0) + paddle.roll(eye, -1, axis=0)
+        self.laplacian = diffusivity * (adjacency - 2 * eye)
+
+    def forward(self, t, y):
+        return paddle.matmul(y, self.laplacian) + paddle.tanh(y)
+
+
+def build(args):
+    if args.problem == "diffusion":
+        paddle.seed(42)
+        f = GraphDiffusion(args.num_nodes, args.diffusivity)
+        y0 = paddle.randn([args.batch_size, args.num_nodes])
+        t = paddle.linspace(0.0, 1.0, 10)
+        return f, y0, t, None
+    return construct_problem(ode=args.problem)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--problem",
+        type=str,
+        default="robertson",
+        choices=["robertson", "vanderpol", "diffusion"],
+    )
+    parser.add_argument("--solvers", type=str, nargs="+", default=list(SOLVERS))
+    parser.add_argument("--batch_size", type=int, default=4)
+    parser.add_argument("--num_nodes", type=int, default=64)
+    parser.add_argument("--diffusivity", type=float, default=1000.0)
+    parser.add_argument("--rtol", type=float, default=1e-5)
+    parser.add_argument("--atol", type=float, default=1e-8)
+    args = parser.parse_args()
+
+    f, y0, t, sol = build(args)
+    print("problem: {}, state: {}".format(args.problem, y0.shape))
+    for name in args.solvers:
+        solver, options = SOLVERS[name]
+        start = time.perf_counter()
+        y, stats = odeint(
+            f,
+            y0,
+            t,
+            solver=solver,
+            rtol=args.rtol,
+            atol=args.atol,
+            options=dict(options, norm=_rms_norm),
+            return_stats=True,
+        )
+        elapsed = time.perf_counter() - start
+        error = (
+            ""
+            if sol is None
+            else ", max error: {:.3e}".format(
+                (y.transpose([1, 0, 2]) - sol).abs().max().item()
+            )
+        )
+        print(
+            "{:>14}: {:.3f} s, {} steps ({} rejected), {} nfe{}".format(
+                name, elapsed, stats.n_steps, stats.n_rejected, stats.nfe, error
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare eager and `to_static` fixed-step solves on a small-state model.
+
+python benchmark/bench_to_static.py --solver rk4 --pred_len 32 --step_size 0.05
+"""
+import argparse
+import time
+
+import paddle
+import paddle.nn as nn
+
+from paddlexde.functional import odeint
+from paddlexde.solver.fixed_solver import RK4, Euler, Midpoint
+from paddlexde.utils.ode_utils import _rms_norm
+
+SOLVERS = {"euler": Euler, "midpoint": Midpoint, "rk4": RK4}
+
+
+class ODEFunc(nn.Layer):
+    """Same model as `example/ode_demo.py`."""
+
+    def __init__(self):
+        super(ODEFunc, self).__init__()
+        self.net = nn.Sequential(
+            nn.Linear(2, 50),
+            nn.Tanh(),
+            nn.Linear(50, 2),
+        )
+
+    def forward(self, t, y):
+        return self.net(y**3)
+
+
+def run(func, y0, t_span, solver, options, repeat, backward):
+    # the first call traces and compiles the program in to_static mode
+    y = odeint(func, y0, t_span, solver=solver, options=options)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        y = odeint(func, y0, t_span, solver=solver, options=options)
+        if backward:
+            y.mean().backward()
+            func.clear_gradients()
+    y.numpy()  # wait for the device
+    return (time.perf_counter() - start) / repeat, y
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--solver", type=str, default="rk4", choices=SOLVERS)
+    parser.add_argument("--batch_size", type=int, default=16)
+    parser.add_argument("--pred_len", type=int, default=32)
+    parser.add_argument("--step_size", type=float, default=None)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backward", action="store_true")
+    args = parser.parse_args()
+
+    paddle.seed(42)
+    func = ODEFunc()
+    y0 = paddle.randn([args.batch_size, 1, 2])
+    t_span = paddle.linspace(0.0, 1.0, args.pred_len)
+    solver = SOLVERS[args.solver]
+
+    results = {}
+    for to_static in [False, True]:
+        options = {"norm": _rms_norm, "to_static": to_static}
+        if args.step_size is not None:
+            options["step_size"] = args.step_size
+        results[to_static] = run(
+            func, y0, t_span, solver, options, args.repeat, args.backward
+        )
+
+    eager, eager_y = results[False]
+    static, static_y = results[True]
+    print("solver: {}, pred_len: {}".format(args.solver, args.pred_len))
+    print("eager:     {:.3f} ms/solve".format(eager * 1e3))
+    print("to_static: {:.3f} ms/solve".format(static * 1e3))
+    print("speedup:   {:.2f}x".format(eager / static))
+    print("max diff:  {:.3e}".format((eager_y - static_y).abs().max().item()))
+
+
+if __name__ == "__main__":
+    main()
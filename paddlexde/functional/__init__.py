@@ -1,6 +1,10 @@
 from .ddeint import ddeint
 from .ddeint_adjoint import ddeint_adjoint
+from .multiple_shooting import init_shooting_states, multiple_shooting
 from .odeint import odeint
 from .odeint_adjoint import odeint_adjoint
+from .odeint_event import odeint_event
+from .odeint_reversible import odeint_reversible
+from .parareal import PararealStats, parareal
 from .sdeint import sdeint
 from .sdeint_adjoint import sdeint_adjoint
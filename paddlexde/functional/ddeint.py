@@ -2,6 +2,7 @@ from typing import Union
 
 import paddle
 
+from ..solver.solver_stats import SolverStats, record_stats
 from ..utils.ode_utils import _rms_norm
 from ..xde import BaseDDE
 
@@ -19,6 +20,7 @@ def ddeint(
     atol=1e-9,
     options: object = {"norm": _rms_norm},
     fixed_solver_interp="linear",
+    return_stats=False,
 ):
     """Integrate a system of delay differential equations.
 
@@ -27,6 +29,8 @@ def ddeint(
         dy/dt = func(t, y), y(t[0]) = y0
         ```
     where y is a Tensor or tuple of Tensors of any shape.
+
+    With `return_stats=True`, a `SolverStats` of the solve is returned as well.
     """
 
     xde = BaseDDE(
@@ -42,6 +46,10 @@ def ddeint(
     s = solver(
         xde=xde, y0=xde.y0, rtol=rtol, atol=atol, interp=fixed_solver_interp, **options
     )
-    solution = s.integrate(t_span)
+    stats = SolverStats() if return_stats else None
+    with record_stats(s, stats):
+        solution = s.integrate(t_span)
 
+    if return_stats:
+        return solution, xde.y_lags, stats
     return solution, xde.y_lags
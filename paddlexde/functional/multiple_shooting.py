@@ -0,0 +1,138 @@
+import numpy as np
+import paddle
+
+from ..solver.fixed_solver import Euler
+from ..solver.solution_buffer import SolutionBuffer
+from ..utils.ode_utils import _rms_norm
+from .odeint import odeint
+
+
+def init_shooting_states(
+    func: callable,
+    y0: paddle.Tensor,
+    t_span: paddle.Tensor,
+    n_segments: int,
+    solver=Euler,
+    *,
+    options: object = None,
+):
+    """Learnable initial states of the segments 1, ..., n_segments - 1 of
+    `multiple_shooting`, as a [n_segments - 1, *y0.shape] parameter initialized by a
+    serial solve, without gradients, e.g. with a coarse `step_size` in `options`.
+
+    The states can be initialized from observations instead, by any parameter of the same
+    shape.
+    """
+    boundaries = _segment_boundaries(len(t_span), n_segments)
+    options = dict({"norm": _rms_norm}, **(options or {}))
+    options["layout"] = "time"
+    with paddle.no_grad():
+        ys = odeint(func, y0, t_span, solver=solver, options=options)
+        states = paddle.gather(ys, paddle.to_tensor(boundaries[1:-1]))
+    return paddle.create_parameter(
+        states.shape,
+        dtype=states.dtype,
+        default_initializer=paddle.nn.initializer.Assign(states),
+    )
+
+
+def multiple_shooting(
+    func: callable,
+    y0: paddle.Tensor,
+    t_span: paddle.Tensor,
+    shooting_states: paddle.Tensor,
+    solver,
+    *,
+    rtol=1e-7,
+    atol=1e-9,
+    options: object = {"norm": _rms_norm},
+    layout: str = "time",
+):
+    """Integrate an ODE by multiple shooting, for training through long trajectories.
+
+    `t_span` is split into `n_segments = len(shooting_states) + 1` segments with the same
+    number of points, segment 0 starting from `y0` and segment n from `shooting_states[n - 1]`.
+    All the segments are solved at once, stacked along the batch axis, so the length of the
+    sequential solve is that of a segment. Every segment is integrated on a common local
+    grid, mapped piecewise linearly to its own points of `t_span`, so `step_size` and the
+    tolerances keep the units of `t_span` when it is uniform. `func` is then called with a
+    [n_segments * B, 1, ..., 1] Tensor `t`, the time of every stacked state.
+
+    The trajectory is continuous once the defects, the gaps between the end of a segment and
+    the start of the next one, vanish, thus a continuity penalty such as
+    `(defects**2).mean()` is added to the training loss, see `init_shooting_states` for the
+    learnable states.
+
+    :param shooting_states: [n_segments - 1, *y0.shape] Tensor of the initial states of the
+                segments after the first one.
+    :param layout: layout of the returned states, see `SolutionBuffer`.
+    :return: the states at `t_span`, those at the start of the segments being the shooting
+                states, and the [n_segments - 1, *y0.shape] Tensor of the defects.
+    """
+    n_segments = shooting_states.shape[0] + 1
+    if list(shooting_states.shape[1:]) != list(y0.shape):
+        raise ValueError(
+            "shooting_states must have the shape [n_segments - 1, *y0.shape], "
+            "but got {} for y0 of shape {}.".format(shooting_states.shape, y0.shape)
+        )
+    n_points = len(t_span)
+    boundaries = _segment_boundaries(n_points, n_segments)
+    k = boundaries[1]
+
+    # [n_segments, k + 1] points of the segments, and the common local grid, the mean of
+    # their offsets from the start of the segments
+    t_np = t_span.numpy().astype(np.float64)
+    segment_t = np.stack([t_np[b : b + k + 1] for b in boundaries[:-1]])
+    local_t = (segment_t - segment_t[:, :1]).mean(axis=0)
+    direction = 1.0 if local_t[-1] >= local_t[0] else -1.0
+    # dt / ds of every segment on every interval of the local grid
+    rates = np.diff(segment_t, axis=1) / np.diff(local_t)[None, :]
+
+    batch_size = y0.shape[0]
+    dtype = t_span.dtype
+    segment_t = paddle.to_tensor(segment_t, dtype=dtype)
+    rates = paddle.to_tensor(rates, dtype=dtype)
+    shape = [n_segments * batch_size] + [1] * (len(y0.shape) - 1)
+
+    def _segment_func(s, y):
+        s_value = float(s.reshape([-1])[0])
+        i = np.searchsorted(direction * local_t, direction * s_value, side="right") - 1
+        i = int(min(max(i, 0), k - 1))
+        rate = rates[:, i]
+        t = segment_t[:, i] + (s.astype(dtype) - float(local_t[i])) * rate
+        t = paddle.repeat_interleave(t, batch_size).reshape(shape)
+        rate = paddle.repeat_interleave(rate, batch_size).reshape(shape)
+        return func(t, y) * rate.astype(y.dtype)
+
+    # [n_segments * B, ...], segment-major
+    starts = paddle.concat([y0.unsqueeze(0), shooting_states.astype(y0.dtype)])
+    starts = starts.reshape([n_segments * batch_size, *y0.shape[1:]])
+    options = dict(options, layout="time")
+    ys = odeint(
+        _segment_func,
+        starts,
+        paddle.to_tensor(local_t, dtype=dtype),
+        solver=solver,
+        rtol=rtol,
+        atol=atol,
+        options=options,
+    )
+    # [k + 1, n_segments, *y0.shape]
+    ys = ys.reshape([k + 1, n_segments, *y0.shape])
+    defects = ys[-1, :-1] - ys[0, 1:]
+
+    solution = SolutionBuffer(y0, n_points, layout=layout)
+    for n in range(n_segments):
+        solution.write_many(list(range(boundaries[n], boundaries[n + 1])), ys[:-1, n])
+    solution.write(n_points - 1, ys[-1, -1])
+    return solution.finalize(), defects
+
+
+def _segment_boundaries(n_points, n_segments):
+    """Indices of the first points of the segments and of the last point of `t_span`."""
+    if n_segments < 1 or (n_points - 1) % n_segments != 0:
+        raise ValueError(
+            "len(t_span) - 1 ({}) must be a multiple of the number of segments, "
+            "but got {} segments.".format(n_points - 1, n_segments)
+        )
+    return list(range(0, n_points, (n_points - 1) // n_segments))
@@ -2,6 +2,7 @@ from typing import Union
 
 import paddle
 
+from ..solver.solver_stats import SolverStats, record_stats
 from ..utils.ode_utils import _rms_norm
 from ..xde import BaseODE
 
@@ -14,7 +15,8 @@ def odeint(
     *,
     rtol=1e-7,
     atol=1e-9,
-    options: object = {"norm": _rms_norm}
+    options: object = {"norm": _rms_norm},
+    return_stats=False
 ):
     """Integrate a system of ordinary differential equations.
 
@@ -23,13 +25,19 @@ def odeint(
         dy/dt = func(t, y), y(t[0]) = y0
         ```
     where y is a Tensor or tuple of Tensors of any shape.
+
+    With `return_stats=True`, a `SolverStats` of the solve is returned as well.
     """
 
     xde = BaseODE(func, y0=y0, t_span=t_span)
 
     s = solver(xde=xde, y0=xde.y0, rtol=rtol, atol=atol, **options)
-    solution = s.integrate(t_span)
+    stats = SolverStats() if return_stats else None
+    with record_stats(s, stats):
+        solution = s.integrate(t_span)
 
     solution = xde.format(solution)
 
+    if return_stats:
+        return solution, stats
     return solution
@@ -1,11 +1,14 @@
+import functools
 import warnings
 
+import numpy as np
 import paddle
 import paddle.nn as nn
 
 from ..utils.misc import flat_to_shape
 from ..utils.ode_utils import _mixed_norm, _rms_norm
 from .odeint import odeint
+from .odeint_event import odeint_event
 
 
 class OdeintAdjointMethod(paddle.autograd.PyLayer):
@@ -123,6 +126,25 @@ class OdeintAdjointMethod(paddle.autograd.PyLayer):
 
                 return (grad_t, func_eval, grad_y, *grad_params)
 
+            # The solvers take one Tensor integrated forward in time, so the augmented
+            # state is flattened, and integrated in the negated time s = -t.
+            shapes = [a.shape for a in aug_state]
+            numels = [int(np.prod(shape)) for shape in shapes]
+
+            def _flatten(tensors):
+                return paddle.concat([a.reshape([-1]) for a in tensors])
+
+            def _unflatten(y_flat):
+                return flat_to_shape(y_flat, (), shapes, numels)
+
+            def reversed_dynamics(s, y_flat):
+                return -_flatten(augmented_dynamics(-s, _unflatten(y_flat)))
+
+            adjoint_norm = adjoint_options["norm"]
+            reversed_options = dict(
+                adjoint_options, norm=lambda y_flat: adjoint_norm(_unflatten(y_flat))
+            )
+
             ##################################
             #       Solve adjoint ODE        #
             ##################################
@@ -142,15 +164,16 @@ class OdeintAdjointMethod(paddle.autograd.PyLayer):
 
                 # Run the augmented system backwards in time.
                 aug_state = odeint(
-                    func=augmented_dynamics,
-                    y0=tuple(aug_state),
-                    t_span=t_span[i - 1 : i + 1].flip(0),
+                    func=reversed_dynamics,
+                    y0=_flatten(aug_state),
+                    t_span=-t_span[i - 1 : i + 1].flip(0),
                     solver=adjoint_method,
                     rtol=adjoint_rtol,
                     atol=adjoint_atol,
-                    options=adjoint_options,
+                    options=reversed_options,
                 )
-                aug_state = [a[1] for a in aug_state]  # extract just the t[i - 1] value
+                # extract just the t[i - 1] value
+                aug_state = list(_unflatten(aug_state[1]))
                 aug_state[1] = y_ans[
                     i - 1
                 ]  # update to use our forward-pass estimate of the state
@@ -161,10 +184,10 @@ class OdeintAdjointMethod(paddle.autograd.PyLayer):
             if t_requires_grad:
                 grad_t_span[0] = aug_state[0]
 
-            # adj_y = aug_state[2]
+            adj_y = aug_state[2]
             adj_params = aug_state[3:]
 
-        return (None, grad_t_span, *adj_params)
+        return (adj_y, grad_t_span, *adj_params)
 
 
 def odeint_adjoint(
@@ -192,6 +215,27 @@ def odeint_adjoint(
             "then it is allowable to set `adjoint_params=()`."
         )
 
+    if event_fn is not None:
+        # Search the events, then compute the states at the events with the adjoint method.
+        return odeint_event(
+            func,
+            y0,
+            t_span,
+            event_fn,
+            solver,
+            rtol=rtol,
+            atol=atol,
+            options=options,
+            odeint_interface=functools.partial(
+                odeint_adjoint,
+                adjoint_rtol=adjoint_rtol,
+                adjoint_atol=adjoint_atol,
+                adjoint_solver=adjoint_solver,
+                adjoint_options=adjoint_options,
+                adjoint_params=adjoint_params,
+            ),
+        )
+
     # Must come before _check_inputs as we don't want to use normalised input (in particular any changes to options)
     if adjoint_rtol is None:
         adjoint_rtol = rtol
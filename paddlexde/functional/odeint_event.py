@@ -0,0 +1,132 @@
+import paddle
+from paddle import nn
+
+from ..utils.ode_utils import _rms_norm
+from ..xde import BaseODE
+from .odeint import odeint
+
+
+def _per_sample(t, y):
+    return t.reshape([-1] + [1] * (len(y.shape) - 1))
+
+
+class _RescaledFunc(nn.Layer):
+    def __init__(self, func, t0, duration):
+        """`func` in the time `s = (t - t0) / duration`, so that the samples, which stop at
+        different times, are integrated together from s = 0 to s = 1.
+
+        :param duration: [b, 1, ..., 1] Tensor, time from `t0` to the end of each sample.
+        """
+        super(_RescaledFunc, self).__init__()
+        self.func = func
+        self.t0 = t0
+        self.duration = duration
+
+    def forward(self, s, y):
+        dy = self.func(self.t0 + s * self.duration, y)
+        return self.duration.astype(dy.dtype) * dy
+
+
+class _EventGradient(paddle.autograd.PyLayer):
+    @staticmethod
+    def forward(ctx, func, event_fn, event_t, y_event):
+        """Identity on `(event_t, y_event)`, whose backward adds the dependence of the event
+        time on the state, from the implicit function theorem on
+        `event_fn(event_t, y(event_t)) = 0`:
+            d event_t = -(d event_fn / dy) . dy / (d event_fn / dt)
+        where `d event_fn / dt` is the total derivative along the solution. `y_event` is
+        computed for the fixed `event_t`, and the gradients wrt `event_t` are rerouted
+        to it.
+        """
+        ctx.func = func
+        ctx.event_fn = event_fn
+        ctx.save_for_backward(event_t, y_event)
+        return event_t.clone(), y_event.clone()
+
+    @staticmethod
+    def backward(ctx, grad_t, grad_y):
+        event_t, y_event = ctx.saved_tensor()
+        batch_size = y_event.shape[0]
+        with paddle.set_grad_enabled(True):
+            t = _per_sample(event_t, y_event).detach()
+            t.stop_gradient = False
+            y = y_event.detach()
+            y.stop_gradient = False
+            dy = ctx.func(t, y)
+            event = ctx.event_fn(t, y).reshape([-1])
+            event_dt, event_dy = paddle.autograd.grad(
+                event.sum(), [t, y], allow_unused=True
+            )
+        with paddle.no_grad():
+            event_dt = (
+                paddle.zeros([batch_size], dtype=dy.dtype)
+                if event_dt is None
+                else event_dt.reshape([-1]).astype(dy.dtype)
+            )
+            event_dy = paddle.zeros_like(y) if event_dy is None else event_dy
+
+            def _dot(a, b):
+                return (a * b).reshape([batch_size, -1]).sum(axis=1)
+
+            # total derivatives along the solution, of the event function and of the loss
+            event_total_dt = event_dt + _dot(event_dy, dy)
+            loss_dt = grad_t.astype(dy.dtype) + _dot(grad_y, dy)
+            grad_y = grad_y - _per_sample(loss_dt / event_total_dt, y) * event_dy
+        return None, grad_y
+
+
+def odeint_event(
+    func: callable,
+    y0: paddle.Tensor,
+    t_span,
+    event_fn: callable,
+    solver,
+    *,
+    rtol=1e-7,
+    atol=1e-9,
+    options: object = {"norm": _rms_norm},
+    odeint_interface=odeint,
+):
+    """Integrate every sample of a batch of ODEs until its event, `event_fn` crossing zero.
+
+    The events are searched with the per-sample mode of an adaptive Runge-Kutta `solver`,
+    see `AdaptiveRKSolver.integrate_until_event`: `func(t, y)` and `event_fn(t, y)` are
+    called with `t` as a [b, 1, ..., 1] Tensor, and `event_fn` returns one value per
+    sample. A sample stops at its event, or at `t_span[-1]` without event.
+
+    With gradients enabled, the states at the events are computed again from `y0` with
+    `odeint_interface` (`odeint`, or `odeint_adjoint` for adjoint gradients), all the
+    samples together in a time rescaled to end at the events. The gradients then flow
+    through the event times by the implicit function theorem, see `_EventGradient`.
+
+    :param y0: [b, ...] Tensor of the initial states.
+    :param t_span: start and maximum end time of the integration.
+    :return: (event_t, y_event), [b] times of the events and [b, ...] states at these times.
+    """
+    t_span = paddle.to_tensor(t_span) if not paddle.is_tensor(t_span) else t_span
+    with paddle.no_grad():
+        xde = BaseODE(func, y0=y0, t_span=t_span)
+        s = solver(
+            xde=xde,
+            y0=xde.y0,
+            rtol=rtol,
+            atol=atol,
+            **dict(options, per_sample=True),
+        )
+        event_t, y_event = s.integrate_until_event(t_span, event_fn)
+    if not paddle.is_grad_enabled():
+        return event_t, y_event
+
+    t0 = t_span[0].astype(event_t.dtype)
+    rescaled = _RescaledFunc(func, t0, _per_sample(event_t - t0, y0))
+    options = {k: v for k, v in options.items() if k != "per_sample"}
+    solution = odeint_interface(
+        rescaled,
+        y0,
+        paddle.to_tensor([0.0, 1.0], dtype=t_span.dtype),
+        solver=solver,
+        rtol=rtol,
+        atol=atol,
+        options=options,
+    )
+    return _EventGradient.apply(func, event_fn, event_t, solution[-1])
@@ -0,0 +1,131 @@
+import paddle
+import paddle.nn as nn
+
+from ..solver.base_fixed_solver import _SegmentBuffer
+from ..solver.fixed_solver import ReversibleHeun
+from ..solver.solution_buffer import SolutionBuffer
+from ..utils.ode_utils import _rms_norm
+from ..xde import BaseODE
+from .odeint_adjoint import find_parameters
+
+
+class OdeintReversibleMethod(paddle.autograd.PyLayer):
+    @staticmethod
+    def forward(ctx, solver, t_span, y0, *adjoint_params):
+        """Integrate without keeping the graph, only the final state is saved."""
+        time_grid = solver.grid_constructor(y0, t_span)
+        schedule = solver._make_schedule(time_grid.tolist(), t_span.tolist())
+        solver.n_steps = len(schedule)
+        solver.move = solver.hooks.wrap_move(solver.xde.move)
+
+        with paddle.no_grad():
+            sol = SolutionBuffer(
+                y0, len(t_span), layout=solver.layout, save_at=solver.save_at
+            )
+            sol.write(0, y0)
+            y1 = solver._run_steps(
+                y0, time_grid, t_span, schedule, 0, len(schedule), sol
+            )
+
+        ctx.solver = solver
+        ctx.sol = sol
+        ctx.schedule = schedule
+        ctx.stop_gradient = y0.stop_gradient
+        ctx.save_for_backward(time_grid, t_span, y1, *solver._get_history())
+        ctx.adjoint_params = adjoint_params
+        return sol.finalize()
+
+    @staticmethod
+    def backward(ctx, grad_y):
+        """Recompute the states backward from the final one, step by step, and
+        backpropagate through every step from the recomputed state."""
+        solver, sol, schedule = ctx.solver, ctx.sol, ctx.schedule
+        params = ctx.adjoint_params
+        time_grid, t_span, y1, *history = ctx.saved_tensor()
+
+        adj_state = [paddle.zeros_like(y1) for _ in range(1 + len(history))]
+        adj_params = [paddle.zeros_like(p) for p in params]
+        for i in range(len(schedule), 0, -1):
+            t0, t1 = time_grid[i - 1 : i], time_grid[i : i + 1]
+            with paddle.no_grad():
+                solver._set_history(history)
+                y0 = solver.reverse_step(t0, t1, y1)
+                history = solver._get_history()
+
+            # the first step starts the auxiliary state from y0 itself
+            inputs = [y0] + (list(history) if i > 1 else [])
+            inputs = [x.detach() for x in inputs]
+            for x in inputs:
+                x.stop_gradient = False
+            with paddle.set_grad_enabled(True):
+                solver._set_history(inputs[1:])
+                seg = _SegmentBuffer()
+                y1_, _ = solver._take_step(
+                    i, inputs[0], None, time_grid, t_span, schedule, seg
+                )
+                outputs = [y1_, *solver._get_history()]
+                grads = list(adj_state)
+                if len(seg.ys) > 0:
+                    # the outputs of the step, written in the order of the schedule
+                    ys = paddle.concat(seg.ys)
+                    for j, k in enumerate(schedule[i - 1][0]):
+                        outputs.append(ys[j])
+                        grads.append(sol.read(k, grad_y))
+                wrt_grads = paddle.grad(
+                    outputs, inputs + list(params), grads, allow_unused=True
+                )
+
+            adj_state = [
+                paddle.zeros_like(x) if g is None else g
+                for x, g in zip(inputs, wrt_grads)
+            ]
+            adj_params = [
+                a if g is None else a + g
+                for a, g in zip(adj_params, wrt_grads[len(inputs) :])
+            ]
+            y1 = y0
+
+        adj_y0 = adj_state[0] + sol.read(0, grad_y)
+        # no gradient wrt t_span
+        return (None, None if ctx.stop_gradient else adj_y0, *adj_params)
+
+
+def odeint_reversible(
+    func: callable,
+    y0: paddle.Tensor,
+    t_span,
+    *,
+    rtol=1e-7,
+    atol=1e-9,
+    solver=ReversibleHeun,
+    options: object = {"norm": _rms_norm},
+    adjoint_params=None,
+):
+    """Integrate an ODE with an algebraically reversible solver, whose gradients are
+    computed in memory independent of the number of steps.
+
+    The forward pass keeps no graph and only the final state. The backward pass
+    reconstructs the states from the final one with `solver.reverse_step`, and
+    backpropagates through every step from its reconstructed start, so the gradients are
+    those of direct backpropagation through the solver, up to roundoff.
+
+    :param solver: `FixedSolver` with `reverse_step`, e.g. `ReversibleHeun`.
+    :param adjoint_params: parameters to compute the gradients of, those of `func` by
+                default, which must then be an `nn.Layer`.
+    """
+    if not hasattr(solver, "reverse_step"):
+        raise ValueError("{} is not a reversible solver.".format(solver.__name__))
+    if adjoint_params is None and not isinstance(func, nn.Layer):
+        raise ValueError(
+            "func must be an instance of nn.Layer to specify the adjoint parameters; "
+            "alternatively they can be specified explicitly via the `adjoint_params` "
+            "argument."
+        )
+    if adjoint_params is None:
+        adjoint_params = find_parameters(func)
+    adjoint_params = tuple(p for p in adjoint_params if not p.stop_gradient)
+
+    xde = BaseODE(func, y0=y0, t_span=t_span)
+    s = solver(xde=xde, y0=xde.y0, rtol=rtol, atol=atol, **options)
+    solution = OdeintReversibleMethod.apply(s, t_span, xde.y0, *adjoint_params)
+    return xde.format(solution)
@@ -0,0 +1,207 @@
+import multiprocessing
+import time
+
+import numpy as np
+import paddle
+
+from ..solver.fixed_solver import RK4, Euler
+from ..solver.solution_buffer import SolutionBuffer
+from ..utils.ode_utils import _rms_norm, compute_error_ratio
+from .odeint import odeint
+
+# the fine problem of the worker processes, inherited from the parent at fork
+_WORKER_PROBLEM = None
+
+
+class PararealStats:
+    def __init__(self):
+        """Statistics of a `parareal` solve.
+
+        Attributes:
+            iterations: number of Parareal iterations, i.e. of parallel fine sweeps.
+            converged: whether the slice boundaries changed by less than the tolerance.
+            errors: change of the slice boundaries at every iteration, relative to `atol`
+                and `rtol` as the error ratios of the adaptive solvers.
+            wall_time: host wall time of the solve, in seconds.
+            serial_time: time of one fine sweep over all the slices, run one after the
+                other, the cost of the serial solve with the fine solver.
+            speedup: `serial_time / wall_time`.
+            ideal_speedup: the speedup with as many workers as slices, from the measured
+                times of the coarse sweeps and of the slowest slice of every fine sweep.
+        """
+        self.iterations = 0
+        self.converged = False
+        self.errors = []
+        self.wall_time = 0.0
+        self.serial_time = 0.0
+        self.speedup = 0.0
+        self.ideal_speedup = 0.0
+
+    def __repr__(self):
+        return (
+            "PararealStats(iterations={}, converged={}, wall_time={:.6f}, "
+            "serial_time={:.6f}, speedup={:.3f}, ideal_speedup={:.3f})".format(
+                self.iterations,
+                self.converged,
+                self.wall_time,
+                self.serial_time,
+                self.speedup,
+                self.ideal_speedup,
+            )
+        )
+
+
+def parareal(
+    func: callable,
+    y0: paddle.Tensor,
+    t_span: paddle.Tensor,
+    *,
+    n_slices: int = None,
+    coarse_solver=Euler,
+    fine_solver=RK4,
+    rtol=1e-7,
+    atol=1e-9,
+    coarse_options: object = None,
+    fine_options: object = None,
+    processes: int = None,
+    max_iters: int = None,
+    layout: str = "time",
+    return_stats=False,
+):
+    """Integrate an ODE in parallel in time by Parareal (Lions, Maday and Turinici, 2001).
+
+    `t_span` is split into `n_slices` time slices at some of its points. A coarse sweep
+    with `coarse_solver` over the whole span gives the first states at the slice
+    boundaries, then every iteration solves all the slices independently from these
+    states with `fine_solver`, in parallel, and corrects the boundaries serially:
+        ```
+        U[n + 1] = G(U_new[n]) + F(U_old[n]) - G(U_old[n])
+        ```
+    G and F being the coarse and fine solves of slice n. The iterations stop when the
+    boundaries change by less than the tolerance, at most `n_slices` of them, after which
+    the result is the serial fine solve. The states at `t_span` come from the last fine
+    sweep. Without gradients.
+
+    :param n_slices: number of time slices, `processes` or `len(t_span) - 1` by default.
+    :param coarse_options: options of the coarse solves, e.g. `step_size`.
+    :param fine_options: options of the fine solves.
+    :param processes: run the fine solves in a pool of `processes` worker processes, forked
+                from the current one, serially in this process by default.
+    :param max_iters: maximum number of iterations, `n_slices` by default.
+    :param layout: layout of the returned states, see `SolutionBuffer`.
+    :param return_stats: also return a `PararealStats` of the solve.
+    """
+    global _WORKER_PROBLEM
+    start = time.perf_counter()
+    coarse_options = dict({"norm": _rms_norm}, **(coarse_options or {}))
+    fine_options = dict({"norm": _rms_norm}, **(fine_options or {}))
+    coarse_options["layout"] = fine_options["layout"] = "time"
+
+    # slice n covers the points boundaries[n], ..., boundaries[n + 1] of t_span
+    n_points = len(t_span)
+    if n_slices is None:
+        n_slices = processes or n_points - 1
+    n_slices = max(min(n_slices, n_points - 1), 1)
+    boundaries = np.unique(
+        np.linspace(0, n_points - 1, n_slices + 1).round().astype(int)
+    )
+    n_slices = len(boundaries) - 1
+    slices = [t_span[boundaries[n] : boundaries[n + 1] + 1] for n in range(n_slices)]
+    max_iters = n_slices if max_iters is None else max_iters
+    norm = fine_options["norm"]
+
+    def _coarse(n, y):
+        ys = odeint(func, y, slices[n], solver=coarse_solver, options=coarse_options)
+        return ys[-1]
+
+    stats = PararealStats()
+    coarse_time = 0.0
+    pool = None
+    _WORKER_PROBLEM = (func, fine_solver, rtol, atol, fine_options)
+    if processes is not None:
+        pool = multiprocessing.get_context("fork").Pool(processes)
+    try:
+        with paddle.no_grad():
+            tic = time.perf_counter()
+            u = [y0]
+            g = []
+            for n in range(n_slices):
+                g.append(_coarse(n, u[n]))
+                u.append(g[n])
+            coarse_time += time.perf_counter() - tic
+
+            ideal_time = coarse_time
+            while True:
+                tasks = [(slices[n].numpy(), u[n].numpy()) for n in range(n_slices)]
+                if pool is None:
+                    fine = [_solve_slice(*task) for task in tasks]
+                else:
+                    fine = pool.starmap(_solve_slice, tasks)
+                fine_ys = [paddle.to_tensor(ys) for ys, _ in fine]
+                slice_times = [elapsed for _, elapsed in fine]
+                stats.iterations += 1
+                stats.serial_time = sum(slice_times)
+                ideal_time += max(slice_times)
+
+                # serial correction of the boundaries, the first slice is exact
+                tic = time.perf_counter()
+                u_new = [y0, fine_ys[0][-1]]
+                error = 0.0
+                for n in range(1, n_slices):
+                    g_new = _coarse(n, u_new[n])
+                    u_new.append(g_new + fine_ys[n][-1] - g[n])
+                    g[n] = g_new
+                for n in range(1, n_slices + 1):
+                    ratio = compute_error_ratio(
+                        u_new[n] - u[n], rtol, atol, u[n], u_new[n], norm
+                    )
+                    error = max(error, float(ratio))
+                u = u_new
+                coarse_time += time.perf_counter() - tic
+                ideal_time += time.perf_counter() - tic
+                stats.errors.append(error)
+                if error <= 1:
+                    stats.converged = True
+                    break
+                if stats.iterations >= max_iters:
+                    # the fine sweep of the last iteration started from exact boundaries
+                    stats.converged = stats.iterations >= n_slices
+                    break
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _WORKER_PROBLEM = None
+
+    solution = SolutionBuffer(y0, n_points, layout=layout)
+    solution.write(0, y0)
+    for n in range(n_slices):
+        solution.write_many(
+            list(range(boundaries[n] + 1, boundaries[n + 1] + 1)),
+            fine_ys[n][1:].astype(y0.dtype),
+        )
+
+    stats.wall_time = time.perf_counter() - start
+    stats.speedup = stats.serial_time / stats.wall_time
+    stats.ideal_speedup = stats.serial_time / ideal_time
+    if return_stats:
+        return solution.finalize(), stats
+    return solution.finalize()
+
+
+def _solve_slice(t_slice, y0):
+    """Fine solve of a slice from the state `y0`, returns the states at `t_slice` and
+    the time taken."""
+    func, solver, rtol, atol, options = _WORKER_PROBLEM
+    tic = time.perf_counter()
+    with paddle.no_grad():
+        ys = odeint(
+            func,
+            paddle.to_tensor(y0),
+            paddle.to_tensor(t_slice),
+            solver=solver,
+            rtol=rtol,
+            atol=atol,
+            options=options,
+        )
+    return ys.numpy(), time.perf_counter() - tic
@@ -2,6 +2,7 @@ from typing import Union
 
 import paddle
 
+from ..solver.solver_stats import SolverStats, record_stats
 from ..utils.ode_utils import _rms_norm
 from ..xde import BaseSDE
 
@@ -16,7 +17,8 @@ def sdeint(
     rtol=1e-7,
     atol=1e-9,
     reverse=False,
-    options: object = {"norm": _rms_norm}
+    options: object = {"norm": _rms_norm},
+    return_stats=False
 ):
     """Integrate a system of ordinary differential equations.
 
@@ -25,13 +27,19 @@ def sdeint(
         dy/dt = func(t, y), y(t[0]) = y0
         ```
     where y is a Tensor or tuple of Tensors of any shape.
+
+    With `return_stats=True`, a `SolverStats` of the solve is returned as well.
     """
 
     xde = BaseSDE(f=drift, g=diffusion, y0=y0, t_span=t, reverse=reverse)
 
     s = solver(xde=xde, y0=xde.y0, rtol=rtol, atol=atol, **options)
-    solution = s.integrate(t)
+    stats = SolverStats() if return_stats else None
+    with record_stats(s, stats):
+        solution = s.integrate(t)
 
     solution = xde.format(solution)
 
+    if return_stats:
+        return solution, stats
     return solution
@@ -241,6 +241,10 @@ def sdeint_adjoint(
             "can be specified explicitly via the `adjoint_params` argument. If there are no parameters "
             "then it is allowable to set `adjoint_params=()`."
         )
+    if event_fn is not None:
+        raise NotImplementedError(
+            "event_fn is only supported for ODEs, see `odeint_event`."
+        )
 
     # Must come before _check_inputs as we don't want to use normalised input (in particular any changes to options)
     if adjoint_rtol is None:
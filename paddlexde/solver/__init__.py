@@ -1,6 +1,40 @@
-from .adaptive_solver import AdaptiveHeun, Bosh3, Dopri5, Dopri8, Fehlberg2
+from .adaptive_solver import (
+    SDIRK4,
+    TRBDF2,
+    AdaptiveAdamsBashforthMoulton,
+    AdaptiveHeun,
+    AutoSwitch,
+    Bosh3,
+    Dopri5,
+    Dopri8,
+    Fehlberg2,
+)
 from .base_adaptive_solver import AdaptiveSolver
 from .base_adaptive_solver_rk import AdaptiveRKSolver
+from .base_adaptive_solver_sdirk import AdaptiveSDIRKSolver
 from .base_fixed_solver import FixedSolver
+from .base_fixed_solver_etd import ExponentialSolver
+from .base_fixed_solver_rk import FixedRKSolver
 from .base_scipy_solver import ScipyWrapperODESolver
-from .fixed_solver import RK4, AdamsBashforthMoulton, Euler, Midpoint
+from .fixed_solver import (
+    ETD1,
+    ETDRK4,
+    RK4,
+    RK38,
+    SSPRK3,
+    AdamsBashforthMoulton,
+    Euler,
+    Midpoint,
+    Ralston,
+    ReversibleHeun,
+)
+from .history_buffer import HistoryBuffer
+from .newton_krylov import (
+    DenseLinearSolver,
+    KrylovLinearSolver,
+    Linearization,
+    LinearSolver,
+)
+from .solution_buffer import SolutionBuffer
+from .solver_stats import SolverHooks, SolverStats, record_stats
+from .step_controller import IController, PIController, PIDController, StepController
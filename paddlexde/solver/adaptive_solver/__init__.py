@@ -1,5 +1,9 @@
+from .adaptive_adams import AdaptiveAdamsBashforthMoulton
 from .adaptive_heun import AdaptiveHeun
+from .auto_switch import AutoSwitch
 from .bosh3 import Bosh3
 from .dopri5 import Dopri5
 from .dopri8 import Dopri8
 from .fehlberg2 import Fehlberg2
+from .sdirk4 import SDIRK4
+from .trbdf2 import TRBDF2
@@ -0,0 +1,296 @@
+import functools
+
+import paddle
+
+from ...utils.ode_utils import compute_error_ratio
+from ..base_adaptive_solver import AdaptiveSolver
+from ..fixed_solver.adams import _BASHFORTH_DIVISOR, _MAX_ORDER, _MOULTON_DIVISOR
+from ..history_buffer import HistoryBuffer
+
+
+def _adams_gamma(n):
+    """Error constants gamma_0, ..., gamma_n of the Adams-Bashforth methods, the one of
+    order k being gamma_k, and gamma_k - gamma_{k-1} for the Adams-Moulton methods."""
+    gamma = [1.0]
+    for m in range(1, n + 1):
+        gamma.append(1.0 - sum(gamma[j] / (m + 1 - j) for j in range(m)))
+    return gamma
+
+
+_GAMMA = _adams_gamma(_MAX_ORDER + 1)
+# |gamma*_k|, error constant of the Adams-Moulton method of order k
+_MOULTON_ERROR = [None] + [
+    abs(_GAMMA[k] - _GAMMA[k - 1]) for k in range(1, _MAX_ORDER + 2)
+]
+# Milne's device, error of the corrector from the difference of corrector and predictor
+_MILNE = [None] + [_MOULTON_ERROR[k] / _GAMMA[k - 1] for k in range(1, _MAX_ORDER + 1)]
+
+
+def _binomial_row(m):
+    """Coefficients of the backward difference of order m, newest value first."""
+    row = [1.0]
+    for j in range(1, m + 1):
+        row.append(-row[-1] * (m - j + 1) / j)
+    return tuple(row)
+
+
+# smallest growth of the step size worth interpolating the history
+_MIN_GROWTH = 1.5
+
+_BACKWARD_DIFFERENCE = [_binomial_row(m) for m in range(_MAX_ORDER + 2)]
+
+
+@functools.lru_cache(maxsize=None)
+def _lagrange_basis(nodes):
+    """Coefficients, by increasing power, of the Lagrange basis polynomials on `nodes`."""
+    basis = []
+    for j, x_j in enumerate(nodes):
+        poly = [1.0]
+        denom = 1.0
+        for m, x_m in enumerate(nodes):
+            if m == j:
+                continue
+            # poly *= (x - x_m)
+            poly = [
+                (poly[i - 1] if i > 0 else 0.0)
+                - x_m * (poly[i] if i < len(poly) else 0.0)
+                for i in range(len(poly) + 1)
+            ]
+            denom *= x_j - x_m
+        basis.append([c / denom for c in poly])
+    return basis
+
+
+def _rescale_matrix(n, ratio):
+    """[n, n] matrix mapping the values at 0, -1, ..., -(n - 1) to the values of their
+    interpolating polynomial at 0, -ratio, ..., -(n - 1) * ratio."""
+    basis = _lagrange_basis(tuple(-float(j) for j in range(n)))
+    return [
+        [sum(c * (-i * ratio) ** p for p, c in enumerate(poly)) for poly in basis]
+        for i in range(n)
+    ]
+
+
+def _dense_weights(order, theta):
+    """Weights w_j of y(t0 + theta * dt) = y0 + dt * sum(w_j * f(t1 - j * dt)), integrating
+    the polynomial interpolating the `order` derivatives at t1, t0, ..., newest first."""
+    basis = _lagrange_basis(tuple(1.0 - j for j in range(order)))
+    return tuple(
+        sum(c * theta ** (p + 1) / (p + 1) for p, c in enumerate(poly))
+        for poly in basis
+    )
+
+
+class AdaptiveAdamsBashforthMoulton(AdaptiveSolver):
+    def __init__(
+        self,
+        xde,
+        y0: paddle.Tensor,
+        rtol,
+        atol,
+        first_step=None,
+        max_order=_MAX_ORDER,
+        pece=True,
+        min_step=0.0,
+        max_step=float("inf"),
+        safety=0.9,
+        ifactor=2.0,
+        dfactor=0.2,
+        max_num_steps=2**31 - 1,
+        dtype=paddle.float32,
+        **kwargs
+    ):
+        """Variable-step, variable-order Adams-Bashforth-Moulton solver.
+
+        Every step predicts with the Adams-Bashforth method and corrects with the
+        Adams-Moulton method of the current order, using the coefficients of the
+        fixed-step `AdamsBashforthMoulton`. The derivatives of the previous steps are kept
+        on a uniform grid, and interpolated onto the new grid when the step size changes.
+        The local error is estimated by Milne's device from the difference of predictor
+        and corrector, and the order is raised or lowered by one after an accepted step
+        when the backward differences show that a larger step is allowed. The solution
+        between the steps is evaluated by integrating the corrector polynomial.
+
+        :param max_order: maximum order of the methods, at most 12.
+        :param pece: evaluate the derivative again at the corrected state (2 evaluations
+                    per step), otherwise reuse the one at the predicted state (1 evaluation).
+        :param ifactor: maximum growth of the step size, kept small since the history is
+                    extrapolated when the step grows.
+        """
+        super(AdaptiveAdamsBashforthMoulton, self).__init__(
+            xde=xde, dtype=dtype, y0=y0, **kwargs
+        )
+        if not 1 <= max_order <= _MAX_ORDER:
+            raise ValueError(
+                "max_order must be in [1, {}], but got {}.".format(
+                    _MAX_ORDER, max_order
+                )
+            )
+
+        self.rtol = paddle.to_tensor(rtol, dtype=y0.dtype)
+        self.atol = paddle.to_tensor(atol, dtype=y0.dtype)
+        self.first_step = first_step
+        self.max_order = int(max_order)
+        self.pece = pece
+        self.min_step = float(min_step)
+        self.max_step = float(max_step)
+        self.safety = float(safety)
+        self.ifactor = float(ifactor)
+        self.dfactor = float(dfactor)
+        self.max_num_steps = max_num_steps
+
+        self.bashforth = _BASHFORTH_DIVISOR
+        self.moulton = _MOULTON_DIVISOR
+
+    def _before_integrate(self, t_span):
+        t0 = t_span[0]
+        f0 = self.move(t0, t_span[1] - t_span[0], self.y0)
+        if self.first_step is None:
+            first_step = self.select_initial_step(
+                t0, self.y0, 1, self.rtol, self.atol, f0=f0
+            )
+        else:
+            first_step = self.first_step
+
+        # derivatives at the previous steps, spaced by `self.dt`, newest first
+        self.prev_f = HistoryBuffer(self.max_order + 1)
+        self.prev_f.push(f0)
+        self.order = 1
+
+        # the last accepted step goes from (t0, y0) to (t1, y1) with the step size dt, and
+        # with the order `dense_order`
+        self.t0 = self.t1 = float(t0)
+        self.y0_prev = self.y1 = self.y0
+        self.dt = self.dt_next = min(float(first_step), self.max_step)
+        self.dense_order = 1
+        # accepted steps to wait before changing the step size or the order, and number
+        # of consecutive rejected steps
+        self.n_wait = 0
+        self.n_rejected = 0
+
+    def step(self, next_t):
+        """Interpolate through the next time point, integrating as necessary."""
+        next_t = float(next_t)
+        n_steps = 0
+        while next_t > self.t1:
+            assert (
+                n_steps < self.max_num_steps
+            ), "max_num_steps exceeded ({}>={})".format(n_steps, self.max_num_steps)
+            self._adaptive_step()
+            n_steps += 1
+        return self._interp(next_t)
+
+    def _adaptive_step(self):
+        """Take an adaptive Adams step, the state is left unchanged if it is rejected."""
+        order = self.order
+        if self.dt_next != self.dt:
+            self._rescale_history(self.dt_next / self.dt, order + 1)
+            self.dt = self.dt_next
+        dt = self.dt
+        t0, y0 = self.t1, self.y1
+        t1 = t0 + dt
+        assert t1 > t0, "underflow in dt {}".format(dt)
+        t1_tensor = paddle.to_tensor(t1, dtype=self.dtype)
+
+        ########################################################
+        #                Predict and correct                   #
+        ########################################################
+        y_pred = self.fuse(self.prev_f.dot(self.bashforth[order]), dt, y0)
+        f_pred = self.move(t1_tensor, dt, y_pred)
+        moulton_coeffs = self.moulton[order]
+        dy = moulton_coeffs[0] * f_pred
+        if order > 1:
+            dy = dy + self.prev_f.dot(moulton_coeffs[1:])
+        y1 = self.fuse(dy, dt, y0)
+
+        ########################################################
+        #                     Error Ratio                      #
+        ########################################################
+        error_ratio = compute_error_ratio(
+            _MILNE[order] * (y1 - y_pred), self.rtol, self.atol, y0, y1, self.norm
+        ).item()
+        if error_ratio > 1 and dt > self.min_step:
+            # Lower the order after repeated failures, the history may be too rough.
+            self.hooks.fire("step", t0, t1, False, True)
+            self.n_rejected += 1
+            if self.n_rejected >= 2 and order > 1:
+                self.order = order - 1
+            factor = self._step_factor(error_ratio, order)
+            self.dt_next = max(dt * factor, self.min_step)
+            self.n_wait = self.order + 1
+            return
+
+        ########################################################
+        #                    Accept Step                       #
+        ########################################################
+        self.hooks.fire("step", t0, t1, True, True)
+        f1 = self.move(t1_tensor, dt, y1) if self.pece else f_pred
+        self.prev_f.push(f1)
+        self.t0, self.y0_prev = t0, y0
+        self.t1, self.y1 = t1, y1
+        self.dense_order = order
+        self.n_rejected = 0
+
+        # Every change of the step size interpolates the history, so after a change of
+        # the step size or of the order, wait order + 1 steps before the next one.
+        if self.n_wait > 0:
+            self.n_wait -= 1
+            return
+
+        # Estimate the errors of the neighbouring orders from the backward differences.
+        # Following Shampine and Gordon, the order is lowered if the lower orders are not
+        # less accurate, and raised if order + 1 is more accurate.
+        ratios = {order: error_ratio}
+        for k in range(max(order - 2, 1), order):
+            ratios[k] = self._order_error_ratio(k, dt, y0, y1)
+        if order < self.max_order and len(self.prev_f) >= order + 2:
+            ratios[order + 1] = self._order_error_ratio(order + 1, dt, y0, y1)
+        next_order = order
+        if order > 1 and max(ratios[k] for k in range(max(order - 2, 1), order)) <= (
+            error_ratio if order > 2 else 0.5 * error_ratio
+        ):
+            next_order = order - 1
+        elif ratios.get(order + 1, float("inf")) < (
+            error_ratio if order > 1 else 0.5 * error_ratio
+        ):
+            next_order = order + 1
+
+        factor = self._step_factor(ratios[next_order], next_order)
+        if 1.0 <= factor < _MIN_GROWTH:
+            factor = 1.0
+        if next_order != order or factor != 1.0:
+            self.order = next_order
+            self.dt_next = min(max(dt * factor, self.min_step), self.max_step)
+            self.n_wait = next_order + 1
+
+    def _order_error_ratio(self, order, dt, y0, y1):
+        """Error ratio of the Adams-Moulton method of order `order` over the last step,
+        from the backward difference of the derivatives."""
+        error = self.prev_f.dot(_BACKWARD_DIFFERENCE[order]) * (
+            dt * _MOULTON_ERROR[order]
+        )
+        return compute_error_ratio(
+            error, self.rtol, self.atol, y0, y1, self.norm
+        ).item()
+
+    def _step_factor(self, error_ratio, order):
+        """Factor of the step size for a local error of order `order + 1`."""
+        if error_ratio == 0:
+            return self.ifactor
+        factor = self.safety * error_ratio ** (-1.0 / (order + 1))
+        return min(self.ifactor, max(self.dfactor, factor))
+
+    def _rescale_history(self, ratio, n):
+        """Interpolate the newest `n` derivatives of the history onto a grid `ratio` times
+        as fine, the older ones are dropped."""
+        n = min(n, len(self.prev_f))
+        values = self.prev_f.values()[:n]
+        matrix = paddle.to_tensor(_rescale_matrix(n, ratio), dtype=values.dtype)
+        self.prev_f.load(paddle.tensordot(matrix, values, axes=1))
+
+    def _interp(self, t):
+        if t == self.t1:
+            return self.y1
+        theta = (t - self.t0) / self.dt
+        weights = _dense_weights(self.dense_order, theta)
+        return self.fuse(self.prev_f.dot(weights, cache=False), self.dt, self.y0_prev)
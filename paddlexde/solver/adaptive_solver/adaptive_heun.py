@@ -1,23 +1,16 @@
-import paddle
-
 from ..base_adaptive_solver_rk import AdaptiveRKSolver, _ButcherTableau
 
 _ADAPTIVE_HEUN_TABLEAU = _ButcherTableau(
-    alpha=paddle.to_tensor([1.0], dtype=paddle.float64),
-    beta=[
-        paddle.to_tensor([1.0], dtype=paddle.float64),
-    ],
-    c_sol=paddle.to_tensor([0.5, 0.5], dtype=paddle.float64),
-    c_error=paddle.to_tensor(
-        [
-            0.5,
-            -0.5,
-        ],
-        dtype=paddle.float64,
+    alpha=(1.0,),
+    beta=((1.0,),),
+    c_sol=(0.5, 0.5),
+    c_error=(
+        0.5,
+        -0.5,
     ),
 )
 
-_AH_C_MID = paddle.to_tensor([0.5, 0.0], dtype=paddle.float64)
+_AH_C_MID = (0.5, 0.0)
 
 
 class AdaptiveHeun(AdaptiveRKSolver):
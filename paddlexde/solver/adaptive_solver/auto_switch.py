@@ -0,0 +1,185 @@
+import logging
+
+import paddle
+
+from ...utils.ode_utils import interp_evaluate
+from ..base_adaptive_solver import AdaptiveSolver
+from ..base_adaptive_solver_rk import _RungeKuttaState
+from .dopri5 import Dopri5
+from .sdirk4 import SDIRK4
+
+logger = logging.getLogger(__name__)
+
+# boundary of the stability region of Dopri5 on the negative real axis, about 3.3
+_STABILITY_BOUNDARY = 3.25
+
+
+class AutoSwitch(AdaptiveSolver):
+    def __init__(
+        self,
+        xde,
+        y0: paddle.Tensor,
+        rtol,
+        atol,
+        nonstiff_solver=Dopri5,
+        stiff_solver=SDIRK4,
+        stiff_steps=15,
+        nonstiff_steps=6,
+        max_num_steps=2**31 - 1,
+        dtype=paddle.float32,
+        **kwargs
+    ):
+        """Adaptive solver switching between an explicit and an implicit solver, as LSODA.
+
+        The steps start with the explicit `nonstiff_solver`, whose last two stages are
+        evaluated at the end of the step from two different states, so their difference
+        estimates `dt * |lambda|`, lambda being the dominant eigenvalue of the Jacobian,
+        at no extra cost (Hairer and Wanner, "Solving Ordinary Differential Equations
+        II", Sec. IV.2). When it exceeds the stability boundary on `stiff_steps` of the
+        accepted steps before `nonstiff_steps` consecutive steps below it, the problem
+        is stiff and the steps continue with the implicit `stiff_solver`. The implicit
+        solver switches back when `dt` times the spectral radius of its Jacobian stays
+        below the boundary for `nonstiff_steps` accepted steps, so the explicit solver
+        could take the same steps.
+
+        Every switch is logged by the `logging` logger of this module and recorded in
+        `switches` as `(t, stiff, estimate)`, `estimate` being the `dt * |lambda|`
+        which decided it. Both solvers share the hooks, see `SolverHooks`.
+
+        :param nonstiff_solver: `AdaptiveRKSolver` whose last two stages are evaluated at
+                    the end of the step, as `Dopri5`.
+        :param stiff_solver: `AdaptiveSDIRKSolver`, as `SDIRK4` or `TRBDF2`.
+        :param kwargs: options of both solvers, e.g. `linear_solver` of the implicit one.
+        """
+        super(AutoSwitch, self).__init__(xde=xde, dtype=dtype, y0=y0, **kwargs)
+        alpha = nonstiff_solver.tableau.alpha
+        if len(alpha) < 2 or alpha[-1] != 1 or alpha[-2] != 1:
+            raise ValueError(
+                "the last two stages of {} are not evaluated at the end of the "
+                "step.".format(nonstiff_solver.__name__)
+            )
+        options = dict(kwargs, xde=xde, y0=y0, rtol=rtol, atol=atol, dtype=dtype)
+        self.nonstiff = nonstiff_solver(**options)
+        self.stiff = stiff_solver(**options)
+        self.nonstiff.hooks = self.stiff.hooks = self.hooks
+        self.stiff_steps = int(stiff_steps)
+        self.nonstiff_steps = int(nonstiff_steps)
+        self.max_num_steps = max_num_steps
+
+        # weights of the stage buffer giving the difference of the last two stages, and
+        # the difference of the states they are evaluated at, divided by dt
+        beta = nonstiff_solver.tableau.beta
+        n = len(alpha) + 1
+        stage_diff = [0.0] * (n - 2) + [-1.0, 1.0]
+        state_diff = [
+            (beta[-1][j] if j < len(beta[-1]) else 0.0)
+            - (beta[-2][j] if j < len(beta[-2]) else 0.0)
+            for j in range(n)
+        ]
+        self.stiffness_weights = paddle.to_tensor(
+            [stage_diff, state_diff], dtype=y0.dtype
+        )
+
+    def _before_integrate(self, t_span):
+        self.nonstiff.move = self.stiff.move = self.move
+        self.nonstiff._before_integrate(t_span)
+        self.is_stiff = False
+        self.switches = []
+        # counts of the accepted steps above and below the stability boundary
+        self.n_above = self.n_below = 0
+        # the last accepted step, of either solver
+        state = self.nonstiff.rk_state
+        self.t0 = self.t1 = float(state.t1)
+        self.y1, self.f1 = state.y1, state.f1
+        self.interp_coeff = None
+
+    def step(self, next_t):
+        """Interpolate through the next time point, integrating as necessary."""
+        n_steps = 0
+        while float(next_t) > self.t1:
+            assert (
+                n_steps < self.max_num_steps
+            ), "max_num_steps exceeded ({}>={})".format(n_steps, self.max_num_steps)
+            if self.is_stiff:
+                self._stiff_step()
+            else:
+                self._nonstiff_step()
+            n_steps += 1
+        if float(next_t) == self.t1:
+            return self.y1
+        return interp_evaluate(
+            self.interp_coeff,
+            paddle.to_tensor(self.t0, dtype=self.dtype),
+            paddle.to_tensor(self.t1, dtype=self.dtype),
+            next_t,
+        )
+
+    def _nonstiff_step(self):
+        solver = self.nonstiff
+        solver.rk_state = solver._adaptive_step(solver.rk_state)
+        state = solver.rk_state
+        t1 = float(state.t1)
+        if t1 == self.t1:
+            return
+        self.t0, self.t1 = float(state.t0), t1
+        self.y1, self.f1 = state.y1, state.f1
+        self.interp_coeff = state.interp_coeff
+
+        # dt * |lambda| = |k_n - k_{n-1}| / |y_n - y_{n-1}| * dt, y_n - y_{n-1} = dt * diffs[1]
+        diffs = solver.stages.dot_slots(self.stiffness_weights)
+        state_norm = float(paddle.linalg.norm(diffs[1]))
+        estimate = (
+            0.0 if state_norm == 0 else float(paddle.linalg.norm(diffs[0])) / state_norm
+        )
+        if estimate > _STABILITY_BOUNDARY:
+            self.n_above += 1
+            self.n_below = 0
+            if self.n_above >= self.stiff_steps:
+                self._switch(True, estimate)
+                self.stiff.restart(
+                    paddle.to_tensor(self.t1, dtype=self.dtype),
+                    self.y1,
+                    self.f1,
+                    float(state.dt),
+                )
+        else:
+            self.n_below += 1
+            if self.n_below >= self.nonstiff_steps:
+                self.n_above = 0
+
+    def _stiff_step(self):
+        solver = self.stiff
+        solver._adaptive_step()
+        if solver.t1 == self.t1:
+            return
+        self.t0, self.t1 = solver.t0, solver.t1
+        self.y1, self.f1 = solver.y1, solver.f1
+        self.interp_coeff = solver.interp_coeff
+
+        estimate = solver.dt * solver.linear_solver.spectral_radius()
+        if estimate <= _STABILITY_BOUNDARY:
+            self.n_below += 1
+            if self.n_below >= self.nonstiff_steps:
+                self._switch(False, estimate)
+                t1 = paddle.to_tensor(self.t1, dtype=self.dtype)
+                self.nonstiff.rk_state = _RungeKuttaState(
+                    self.y1,
+                    self.f1,
+                    t1,
+                    t1,
+                    paddle.to_tensor(solver.dt_next, dtype=self.dtype),
+                    self.nonstiff.rk_state.interp_coeff,
+                )
+        else:
+            self.n_below = 0
+
+    def _switch(self, stiff, estimate):
+        self.is_stiff = stiff
+        self.n_above = self.n_below = 0
+        self.switches.append((self.t1, stiff, estimate))
+        logger.info(
+            "switching to %s at t=%.6g, dt*|lambda|=%.3g",
+            type(self.stiff if stiff else self.nonstiff).__name__,
+            self.t1,
+            estimate,
+        )
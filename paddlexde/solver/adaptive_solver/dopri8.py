@@ -1,5 +1,3 @@
-import paddle
-
 from ..base_adaptive_solver_rk import AdaptiveRKSolver, _ButcherTableau
 
 A = [
@@ -152,101 +150,127 @@ C_err = [
     0,
 ]
 
+# Continuous extension of the weights of the stages, b_i(theta) = theta * sum(P[i][j] *
+# theta ** j), with b_i(1) = C_sol[i]. Only the stages 0 and 5 to 13 are used. The
+# extension is of order 5, its local error is O(h ** 6) inside the step.
+P = [[0.0] * 6 for _ in range(14)]
+
+P[0] = [
+    1.0,
+    -6.6910181737837595697,
+    19.9990069333683970610,
+    -30.0610568289666450593,
+    22.1396504998094068976,
+    -6.3448349392860401388,
+]
+
+P[5] = [
+    0.0,
+    -7.6142658045872677172,
+    52.2273532792945524050,
+    -121.4999627731334642623,
+    116.4422149550342161651,
+    -39.6107919852202505218,
+]
+
+P[6] = [
+    0.0,
+    10.7281392630428866124,
+    -46.8919164181093621583,
+    83.1721004639847717481,
+    -67.1451318825957197185,
+    20.3761213808791436958,
+]
+
+P[7] = [
+    0.0,
+    0.5526637063753648783,
+    -0.1890893225010595467,
+    9.5724507555993664382,
+    -16.5672243527496524646,
+    7.3347098826795362023,
+]
+
+P[8] = [
+    0.0,
+    4.2186562625665153803,
+    -35.7075975946222072821,
+    87.8406057677205645007,
+    -89.9916014847245016028,
+    32.8801774352459155182,
+]
+
+P[9] = [
+    0.0,
+    -0.6627209125361597559,
+    6.2736448083240352160,
+    -17.4152107770762969005,
+    22.6237489648532849093,
+    -10.1588990526426760954,
+]
+
+P[10] = [
+    0.0,
+    -1.2636789001135462218,
+    10.3160881272450748458,
+    -28.5903289514790976966,
+    32.2362340167355370113,
+    -12.5401268098782561200,
+]
+
+P[11] = [
+    0.0,
+    5.4106037898590422230,
+    -34.7650769866611817349,
+    81.6630950584341412934,
+    -82.1020315488359848644,
+    29.5553001484516038033,
+]
+
+P[12] = [
+    0.0,
+    -7.0321379067945741781,
+    47.7457971078225540396,
+    -114.9375291377009418170,
+    116.2662185791119533462,
+    -41.7923486424390588923,
+]
+
+P[13] = [
+    0.0,
+    2.3537586759714983486,
+    -19.0082099341608028453,
+    50.2558364226176017553,
+    -53.9020777466385396792,
+    20.3006925822100825485,
+]
+
+# weights of theta ** (j + 1), one row per power
+C_dense = [[P_i[j] for P_i in P] for j in range(6)]
+
 h = 1 / 2
 
-C_mid = [0.0] * 14
-
-C_mid[0] = (
-    -6.3448349392860401388 * (h**5)
-    + 22.1396504998094068976 * (h**4)
-    - 30.0610568289666450593 * (h**3)
-    + 19.9990069333683970610 * (h**2)
-    - 6.6910181737837595697 * h
-    + 1.0
-) / (1 / h)
-
-C_mid[5] = (
-    -39.6107919852202505218 * (h**5)
-    + 116.4422149550342161651 * (h**4)
-    - 121.4999627731334642623 * (h**3)
-    + 52.2273532792945524050 * (h**2)
-    - 7.6142658045872677172 * h
-) / (1 / h)
-
-C_mid[6] = (
-    20.3761213808791436958 * (h**5)
-    - 67.1451318825957197185 * (h**4)
-    + 83.1721004639847717481 * (h**3)
-    - 46.8919164181093621583 * (h**2)
-    + 10.7281392630428866124 * h
-) / (1 / h)
-
-C_mid[7] = (
-    7.3347098826795362023 * (h**5)
-    - 16.5672243527496524646 * (h**4)
-    + 9.5724507555993664382 * (h**3)
-    - 0.1890893225010595467 * (h**2)
-    + 0.5526637063753648783 * h
-) / (1 / h)
-
-C_mid[8] = (
-    32.8801774352459155182 * (h**5)
-    - 89.9916014847245016028 * (h**4)
-    + 87.8406057677205645007 * (h**3)
-    - 35.7075975946222072821 * (h**2)
-    + 4.2186562625665153803 * h
-) / (1 / h)
-
-C_mid[9] = (
-    -10.1588990526426760954 * (h**5)
-    + 22.6237489648532849093 * (h**4)
-    - 17.4152107770762969005 * (h**3)
-    + 6.2736448083240352160 * (h**2)
-    - 0.6627209125361597559 * h
-) / (1 / h)
-
-C_mid[10] = (
-    -12.5401268098782561200 * (h**5)
-    + 32.2362340167355370113 * (h**4)
-    - 28.5903289514790976966 * (h**3)
-    + 10.3160881272450748458 * (h**2)
-    - 1.2636789001135462218 * h
-) / (1 / h)
-
-C_mid[11] = (
-    29.5553001484516038033 * (h**5)
-    - 82.1020315488359848644 * (h**4)
-    + 81.6630950584341412934 * (h**3)
-    - 34.7650769866611817349 * (h**2)
-    + 5.4106037898590422230 * h
-) / (1 / h)
-
-C_mid[12] = (
-    -41.7923486424390588923 * (h**5)
-    + 116.2662185791119533462 * (h**4)
-    - 114.9375291377009418170 * (h**3)
-    + 47.7457971078225540396 * (h**2)
-    - 7.0321379067945741781 * h
-) / (1 / h)
-
-C_mid[13] = (
-    20.3006925822100825485 * (h**5)
-    - 53.9020777466385396792 * (h**4)
-    + 50.2558364226176017553 * (h**3)
-    - 19.0082099341608028453 * (h**2)
-    + 2.3537586759714983486 * h
-) / (1 / h)
-
-A = paddle.to_tensor(A, dtype=paddle.float64)
-B = [paddle.to_tensor(B_, dtype=paddle.float64) for B_ in B]
-C_sol = paddle.to_tensor(C_sol, dtype=paddle.float64)
-C_err = paddle.to_tensor(C_err, dtype=paddle.float64)
-_C_mid = paddle.to_tensor(C_mid, dtype=paddle.float64)
-
-_DOPRI8_TABLEAU = _ButcherTableau(alpha=A, beta=B, c_sol=C_sol, c_error=C_err)
+C_mid = [h * sum(p * h**j for j, p in enumerate(P_i)) for P_i in P]
+
+_DOPRI8_TABLEAU = _ButcherTableau(
+    alpha=tuple(A),
+    beta=tuple(tuple(B_) for B_ in B),
+    c_sol=tuple(C_sol),
+    c_error=tuple(C_err),
+)
+_C_mid = tuple(C_mid)
+_C_dense = tuple(tuple(row) for row in C_dense)
 
 
 class Dopri8(AdaptiveRKSolver):
+    """Dormand-Prince RK8(7)13M.
+
+    The outputs between the steps use the continuous extension `P` of the tableau, of
+    order 5 and without extra function evaluations. A 7th order extension would need
+    extra stages in every step.
+    """
+
     order = 8
     tableau = _DOPRI8_TABLEAU
     mid = _C_mid
+    dense = _C_dense
@@ -0,0 +1,28 @@
+from ..base_adaptive_solver_sdirk import AdaptiveSDIRKSolver, _SDIRKTableau
+
+# L-stable SDIRK method of order 4 of Hairer and Wanner, with an embedded method of order 3,
+# see "Solving Ordinary Differential Equations II", Table IV.6.5.
+_SDIRK4_TABLEAU = _SDIRKTableau(
+    gamma=1 / 4,
+    alpha=(1 / 4, 3 / 4, 11 / 20, 1 / 2, 1.0),
+    beta=(
+        (1 / 4,),
+        (1 / 2, 1 / 4),
+        (17 / 50, -1 / 25, 1 / 4),
+        (371 / 1360, -137 / 2720, 15 / 544, 1 / 4),
+        (25 / 24, -49 / 48, 125 / 16, -85 / 12, 1 / 4),
+    ),
+    c_sol=(25 / 24, -49 / 48, 125 / 16, -85 / 12, 1 / 4),
+    c_error=(
+        25 / 24 - 59 / 48,
+        -49 / 48 + 17 / 96,
+        125 / 16 - 225 / 32,
+        0.0,
+        1 / 4,
+    ),
+)
+
+
+class SDIRK4(AdaptiveSDIRKSolver):
+    order = 4
+    tableau = _SDIRK4_TABLEAU
@@ -0,0 +1,28 @@
+import math
+
+from ..base_adaptive_solver_sdirk import AdaptiveSDIRKSolver, _SDIRKTableau
+
+# TR-BDF2 of Bank et al. as an L-stable ESDIRK method of order 2, a trapezoidal stage then
+# a BDF2 stage, with the embedded method of order 3 of Hosea and Shampine, "Analysis and
+# implementation of TR-BDF2", Appl. Numer. Math. 20 (1996).
+_GAMMA = 2 - math.sqrt(2)
+_D = _GAMMA / 2
+_W = math.sqrt(2) / 4
+
+_TRBDF2_TABLEAU = _SDIRKTableau(
+    gamma=_D,
+    alpha=(0.0, _GAMMA, 1.0),
+    beta=(
+        (0.0,),
+        (_D, _D),
+        (_W, _W, _D),
+    ),
+    c_sol=(_W, _W, _D),
+    c_error=(_W - (1 - _W) / 3, _W - (3 * _W + 1) / 3, _D - _D / 3),
+)
+
+
+class TRBDF2(AdaptiveSDIRKSolver):
+    # the error of the solution of order 2 is of order 3
+    order = 3
+    tableau = _TRBDF2_TABLEAU
@@ -2,16 +2,31 @@ import abc
 
 import paddle
 
+from .solution_buffer import SolutionBuffer
+from .solver_stats import SolverHooks
+
 
 class AdaptiveSolver(metaclass=abc.ABCMeta):
-    def __init__(self, xde, dtype: type, y0: paddle.Tensor, norm, **unused_kwargs):
+    def __init__(
+        self,
+        xde,
+        dtype: type,
+        y0: paddle.Tensor,
+        norm,
+        layout="time",
+        save_at=None,
+        **unused_kwargs
+    ):
         self.dtype = dtype
         self.y0 = y0
         self.norm = norm
+        self.layout = layout
+        self.save_at = save_at
 
         self.xde = xde
         self.move = self.xde.move
         self.fuse = self.xde.fuse
+        self.hooks = SolverHooks()
 
     @abc.abstractmethod
     def _before_integrate(self, t_span):
@@ -22,13 +37,21 @@ class AdaptiveSolver(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
     def integrate(self, t_span):
-        solution = paddle.empty([len(t_span), *self.y0.shape], dtype=self.y0.dtype)
-        solution[0] = self.y0
+        solution = SolutionBuffer(
+            self.y0, len(t_span), layout=self.layout, save_at=self.save_at
+        )
+        solution.write(0, self.y0)
         t_span = t_span.astype(self.dtype)
+        self.move = self.hooks.wrap_move(self.xde.move)
         self._before_integrate(t_span)
+        self._write_outputs(solution, t_span)
+        return solution.finalize()
+
+    def _write_outputs(self, solution, t_span):
+        """Integrate through `t_span[1:]` and write the states into `solution`, one `step`
+        per output time."""
         for i in range(1, len(t_span)):
-            solution[i] = self.step(t_span[i])
-        return solution
+            solution.write(i, self.step(t_span[i]))
 
     def select_initial_step(self, t0, y0, order, rtol, atol, f0=None):
         """Empirically select a good initial step.
@@ -1,33 +1,110 @@
 import bisect
 import collections
+import functools
+import math
+import weakref
 from typing import Union
 
 import paddle
 
+from ..utils.misc import func_cache, func_owner
 from ..utils.ode_utils import (
-    PaddleAssign,
     compute_error_ratio,
     interp_evaluate,
+    interp_evaluate_many,
     interp_fit,
     optimal_step_size,
+    per_sample_norm,
     sort_tvals,
 )
 from ..xde import BaseXDE
 from .base_adaptive_solver import AdaptiveSolver
+from .history_buffer import HistoryBuffer
+from .step_controller import make_controller
 
+# Tuples of python floats, the tensors are built lazily by `_compile_tableau`.
 _ButcherTableau = collections.namedtuple(
     "_ButcherTableau", "alpha, beta, c_sol, c_error"
 )
 
+# sizes of the first accepted steps of `warm_start`, per `xde.func`
+_STEP_CACHES = weakref.WeakKeyDictionary()
+
+_CompiledTableau = collections.namedtuple(
+    "_CompiledTableau",
+    "alpha, stage_at_end, fsal_solution, weights, beta, c_sol, c_error, mid, dense",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_tableau(tableau, mid, dense, dtype, place):
+    """Compile `tableau`, the weights `mid` of its midpoint and the weights `dense` of its
+    continuous extension, if any, for `dtype` on `place`.
+
+    The tensors are built once per tableau, dtype and place, instead of at import time
+    or for every solver. All the weights are packed into one zero-padded matrix
+    `weights` with s + 1 columns, for a tableau of s + 1 stages, whose rows are the rows
+    of `beta`, `c_sol`, `c_error`, `mid` and `dense`, with the weight of stage j in
+    column j, the slot of the stage in the stage buffer, see `HistoryBuffer.dot_slots`.
+    `beta`, `c_sol`, `c_error` and `mid` are rows of `weights`, and `dense` its last
+    rows, or None.
+    """
+    n_stages = len(tableau.alpha) + 1
+    rows = list(tableau.beta) + [tableau.c_sol, tableau.c_error, mid]
+    n_dense = 0 if dense is None else len(dense)
+    if dense is not None:
+        rows += list(dense)
+    weights = paddle.to_tensor(
+        [[float(c) for c in row] + [0.0] * (n_stages - len(row)) for row in rows],
+        dtype=dtype,
+        place=place,
+    )
+    n_rows = len(tableau.beta) + 3
+    rows = weights[:n_rows].unbind(0)
+    c_sol = [float(c) for c in tableau.c_sol]
+    return _CompiledTableau(
+        alpha=[float(a) for a in tableau.alpha],
+        # host-side facts about the tableau, so that no step has to read it back
+        stage_at_end=[a == 1.0 for a in tableau.alpha],
+        # true for Dormand-Prince, the solution is the last stage
+        fsal_solution=c_sol[-1] == 0
+        and c_sol[:-1] == [float(b) for b in tableau.beta[-1]],
+        weights=weights,
+        beta=rows[:-3],
+        c_sol=rows[-3],
+        c_error=rows[-2],
+        mid=rows[-1],
+        dense=None if n_dense == 0 else weights[n_rows:],
+    )
+
+
 _RungeKuttaState = collections.namedtuple(
     "_RungeKuttaState", "y1, f1, t0, t1, dt, interp_coeff"
 )
 
 
+def _per_sample(t, y):
+    """Reshape the [b] Tensor `t` to broadcast against the [b, ...] Tensor `y`."""
+    return t.reshape([-1] + [1] * (len(y.shape) - 1))
+
+
+def _horner(coeffs, x):
+    """Evaluate the polynomials `coeffs` of `interp_fit` at the [b] positions `x` in [0, 1]
+    of the steps of the samples."""
+    x = _per_sample(x, coeffs[0]).astype(coeffs[0].dtype)
+    total = coeffs[-1]
+    for coefficient in reversed(coeffs[:-1]):
+        total = total * x + coefficient
+    return total
+
+
 class AdaptiveRKSolver(AdaptiveSolver):
     order: int
     tableau: _ButcherTableau
-    mid: paddle.Tensor
+    mid: tuple
+    # weights of the continuous extension, `dense[j][i]` weighting stage i in the
+    # coefficient of theta ** (j + 1), see `_interp_fit`
+    dense: tuple = None
 
     def __init__(
         self,
@@ -44,9 +121,34 @@ class AdaptiveRKSolver(AdaptiveSolver):
         ifactor=10.0,
         dfactor=0.2,
         max_num_steps=2**31 - 1,
+        sync_every=None,
+        per_sample=False,
+        controller=None,
+        warm_start=False,
+        f0=None,
         dtype=paddle.float32,
         **kwargs
     ):
+        """Adaptive explicit Runge-Kutta solver with an embedded error estimate.
+
+        :param sync_every: if set, take the steps in chunks of `sync_every` steps without
+                    reading anything back to the host, see `_masked_step`. The checks on the
+                    state and the end of the integration are then done once per chunk.
+        :param per_sample: control the step size of every sample of the batch (axis 0 of
+                    `y0`) separately, see `_per_sample_step`. `func` is then called with `t`
+                    as a [b, 1, ..., 1] Tensor broadcasting against `y`, and must treat the
+                    samples independently.
+        :param controller: step-size controller, "I", "PI", "PID" or a `StepController`,
+                    see `step_controller.py`. By default the step size follows
+                    `optimal_step_size`. The controller counts the rejected steps in
+                    `controller.n_rejected`.
+        :param warm_start: reuse the size of the first accepted step of the previous solve
+                    with the same solver, shapes and tolerances as the first step, instead
+                    of `select_initial_step`. The sizes are cached per `xde.func`, and an
+                    entry is dropped when its step is rejected.
+        :param f0: derivative at the initial state if the caller already has it, saves its
+                    evaluation.
+        """
         super(AdaptiveRKSolver, self).__init__(xde=xde, dtype=dtype, y0=y0, **kwargs)
 
         # We use mixed precision. y has its original dtype (probably float32), whilst all 'time'-like objects use
@@ -64,32 +166,101 @@ class AdaptiveRKSolver(AdaptiveSolver):
         self.ifactor = paddle.to_tensor(ifactor, dtype=dtype)
         self.dfactor = paddle.to_tensor(dfactor, dtype=dtype)
         self.max_num_steps = paddle.to_tensor(max_num_steps, dtype=paddle.int32)
+        self.controller = (
+            None
+            if controller is None
+            else make_controller(controller, self.safety, self.ifactor, self.dfactor)
+        )
         self.dtype = dtype
 
         self.step_t = None if step_t is None else paddle.to_tensor(step_t, dtype=dtype)
         self.jump_t = None if jump_t is None else paddle.to_tensor(jump_t, dtype=dtype)
-
-        # Copy from class to instance to set device
-        self.tableau = _ButcherTableau(
-            alpha=self.tableau.alpha.astype(dtype=y0.dtype),
-            beta=[b.astype(dtype=y0.dtype) for b in self.tableau.beta],
-            c_sol=self.tableau.c_sol.astype(dtype=y0.dtype),
-            c_error=self.tableau.c_error.astype(dtype=y0.dtype),
+        self.sync_every = None if sync_every is None else int(sync_every)
+        if self.sync_every is not None:
+            if self.sync_every < 1:
+                raise ValueError(
+                    "sync_every must be a positive integer, but got {}.".format(
+                        sync_every
+                    )
+                )
+            if step_t is not None or jump_t is not None:
+                raise ValueError(
+                    "step_t and jump_t are not supported together with sync_every."
+                )
+        self.per_sample = per_sample
+        self.warm_start = warm_start
+        if warm_start and (sync_every is not None or per_sample):
+            raise ValueError(
+                "warm_start is not supported together with sync_every or per_sample."
+            )
+        if warm_start and getattr(xde, "func", None) is None:
+            raise ValueError("warm_start needs an xde with a `func` to cache on.")
+        self.f0 = f0
+        # python floats, used in the keys of the warm start cache
+        self.tolerances = (self.rtol.tolist(), self.atol.tolist())
+        if per_sample:
+            if sync_every is not None:
+                raise ValueError(
+                    "sync_every and per_sample are mutually exclusive arguments."
+                )
+            if step_t is not None or jump_t is not None:
+                raise ValueError(
+                    "step_t and jump_t are not supported together with per_sample."
+                )
+
+        # Compiled once per tableau, dtype and place, and shared by the solvers
+        self.compiled_tableau = _compile_tableau(
+            self.tableau, self.mid, self.dense, y0.dtype, paddle.get_device()
         )
-        self.mid = self.mid.astype(dtype=y0.dtype)
+        self.stages = HistoryBuffer(len(self.tableau.alpha) + 1)
 
     def _before_integrate(self, t_span):
         t0 = t_span[0]
-        f0 = self.move(t_span[0], t_span[1] - t_span[0], self.y0)
-        if self.first_step is None:
+        if self.controller is not None:
+            self.controller.reset()
+        if self.f0 is None:
+            f0 = self.move(t_span[0], t_span[1] - t_span[0], self.y0)
+        else:
+            f0 = self.f0
+        first_step = self.first_step
+        # the size of the first accepted step is cached, until then `warm_started` tells
+        # whether the current step size comes from the cache
+        self.warm_started = False
+        self.first_accept_pending = self.warm_start
+        if first_step is None and self.warm_start:
+            cached = self._step_cache().get(self._step_cache_key())
+            if cached is not None:
+                first_step = paddle.to_tensor(cached, dtype=self.dtype)
+                self.warm_started = True
+        # evaluations of the derivative before the first step
+        n_initial_evals = int(self.f0 is None)
+        if first_step is None:
             first_step = self.select_initial_step(
-                t_span[0], self.y0, self.order - 1, self.rtol, self.atol
+                t_span[0], self.y0, self.order - 1, self.rtol, self.atol, f0=f0
             )
-        else:
-            first_step = self.first_step
+            n_initial_evals += 1
+        # placeholders with the number of coefficients of `_interp_fit`
+        interp_coeff = [self.y0] * (5 if self.dense is None else len(self.dense) + 1)
         self.rk_state = _RungeKuttaState(
-            self.y0, f0, t_span[0], t_span[0], first_step, [self.y0] * 5
+            self.y0, f0, t_span[0], t_span[0], first_step, interp_coeff
         )
+        if self.per_sample:
+            # one time and step size per sample, all starting from the global first step
+            batch_size = self.y0.shape[0]
+            t0_batch = paddle.full([batch_size], t_span[0], dtype=self.dtype)
+            self.rk_state = _RungeKuttaState(
+                self.y0,
+                f0,
+                t0_batch,
+                t0_batch,
+                paddle.full([batch_size], first_step, dtype=self.dtype),
+                interp_coeff,
+            )
+            self.sample_stats = {
+                "nfe": paddle.full([batch_size], n_initial_evals, "int64"),
+                "n_accepted": paddle.zeros([batch_size], "int64"),
+                "n_rejected": paddle.zeros([batch_size], "int64"),
+            }
 
         # Handle step_t and jump_t arguments.
         if self.step_t is None:
@@ -115,6 +286,17 @@ class AdaptiveRKSolver(AdaptiveSolver):
 
     def step(self, next_t):
         """Interpolate through the next time point, integrating as necessary."""
+        if self.sync_every is not None:
+            return self._sync_free_step(next_t)
+        if self.per_sample:
+            return self._per_sample_step(next_t)
+        self._advance(next_t)
+        return interp_evaluate(
+            self.rk_state.interp_coeff, self.rk_state.t0, self.rk_state.t1, next_t
+        )
+
+    def _advance(self, next_t):
+        """Take adaptive steps until the last one ends at or after `next_t`."""
         n_steps = 0
         while next_t > self.rk_state.t1:
             assert (
@@ -122,9 +304,33 @@ class AdaptiveRKSolver(AdaptiveSolver):
             ), "max_num_steps exceeded ({}>={})".format(n_steps, self.max_num_steps)
             self.rk_state = self._adaptive_step(self.rk_state)
             n_steps += 1
-        return interp_evaluate(
-            self.rk_state.interp_coeff, self.rk_state.t0, self.rk_state.t1, next_t
-        )
+
+    def _write_outputs(self, solution, t_span):
+        """Integrate through `t_span[1:]`, evaluating all the output times which fall into
+        the same step at once, see `interp_evaluate_many`."""
+        if self.sync_every is not None or self.per_sample:
+            return super(AdaptiveRKSolver, self)._write_outputs(solution, t_span)
+        t_list = t_span.tolist()
+        i = 1
+        while i < len(t_list):
+            self._advance(t_span[i])
+            t1 = self.rk_state.t1.item()
+            j = i + 1
+            while j < len(t_list) and t_list[j] <= t1:
+                j += 1
+            outputs = [k for k in range(i, j) if solution.saved(k)]
+            if len(outputs) == 1:
+                solution.write(outputs[0], self.step(t_span[outputs[0]]))
+            elif len(outputs) > 1:
+                t_out = paddle.gather(t_span, paddle.to_tensor(outputs))
+                ys = interp_evaluate_many(
+                    self.rk_state.interp_coeff,
+                    self.rk_state.t0,
+                    self.rk_state.t1,
+                    t_out,
+                )
+                solution.write_many(outputs, ys)
+            i = j
 
     def _runge_kutta_step(self, y0, f0, t0, dt, t1, tableau):
         """Take an arbitrary Runge-Kutta step and estimate error.
@@ -136,12 +342,12 @@ class AdaptiveRKSolver(AdaptiveSolver):
             dt: float64 scalar Tensor giving the size of the desired time step.
             t1: float64 scalar Tensor giving the end time; equal to t0 + dt. This is used (rather than t0 + dt) to ensure
                 floating point accuracy when needed.
-            tableau: _ButcherTableau describing how to take the Runge-Kutta step.
+            tableau: _CompiledTableau describing how to take the Runge-Kutta step.
         Returns:
             Tuple `(y1, f1, y1_error, k)` giving the estimated function value after
             the Runge-Kutta step at `t1 = t0 + dt`, the derivative of the state at `t1`,
-            estimated error at `t1`, and a list of Runge-Kutta coefficients `k` used for
-            calculating these terms.
+            estimated error at `t1`, and the `HistoryBuffer` of the Runge-Kutta stages `k`
+            used for calculating these terms, valid until the next step.
         """
 
         t_dtype = y0.abs().dtype
@@ -150,40 +356,35 @@ class AdaptiveRKSolver(AdaptiveSolver):
         dt = dt.astype(t_dtype)
         t1 = t1.astype(t_dtype)
 
-        # We use an unchecked assign to put data into k without incrementing its _version counter, so that the backward
-        # doesn't throw an (overzealous) error about in-place correctness. We know that it's actually correct.
-        k = paddle.empty([*f0.shape, len(tableau.alpha) + 1], dtype=y0.dtype)
-        k.stop_gradient = False
-        k = PaddleAssign.apply(target=k, value=f0, index=(..., 0))
+        # The stages are written into a preallocated stage-major buffer, stage j in slot j,
+        # and combined by one matmul with the weights of each stage.
+        k = self.stages
+        k.reset()
+        k.push(f0)
         for i, (alpha_i, beta_i) in enumerate(zip(tableau.alpha, tableau.beta)):
-            if alpha_i == 1.0:
+            if tableau.stage_at_end[i]:
                 # Always step to perturbing just before the end time, in case of discontinuities.
                 ti = t1
                 # perturb = Perturb.PREV
             else:
                 ti = t0 + alpha_i * dt
                 # perturb = Perturb.NONE
-            yi = y0 + paddle.sum(k[..., : i + 1] * (beta_i * dt), axis=-1).reshape(
-                y0.shape
-            )
+            yi = y0 + k.dot_slots(beta_i) * dt
             f = self.move(ti, dt, yi)
-            k = PaddleAssign.apply(target=k, value=f, index=(..., i + 1))
+            k.push(f)
 
-        if not (
-            tableau.c_sol[-1] == 0 and (tableau.c_sol[:-1] == tableau.beta[-1]).all()
-        ):
+        if not tableau.fsal_solution:
             # This property (true for Dormand-Prince) lets us save a few FLOPs.
-            yi = y0 + paddle.sum(k * (dt * tableau.c_sol), axis=-1).reshape(y0.shape)
+            yi = y0 + k.dot_slots(tableau.c_sol) * dt
 
         y1 = yi
-        f1 = k[..., -1]
-        y1_error = paddle.sum(k * (dt * tableau.c_error), axis=-1)
+        f1 = f
+        y1_error = k.dot_slots(tableau.c_error) * dt
         return y1, f1, y1_error, k
 
     def _adaptive_step(self, rk_state):
         """Take an adaptive Runge-Kutta step to integrate the ODE."""
         y0, f0, _, t0, dt, interp_coeff = rk_state
-        # self.func.callback_step(t0, y0, dt)
         t1 = t0 + dt
         # dtypes: self.y0.dtype (probably float32); self.dtype (probably float64)
         # used for state and timelike objects respectively.
@@ -227,7 +428,7 @@ class AdaptiveRKSolver(AdaptiveSolver):
         # trigger both. (i.e. interleaving them would be wrong.)
 
         y1, f1, y1_error, k = self._runge_kutta_step(
-            y0, f0, t0, dt, t1, tableau=self.tableau
+            y0, f0, t0, dt, t1, tableau=self.compiled_tableau
         )
         # dtypes:
         # y1.dtype == self.y0.dtype
@@ -256,10 +457,9 @@ class AdaptiveRKSolver(AdaptiveSolver):
         #                   Update RK State                    #
         ########################################################
         if accept_step:
-            # self.func.callback_accept_step(t0, y0, dt)
             t_next = t1
             y_next = y1
-            interp_coeff = self._interp_fit(y0, y_next, k, dt)
+            interp_coeff = self._interp_fit(y0, y_next, f0, f1, k, dt)
             if on_step_t:
                 if self.next_step_index != len(self.step_t) - 1:
                     self.next_step_index += 1
@@ -272,21 +472,339 @@ class AdaptiveRKSolver(AdaptiveSolver):
                 f1 = self.func(t_next, y_next)
             f_next = f1
         else:
-            # self.func.callback_reject_step(t0, y0, dt)
             t_next = t0
             y_next = y0
             f_next = f0
-        dt_next = optimal_step_size(
-            dt, error_ratio, self.safety, self.ifactor, self.dfactor, self.order
-        )
+        self.hooks.fire("step", t0, t1, bool(accept_step), True)
+        if self.first_accept_pending:
+            self._update_step_cache(bool(accept_step), dt)
+        dt_next = self._propose_step(dt, error_ratio, accept_step)
         dt_next = dt_next.clip(self.min_step, self.max_step)
         rk_state = _RungeKuttaState(y_next, f_next, t0, t_next, dt_next, interp_coeff)
         return rk_state
 
-    def _interp_fit(self, y0, y1, k, dt):
-        """Fit an interpolating polynomial to the results of a Runge-Kutta step."""
+    def _sync_free_step(self, next_t):
+        """Integrate up to exactly `next_t` in chunks of `sync_every` masked steps.
+
+        The steps are clipped to end at `next_t` at the latest, so the solution at `next_t`
+        is the state itself and no interpolation is needed. Steps taken once `next_t` is
+        reached leave the state unchanged, thus the number of steps of a chunk does not
+        depend on the data, and the host reads the state back only once per chunk.
+        """
+        next_t = paddle.to_tensor(next_t, dtype=self.dtype)
+        n_steps = 0
+        while True:
+            for _ in range(self.sync_every):
+                self.rk_state = self._masked_step(self.rk_state, next_t)
+            n_steps += self.sync_every
+            if not self._check_state(self.rk_state, next_t):
+                return self.rk_state.y1
+            assert (
+                n_steps < self.max_num_steps
+            ), "max_num_steps exceeded ({}>={})".format(n_steps, self.max_num_steps)
+
+    def _check_state(self, rk_state, next_t):
+        """Check the state with one read back to the host, and return True if `next_t` is
+        not reached yet."""
+        y1, _, _, t1, dt, _ = rk_state
+        running, finite, no_underflow = paddle.stack(
+            [t1 < next_t, paddle.isfinite(y1).all(), t1 + dt > t1]
+        ).tolist()
+        assert finite, "non-finite values in state `y`: {}".format(y1)
+        assert not running or no_underflow, "underflow in dt {}".format(dt.item())
+        return running
+
+    def _masked_step(self, rk_state, next_t):
+        """Adaptive Runge-Kutta step without host syncs, see `_adaptive_step`.
+
+        The step is clipped to end at `next_t`, and the accepted or rejected state is
+        selected with `paddle.where` rather than a python branch. Once `next_t` is reached,
+        the step is taken with a zero step size and the state is kept as it is.
+        """
+        y0, f0, _, t0, dt_proposed, interp_coeff = rk_state
+        running = t0 < next_t
+        t1 = paddle.fmin(t0 + dt_proposed, next_t)
+        dt = t1 - t0
+
+        y1, f1, y1_error, _ = self._runge_kutta_step(
+            y0, f0, t0, dt, t1, tableau=self.compiled_tableau
+        )
+        error_ratio = compute_error_ratio(
+            y1_error, self.rtol, self.atol, y0, y1, self.norm
+        )
+        accept_step = (
+            (error_ratio <= 1) & (dt <= self.max_step) | (dt <= self.min_step)
+        ) & running
+
+        self.hooks.fire("step", t0, t1, accept_step, running)
+        dt_next = self._propose_step(dt, error_ratio, accept_step, mask=running)
+        # Do not shrink the step size because the step was clipped to `next_t`.
+        dt_next = paddle.where(accept_step, paddle.fmax(dt_next, dt_proposed), dt_next)
+        dt_next = paddle.where(running, dt_next, dt_proposed)
+        dt_next = dt_next.clip(self.min_step, self.max_step)
+
+        return _RungeKuttaState(
+            paddle.where(accept_step, y1, y0),
+            paddle.where(accept_step, f1, f0),
+            paddle.where(accept_step, t0, rk_state.t0),
+            paddle.where(accept_step, t1, t0),
+            dt_next,
+            interp_coeff,
+        )
+
+    def _per_sample_step(self, next_t):
+        """Integrate every sample through `next_t` with its own step sizes.
+
+        Every step only takes the samples which have not reached `next_t` yet, gathered
+        into a smaller working batch, so samples needing small steps do not force them on
+        the others, and finished samples cost no function evaluation.
+        """
+        n_steps = 0
+        while True:
+            active = paddle.nonzero(self.rk_state.t1 < next_t).flatten()
+            if active.shape[0] == 0:
+                break
+            assert (
+                n_steps < self.max_num_steps
+            ), "max_num_steps exceeded ({}>={})".format(n_steps, self.max_num_steps)
+            self.rk_state = self._per_sample_adaptive_step(self.rk_state, active)
+            n_steps += 1
+        y1 = self.rk_state.y1
+        return interp_evaluate(
+            self.rk_state.interp_coeff,
+            _per_sample(self.rk_state.t0, y1),
+            _per_sample(self.rk_state.t1, y1),
+            next_t,
+        )
+
+    def integrate_until_event(self, t_span, event_fn):
+        """Integrate every sample from `t_span[0]` until `event_fn` crosses zero, or until
+        `t_span[-1]`.
+
+        `event_fn(t, y)` returns one value per sample, and is called with `t` as a
+        [b, 1, ..., 1] Tensor like `func` in the per-sample mode. It is evaluated after
+        every accepted step, and a change of its sign within a step is localized by
+        bisection on the interpolating polynomial of the step, see `_locate_event`. A
+        sample stops at its event, the others go on in a smaller working batch, see
+        `_per_sample_step`. Needs `per_sample=True`.
+
+        :return: (event_t, y_event), the [b] times of the events and the [b, ...] states
+                at these times. Samples without an event stop at `t_span[-1]`.
+        """
+        if not self.per_sample:
+            raise ValueError("event detection needs a solver with per_sample=True.")
+        t_span = t_span.astype(self.dtype)
+        t_end = t_span[-1]
+        self.move = self.hooks.wrap_move(self.xde.move)
+        self._before_integrate(t_span)
+
+        event = self._event_values(event_fn, self.rk_state.t1, self.rk_state.y1)
+        event_t = paddle.full_like(self.rk_state.t1, float(t_end))
+        y_event = paddle.zeros_like(self.rk_state.y1)
+        # int64 rather than bool, which scatter does not support
+        fired = paddle.zeros_like(event_t, dtype="int64")
+        n_steps = 0
+        while True:
+            active = paddle.nonzero((self.rk_state.t1 < t_end) & (fired == 0)).flatten()
+            if active.shape[0] == 0:
+                break
+            assert (
+                n_steps < self.max_num_steps
+            ), "max_num_steps exceeded ({}>={})".format(n_steps, self.max_num_steps)
+            t_before = paddle.gather(self.rk_state.t1, active)
+            self.rk_state = self._per_sample_adaptive_step(self.rk_state, active)
+            n_steps += 1
+
+            t0 = paddle.gather(self.rk_state.t0, active)
+            t1 = paddle.gather(self.rk_state.t1, active)
+            accepted = t1 > t_before
+            event0 = paddle.gather(event, active)
+            event1 = self._event_values(
+                event_fn, t1, paddle.gather(self.rk_state.y1, active)
+            )
+            event = paddle.scatter(
+                event, active, paddle.where(accepted, event1, event0)
+            )
+            crossed = (
+                accepted & (event0 != 0) & (paddle.sign(event0) != paddle.sign(event1))
+            )
+            index = paddle.nonzero(crossed).flatten()
+            if index.shape[0] == 0:
+                continue
+            # events after the end of the integration are ignored
+            samples = paddle.gather(active, index)
+            t_root, y_root = self._locate_event(
+                event_fn,
+                [paddle.gather(c, samples) for c in self.rk_state.interp_coeff],
+                paddle.gather(t0, index),
+                paddle.gather(t1, index),
+                paddle.gather(event0, index),
+            )
+            in_span = t_root <= t_end
+            samples = paddle.masked_select(samples, in_span)
+            event_t = paddle.scatter(
+                event_t, samples, paddle.masked_select(t_root, in_span)
+            )
+            y_event = paddle.scatter(
+                y_event,
+                samples,
+                paddle.gather(y_root, paddle.nonzero(in_span).flatten()),
+            )
+            fired = paddle.scatter(fired, samples, paddle.ones_like(samples))
+
+        # the other samples stop at the end of the integration
+        rest = paddle.nonzero(fired == 0).flatten()
+        if rest.shape[0] > 0:
+            y1 = paddle.gather(self.rk_state.y1, rest)
+            y_end = interp_evaluate(
+                [paddle.gather(c, rest) for c in self.rk_state.interp_coeff],
+                _per_sample(paddle.gather(self.rk_state.t0, rest), y1),
+                _per_sample(paddle.gather(self.rk_state.t1, rest), y1),
+                t_end,
+            )
+            y_event = paddle.scatter(y_event, rest, y_end)
+        return event_t, y_event
+
+    @staticmethod
+    def _event_values(event_fn, t, y):
+        """[b] values of `event_fn` at the [b] times `t`."""
+        return event_fn(_per_sample(t, y), y).reshape([-1])
+
+    def _locate_event(self, event_fn, coeffs, t0, t1, event0):
+        """Bisect the interpolating polynomials `coeffs` of [b] steps from `t0` to `t1` for
+        the zero of `event_fn`, whose sign at `t0` is the one of `event0`.
+
+        The bracket is halved until it is below the resolution of the times, with a fixed
+        number of iterations and no read back to the host.
+
+        :return: ([b] times, [b, ...] states) at the ends of the brackets after the zero.
+        """
+        lo = paddle.zeros_like(t0)
+        hi = paddle.ones_like(t0)
+        n_bisections = int(math.ceil(-math.log2(paddle.finfo(t0.dtype).eps)))
+        for _ in range(n_bisections):
+            x = 0.5 * (lo + hi)
+            t = t0 + x * (t1 - t0)
+            event = self._event_values(event_fn, t, _horner(coeffs, x))
+            before = paddle.sign(event) == paddle.sign(event0)
+            lo = paddle.where(before, x, lo)
+            hi = paddle.where(before, hi, x)
+        return t0 + hi * (t1 - t0), _horner(coeffs, hi)
+
+    def _per_sample_adaptive_step(self, rk_state, active):
+        """Take one adaptive step for the samples `active`, see `_adaptive_step`.
+
+        Times, step sizes and error ratios are [b] Tensors, and the accepted or rejected
+        state of every sample is selected with `paddle.where`.
+        """
+        y0 = paddle.gather(rk_state.y1, active)
+        f0 = paddle.gather(rk_state.f1, active)
+        t0 = paddle.gather(rk_state.t1, active)
+        dt = paddle.gather(rk_state.dt, active)
+        t1 = t0 + dt
+        assert (t1 > t0).all(), "underflow in dt {}".format(dt)
+        assert paddle.isfinite(y0).all(), "non-finite values in state `y`: {}".format(
+            y0
+        )
+
+        y1, f1, y1_error, k = self._runge_kutta_step(
+            y0,
+            f0,
+            _per_sample(t0, y0),
+            _per_sample(dt, y0),
+            _per_sample(t1, y0),
+            tableau=self.compiled_tableau,
+        )
+        error_ratio = compute_error_ratio(
+            y1_error,
+            self.rtol,
+            self.atol,
+            y0,
+            y1,
+            functools.partial(per_sample_norm, self.norm),
+        )
+        accept_step = (error_ratio <= 1) & (dt <= self.max_step) | (dt <= self.min_step)
+        self.hooks.fire("step", t0, t1, accept_step, paddle.ones_like(accept_step))
+        dt_next = self._propose_step(dt, error_ratio, accept_step, index=active)
+        dt_next = dt_next.clip(self.min_step, self.max_step)
+
+        interp_coeff = self._interp_fit(y0, y1, f0, f1, k, _per_sample(dt, y0))
+        accept_y = _per_sample(accept_step, y0)
+        interp_coeff = [
+            paddle.where(accept_y, c1, paddle.gather(c0, active))
+            for c0, c1 in zip(rk_state.interp_coeff, interp_coeff)
+        ]
+        t0_next = paddle.where(accept_step, t0, paddle.gather(rk_state.t0, active))
+
+        n_stages = len(self.compiled_tableau.alpha)
+        accepted = accept_step.astype("int64")
+        for name, count in [
+            ("nfe", paddle.full_like(accepted, n_stages)),
+            ("n_accepted", accepted),
+            ("n_rejected", 1 - accepted),
+        ]:
+            self.sample_stats[name] = paddle.scatter_nd_add(
+                self.sample_stats[name], active.unsqueeze(-1), count
+            )
+
+        def _scatter(full, values):
+            return paddle.scatter(full, active, values)
+
+        return _RungeKuttaState(
+            _scatter(rk_state.y1, paddle.where(accept_y, y1, y0)),
+            _scatter(rk_state.f1, paddle.where(accept_y, f1, f0)),
+            _scatter(rk_state.t0, t0_next),
+            _scatter(rk_state.t1, paddle.where(accept_step, t1, t0)),
+            _scatter(rk_state.dt, dt_next),
+            [_scatter(c0, c1) for c0, c1 in zip(rk_state.interp_coeff, interp_coeff)],
+        )
+
+    def _step_cache(self):
+        """Sizes of the first accepted steps, cached per `xde.func` across solves, see
+        `func_cache`."""
+        return func_cache(_STEP_CACHES, self.xde.func)
+
+    def _step_cache_key(self):
+        return (
+            type(self),
+            tuple(self.y0.shape),
+            self.y0.dtype,
+            self.tolerances,
+            getattr(func_owner(self.xde.func), "training", None),
+        )
+
+    def _update_step_cache(self, accepted, dt):
+        """Cache the size of the first accepted step, drop a cached size rejected by the
+        first step."""
+        if accepted:
+            self._step_cache()[self._step_cache_key()] = dt.item()
+            self.first_accept_pending = False
+        elif self.warm_started:
+            self._step_cache().pop(self._step_cache_key(), None)
+            self.warm_started = False
+
+    def _propose_step(self, dt, error_ratio, accept_step, mask=None, index=None):
+        """Size of the step following a step of size `dt`, see `StepController.propose`."""
+        if self.controller is None:
+            return optimal_step_size(
+                dt, error_ratio, self.safety, self.ifactor, self.dfactor, self.order
+            )
+        return self.controller.propose(
+            dt, error_ratio, accept_step, self.order, mask=mask, index=index
+        )
+
+    def _interp_fit(self, y0, y1, f0, f1, k, dt):
+        """Fit an interpolating polynomial to the results of a Runge-Kutta step.
+
+        Solvers with a continuous extension `dense` use it, the coefficients of the
+        polynomial are then `y0` and the contractions of the stages with the rows of
+        `dense`, all computed by one matmul. The others fit a polynomial of order 4 to
+        the ends and the midpoint of the step, see `interp_fit`.
+        """
         dt = dt.astype(y0.dtype)
-        y_mid = y0 + paddle.sum(k * (dt * self.mid), axis=-1).reshape(y0.shape)
-        f0 = k[..., 0]
-        f1 = k[..., -1]
+        if self.compiled_tableau.dense is not None:
+            return [y0] + list(
+                (k.dot_slots(self.compiled_tableau.dense) * dt).unbind(0)
+            )
+        y_mid = y0 + k.dot_slots(self.compiled_tableau.mid) * dt
         return interp_fit(y0, y1, y_mid, f0, f1, dt)
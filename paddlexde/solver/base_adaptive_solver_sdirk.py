@@ -0,0 +1,246 @@
+import collections
+from typing import Union
+
+import paddle
+
+from ..utils.ode_utils import compute_error_ratio, hermite_fit, interp_evaluate
+from ..xde import BaseXDE
+from .base_adaptive_solver import AdaptiveSolver
+from .newton_krylov import Linearization, LinearSolver, make_linear_solver
+
+# Butcher tableau of a singly diagonally implicit method, `beta[i]` being the row i of the
+# lower triangular matrix, whose diagonal is `gamma`, or 0 for an explicit first stage.
+_SDIRKTableau = collections.namedtuple(
+    "_SDIRKTableau", "gamma, alpha, beta, c_sol, c_error"
+)
+
+# a step size proposal in [1, _HOLD_STEP] times the current one keeps the current step
+# size, and thus the factorization of the Newton matrix
+_HOLD_STEP = 1.2
+# the first Newton iteration has no rate yet, it is estimated from the previous ones
+_MIN_ETA = 1e-4
+
+
+class AdaptiveSDIRKSolver(AdaptiveSolver):
+    order: int
+    tableau: _SDIRKTableau
+
+    def __init__(
+        self,
+        xde: BaseXDE,
+        y0: paddle.Tensor,
+        rtol: Union[float, paddle.Tensor],
+        atol: Union[float, paddle.Tensor],
+        first_step=None,
+        min_step=0.0,
+        max_step=float("inf"),
+        safety=0.9,
+        ifactor=5.0,
+        dfactor=0.2,
+        max_num_steps=2**31 - 1,
+        linear_solver: Union[str, LinearSolver] = "dense",
+        max_newton=7,
+        newton_tol=0.03,
+        jacobian_rate=0.1,
+        dtype=paddle.float32,
+        **kwargs
+    ):
+        """Adaptive singly diagonally implicit Runge-Kutta solver for stiff problems.
+
+        Every stage solves `Y = base + dt * gamma * f(t, Y)` by simplified Newton
+        iterations, whose matrix `I - dt * gamma * J` is the same for all the stages. The
+        Jacobian `J` is kept across the steps while the iterations converge fast, see
+        `jacobian_rate`, and the step size is kept when the proposal is at most
+        `_HOLD_STEP` times larger, so the matrix is rarely factorized again. A failed
+        Newton iteration updates a Jacobian from previous steps, or halves the step. The
+        embedded error estimate is filtered by the Newton matrix, which keeps it bounded
+        on the stiff components, and the solution between the steps is a cubic Hermite
+        interpolation.
+
+        :param linear_solver: "dense" for the LU factorization of the Jacobian of every
+                    sample, "krylov" for matrix-free GMRES with Jacobian-vector products,
+                    or a `LinearSolver`, see `newton_krylov.py`. "dense" assumes that the
+                    samples (axis 0 of `y0`) are independent.
+        :param max_newton: maximum number of Newton iterations per stage.
+        :param newton_tol: tolerance of the Newton iterations, relative to the error
+                    tolerance of the step.
+        :param jacobian_rate: the Jacobian is evaluated again after an accepted step whose
+                    Newton iterations contracted slower than this rate.
+        """
+        super(AdaptiveSDIRKSolver, self).__init__(xde=xde, dtype=dtype, y0=y0, **kwargs)
+
+        self.rtol = paddle.to_tensor(rtol, dtype=y0.dtype)
+        self.atol = paddle.to_tensor(atol, dtype=y0.dtype)
+        self.first_step = first_step
+        self.min_step = float(min_step)
+        self.max_step = float(max_step)
+        self.safety = float(safety)
+        self.ifactor = float(ifactor)
+        self.dfactor = float(dfactor)
+        self.max_num_steps = max_num_steps
+        self.linear_solver = make_linear_solver(linear_solver)
+        self.max_newton = int(max_newton)
+        self.newton_tol = float(newton_tol)
+        self.jacobian_rate = float(jacobian_rate)
+
+        beta = self.tableau.beta
+        # the last stage is the solution, and its derivative the one at the end
+        self.stiffly_accurate = tuple(beta[-1]) == tuple(self.tableau.c_sol)
+
+    def _before_integrate(self, t_span):
+        t0 = t_span[0]
+        f0 = self.move(t0, t_span[1] - t_span[0], self.y0)
+        if self.first_step is None:
+            first_step = self.select_initial_step(
+                t0, self.y0, self.order - 1, self.rtol, self.atol, f0=f0
+            )
+        else:
+            first_step = self.first_step
+        self.restart(t0, self.y0, f0, first_step)
+
+    def restart(self, t0, y0, f0, dt):
+        """Start the steps from the state `y0` at `t0`, with the derivative `f0` and the
+        first step size `dt`, the Jacobian is evaluated at the state."""
+        # the last accepted step goes from (t0, y0) to (t1, y1), with the derivative f1
+        # at its end and the interpolation coefficients `interp_coeff`
+        self.t0 = self.t1 = float(t0)
+        self.y1, self.f1 = y0, f0
+        self.interp_coeff = None
+        self.dt = None
+        self.dt_next = min(float(dt), self.max_step)
+        # Newton convergence: estimate of the rate for the first iteration, and slowest
+        # rate of the current step
+        self.eta = 1.0
+        self.theta = 0.0
+        self._update_jacobian(paddle.to_tensor(self.t1, dtype=self.dtype), y0)
+
+    def _update_jacobian(self, t, y):
+        self.linear_solver.update(Linearization(self.move, t, self.dt_next, y))
+        self.jacobian_fresh = True
+
+    def step(self, next_t):
+        """Interpolate through the next time point, integrating as necessary."""
+        n_steps = 0
+        while float(next_t) > self.t1:
+            assert (
+                n_steps < self.max_num_steps
+            ), "max_num_steps exceeded ({}>={})".format(n_steps, self.max_num_steps)
+            self._adaptive_step()
+            n_steps += 1
+        if float(next_t) == self.t1:
+            return self.y1
+        return interp_evaluate(
+            self.interp_coeff,
+            paddle.to_tensor(self.t0, dtype=self.dtype),
+            paddle.to_tensor(self.t1, dtype=self.dtype),
+            next_t,
+        )
+
+    def _adaptive_step(self):
+        """Take an adaptive step, the state is left unchanged if it is rejected."""
+        dt = self.dt_next
+        t0, y0, f0 = self.t1, self.y1, self.f1
+        t1 = t0 + dt
+        assert t1 > t0, "underflow in dt {}".format(dt)
+        self.linear_solver.factorize(dt * self.tableau.gamma)
+
+        ########################################################
+        #                  Implicit Stages                     #
+        ########################################################
+        self.theta = 0.0
+        result = self._sdirk_step(t0, y0, f0, dt)
+        if result is None:
+            # Newton failed, update the Jacobian first, then shrink the step
+            self.hooks.fire("step", t0, t1, False, True)
+            if self.jacobian_fresh:
+                self.dt_next = max(0.5 * dt, self.min_step)
+            else:
+                self._update_jacobian(paddle.to_tensor(t0, dtype=self.dtype), y0)
+            return
+        y1, f1, error = result
+
+        ########################################################
+        #                     Error Ratio                      #
+        ########################################################
+        error_ratio = compute_error_ratio(
+            error, self.rtol, self.atol, y0, y1, self.norm
+        ).item()
+        factor = self._step_factor(error_ratio)
+        if error_ratio > 1 and dt > self.min_step:
+            self.hooks.fire("step", t0, t1, False, True)
+            self.dt_next = max(dt * factor, self.min_step)
+            return
+
+        ########################################################
+        #                    Accept Step                       #
+        ########################################################
+        self.hooks.fire("step", t0, t1, True, True)
+        self.interp_coeff = hermite_fit(y0, y1, f0, f1, dt)
+        self.t0, self.t1 = t0, t1
+        self.y1, self.f1 = y1, f1
+        self.dt = dt
+        if not 1.0 <= factor <= _HOLD_STEP:
+            self.dt_next = min(max(dt * factor, self.min_step), self.max_step)
+        self.jacobian_fresh = False
+        if self.theta > self.jacobian_rate:
+            self._update_jacobian(paddle.to_tensor(t1, dtype=self.dtype), y1)
+
+    def _sdirk_step(self, t0, y0, f0, dt):
+        """Solve the stages of a step, returns `(y1, f1, error)`, or None if a Newton
+        iteration fails."""
+        tableau = self.tableau
+        dt_gamma = dt * tableau.gamma
+        scale = self.atol + self.rtol * y0.abs()
+        k = []
+        y = y0
+        for alpha_i, beta_i in zip(tableau.alpha, tableau.beta):
+            if beta_i[-1] == 0:
+                # explicit first stage
+                k.append(f0)
+                continue
+            dy = sum(b * k_j for b, k_j in zip(beta_i[:-1], k) if b != 0)
+            base = y0 if len(k) == 0 else self.fuse(dy, dt, y0)
+            t = paddle.to_tensor(t0 + alpha_i * dt, dtype=self.dtype)
+            # predict with the derivative of the previous stage
+            y = self._newton(t, dt, base + dt_gamma * (k[-1] if k else f0), base, scale)
+            if y is None:
+                return None
+            k.append((y - base) / dt_gamma)
+
+        if self.stiffly_accurate:
+            y1, f1 = y, k[-1]
+        else:
+            dy = sum(b * k_j for b, k_j in zip(tableau.c_sol, k) if b != 0)
+            y1 = self.fuse(dy, dt, y0)
+            f1 = self.move(paddle.to_tensor(t0 + dt, dtype=self.dtype), dt, y1)
+        error = sum(e * k_j for e, k_j in zip(tableau.c_error, k) if e != 0) * dt
+        return y1, f1, self.linear_solver.solve(error)
+
+    def _newton(self, t, dt, y, base, scale):
+        """Solve `y = base + dt * gamma * f(t, y)` from the guess `y`, None if the
+        iterations diverge or do not converge in `max_newton` iterations."""
+        dt_gamma = dt * self.tableau.gamma
+        eta = max(self.eta, _MIN_ETA) ** 0.8
+        delta_norm_prev = None
+        for _ in range(self.max_newton):
+            residual = base + dt_gamma * self.move(t, dt, y) - y
+            delta = self.linear_solver.solve(residual)
+            y = y + delta
+            delta_norm = float(self.norm(delta / scale))
+            if delta_norm_prev is not None:
+                theta = delta_norm / delta_norm_prev
+                self.theta = max(self.theta, theta)
+                if theta >= 1:
+                    return None
+                eta = theta / (1 - theta)
+            if eta * delta_norm <= self.newton_tol:
+                self.eta = eta
+                return y
+            delta_norm_prev = delta_norm
+        return None
+
+    def _step_factor(self, error_ratio):
+        if error_ratio == 0:
+            return self.ifactor
+        factor = self.safety * error_ratio ** (-1.0 / self.order)
+        return min(self.ifactor, max(self.dfactor, factor))
@@ -1,14 +1,81 @@
 import abc
+import bisect
+import collections
+import functools
+import math
+import weakref
 from typing import Union
 
 import paddle
+from paddle import nn
 
-from ..interpolation.functional import cubic_hermite_interp, linear_interp
+from ..interpolation.functional import cubic_hermite_interp
+from ..utils.checkpoint import CheckpointFunction
+from ..utils.misc import func_cache, func_owner
+from ..xde.base_ode import BaseODE
 from ..xde.base_xde import BaseXDE
+from .history_buffer import HistoryBuffer
+from .solution_buffer import SolutionBuffer
+from .solver_stats import _EVENTS, SolverHooks
+
+# programs of `_static_integrate`, per `xde.func`
+_STATIC_CACHES = weakref.WeakKeyDictionary()
+
+_FixedTableau = collections.namedtuple("_FixedTableau", "alpha, beta, c_sol")
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_tableau(tableau, dtype, place):
+    """Prepare a `_ButcherTableau` for `FixedSolver._runge_kutta_step`, once per tableau,
+    dtype and place.
+
+    The nodes are converted to python floats, and every row of coefficients to the
+    `(indices, weights)` of its nonzero entries. `weights` is a python float for a single
+    entry, and otherwise a zero-padded [n_stages] Tensor of `dtype` on `place` with the
+    weight of stage j in slot j of the stage buffer, see `HistoryBuffer.dot_slots`. Zero
+    coefficients are thus skipped by single-entry rows.
+    """
+    n_stages = len(tableau.alpha) + 1
+
+    def _row(coeffs):
+        coeffs = [float(c) for c in coeffs]
+        indices = [j for j, c in enumerate(coeffs) if c != 0]
+        if len(indices) == 1:
+            return indices, coeffs[indices[0]]
+        return indices, paddle.to_tensor(
+            coeffs + [0.0] * (n_stages - len(coeffs)), dtype=dtype, place=place
+        )
+
+    return _FixedTableau(
+        alpha=[float(a) for a in tableau.alpha],
+        beta=[_row(beta_i) for beta_i in tableau.beta],
+        c_sol=_row(tableau.c_sol),
+    )
+
+
+class _StaticIntegrator(nn.Layer):
+    """Wrap `FixedSolver._integrate` in a Layer, so it can be traced by `paddle.jit.to_static`."""
+
+    def __init__(self, solver, schedule):
+        super(_StaticIntegrator, self).__init__()
+        self.solver = solver
+        self.schedule = schedule
+
+    def forward(self, y0, time_grid, t_span):
+        return self.solver._integrate(y0, time_grid, t_span, self.schedule)
+
+
+class _SegmentBuffer:
+    """Collect the outputs of a checkpointed segment, with the writing API of `SolutionBuffer`."""
+
+    def __init__(self):
+        self.ys = []
+
+    def write(self, i, y):
+        self.ys.append(y.unsqueeze(0))
 
-_one_third = 1 / 3
-_two_thirds = 2 / 3
-_one_sixth = 1 / 6
+    def write_many(self, indices, ys):
+        self.ys.append(ys)
 
 
 class FixedSolver(metaclass=abc.ABCMeta):
@@ -22,6 +89,11 @@ class FixedSolver(metaclass=abc.ABCMeta):
         grid_constructor: object = None,
         interp: str = "linear",
         perturb: bool = False,
+        layout: str = "batch",
+        save_at: Union[list, paddle.Tensor] = None,
+        to_static: bool = False,
+        checkpoint_every: Union[int, str] = None,
+        checkpoint_params: list = None,
         **kwargs,
     ):
         """API for solvers with possibly adaptive time stepping.
@@ -33,6 +105,15 @@ class FixedSolver(metaclass=abc.ABCMeta):
         :param grid_constructor:
         :param interp: ["linear", "cubic"] for linear interpolation and cubic interpolation.
         :param perturb:
+        :param layout: ["batch", "time"], layout of the returned solution, see `SolutionBuffer`.
+        :param save_at: optional [pred_len] bool mask, only the marked time points are returned.
+        :param to_static: compile the whole integration loop with `paddle.jit.to_static` and
+                    reuse the program across calls, only supported for ODEs.
+        :param checkpoint_every: int or "auto", checkpoint the states every k steps and
+                    recompute the steps in between during backward, see `_checkpoint_segment_len`.
+        :param checkpoint_params: parameters to compute the gradients of through the
+                    checkpointed segments, those of the functions of `xde` by default,
+                    which must then be `nn.Layer`s or their bound methods.
         :param kwargs:
         """
         self.xde = xde
@@ -41,6 +122,15 @@ class FixedSolver(metaclass=abc.ABCMeta):
         self.step_size = step_size
         self.interp = interp
         self.perturb = perturb
+        self.layout = layout
+        self.save_at = save_at
+        self.to_static = to_static
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_params = checkpoint_params
+        if to_static and checkpoint_every is not None:
+            raise ValueError(
+                "to_static and checkpoint_every are mutually exclusive arguments."
+            )
 
         self.atol = kwargs["atol"]
         self.rtol = kwargs["rtol"]
@@ -61,6 +151,9 @@ class FixedSolver(metaclass=abc.ABCMeta):
 
         self.move = self.xde.move
         self.fuse = self.xde.fuse
+        # stage buffer of the Runge-Kutta steps, allocated by the first one
+        self.stages = None
+        self.hooks = SolverHooks()
         self.on_integrate_step_end = self.xde.on_integrate_step_end
 
     @staticmethod
@@ -78,30 +171,41 @@ class FixedSolver(metaclass=abc.ABCMeta):
             start_time = t[0]
             end_time = t[-1]
 
-            niters = paddle.ceil((end_time - start_time) / step_size + 1).item()
+            # tolerance avoids an extra zero-length step from rounding, e.g. 1.0 / 0.1
+            span = (end_time - start_time).item()
+            niters = max(math.ceil(abs(span) / float(step_size) - 1e-8), 1)
             t_infer = (
-                paddle.arange(0, niters, dtype=t.dtype) * step_size + start_time
-            )  # todo
-            t_infer[-1] = t[-1]
+                paddle.arange(0, niters + 1, dtype=t.dtype)
+                * math.copysign(float(step_size), span)
+                + start_time
+            )
+            t_infer[-1] = end_time
 
             return t_infer
 
         return _grid_constructor
 
     @abc.abstractmethod
-    def step(self, t0, t1, y0):
+    def step(self, t0, t1, y0, f0=None):
         """Propose a step with step size from time t to time next_t, with
          current state y.
 
         :param t0: [1]
         :param t1: [1]
         :param y0: [B, 1, D]
-        :return:
+        :param f0: [B, 1, D], optional derivative at (t0, y0), reused as the first stage
+                    instead of evaluating `move` again (first same as last).
+        :return: (y1, f0), state at t1 and derivative at (t0, y0).
         """
         raise NotImplementedError
 
     def integrate(self, t_span: paddle.Tensor):
-        """_summary_
+        """Integrate along the time grid and interpolate the solution onto `t_span`.
+
+        The time grid may be finer than `t_span` (e.g. built from `step_size`), several
+        internal steps are then taken between two output times. All the output times
+        falling into one internal step are evaluated at once. The number of internal
+        steps is recorded in `self.n_steps`.
 
         Args:
             t_span (paddle.Tensor): [pred_len]
@@ -113,85 +217,326 @@ class FixedSolver(metaclass=abc.ABCMeta):
             _type_: _description_
         """
 
-        pred_len = len(t_span)
         time_grid = self.grid_constructor(self.y0, t_span)
         # time_grid = t_span
         assert paddle.equal_all(time_grid[0], t_span[0])
         assert paddle.equal_all(time_grid[-1], t_span[-1])
 
-        # sol solution pred_len * [batch_size, 1, dims]
-        sol = [self.y0]
-        y0 = self.y0
-
-        for i in range(1, pred_len):
-            t0, t1 = time_grid[i - 1 : i], time_grid[i : i + 1]
-            y1, dy0 = self.step(t0, t1, y0)
-
-            # while j < pred_len and paddle.greater_equal(t1, t_span[..., j]):
-            if self.interp == "linear":
-                sol.append(linear_interp(t0, t1, y0, y1, t_span[i : i + 1]))
-            elif self.interp == "cubic":
-                y2, dy1 = self.step(t1, t1, y1)
-                sol.append(
-                    cubic_hermite_interp(t0, y0, dy0, t1, y1, dy1, t_span[i : i + 1])
-                )
+        # one host sync for both, then all the bookkeeping is done on python floats
+        schedule = self._make_schedule(time_grid.tolist(), t_span.tolist())
+        self.n_steps = len(schedule)
+        self.move = self.hooks.wrap_move(self.xde.move)
+
+        if self.to_static:
+            return self._static_integrate(self.y0, time_grid, t_span, schedule)
+        return self._integrate(self.y0, time_grid, t_span, schedule)
+
+    def _make_schedule(self, grid_list, t_list):
+        """Assign the saved output times to the internal steps of the grid.
+
+        Returns:
+            tuple: one `(outputs, on_grid)` entry per step, `outputs` are the indices of the
+                saved output times in (grid[i - 1], grid[i]], `on_grid` is True if the only
+                output is exactly grid[i], thus no interpolation is needed.
+        """
+        save_at = SolutionBuffer.as_mask(self.save_at, len(t_list))
+        step_index = self._locate_in_grid(grid_list, t_list)
+
+        schedule = []
+        j = 1
+        for i in range(1, len(grid_list)):
+            j_end = j
+            while j_end < len(t_list) and step_index[j_end] <= i:
+                j_end += 1
+            outputs = tuple(k for k in range(j, j_end) if save_at[k])
+            on_grid = len(outputs) == 1 and t_list[outputs[0]] == grid_list[i]
+            schedule.append((outputs, on_grid))
+            j = j_end
+        return tuple(schedule)
+
+    def _integrate(self, y0, time_grid, t_span, schedule):
+        """Integrate along `time_grid` following the `schedule` of `_make_schedule`.
+
+        Only tensors passed as arguments are used, so the method can be traced by
+        `paddle.jit.to_static`, see `_static_integrate`.
+        """
+        # sol solution [batch_size, pred_len, dims] for "batch" layout
+        sol = SolutionBuffer(y0, len(t_span), layout=self.layout, save_at=self.save_at)
+        sol.write(0, y0)
+
+        every = self._checkpoint_segment_len(len(schedule), y0)
+        if every is None:
+            self._run_steps(y0, time_grid, t_span, schedule, 0, len(schedule), sol)
+            return sol.finalize()
+
+        params = self._checkpoint_params()
+        for start in range(0, len(schedule), every):
+            stop = min(start + every, len(schedule))
+            indices = [k for outputs, _ in schedule[start:stop] for k in outputs]
+            history = self._get_history()
+
+            def run_fn(y0, time_grid, t_span, *history, start=start, stop=stop):
+                self._set_history(history)
+                seg = _SegmentBuffer()
+                # run_fn is called under no_grad in forward, and with gradient when the
+                # segment is recomputed in backward, whose steps were already reported
+                if paddle.is_grad_enabled():
+                    with self.hooks.suspend():
+                        y1 = self._run_steps(
+                            y0, time_grid, t_span, schedule, start, stop, seg
+                        )
+                else:
+                    y1 = self._run_steps(
+                        y0, time_grid, t_span, schedule, start, stop, seg
+                    )
+                ys = () if len(seg.ys) == 0 else (paddle.concat(seg.ys),)
+                return (y1, *ys, *self._get_history())
+
+            inputs = (y0, time_grid, t_span, *history)
+            outputs = CheckpointFunction.apply(run_fn, len(inputs), *inputs, *params)
+            y0 = outputs[0]
+            if len(indices) > 0:
+                sol.write_many(indices, outputs[1])
+            self._set_history(outputs[1 + int(len(indices) > 0) :])
+
+        return sol.finalize()
+
+    def _run_steps(self, y0, time_grid, t_span, schedule, start, stop, sol):
+        """Take the steps `start + 1, ..., stop` of the schedule and write the outputs
+        into `sol`, returns the state at the end of the last step."""
+        f0 = None
+        for i in range(start + 1, stop + 1):
+            y0, f0 = self._take_step(i, y0, f0, time_grid, t_span, schedule, sol)
+        return y0
+
+    def _take_step(self, i, y0, f0, time_grid, t_span, schedule, sol):
+        """Take the step i of the schedule from `y0` and write its outputs into `sol`.
+
+        :param f0: optional derivative at (t0, y0), see `step`.
+        :return: (y1, f1), state at the end of the step, and the derivative there to be
+                    reused by the next step, or None.
+        """
+        outputs, on_grid = schedule[i - 1]
+        t0, t1 = time_grid[i - 1 : i], time_grid[i : i + 1]
+        y1, f0 = self.step(t0, t1, y0, f0=f0)
+        self.hooks.fire("step", t0, t1, True, True)
+        f1 = None
+
+        if on_grid:
+            # output time is on the grid, no interpolation needed
+            sol.write(outputs[0], y1)
+        elif len(outputs) > 0:
+            if outputs[-1] - outputs[0] + 1 == len(outputs):
+                t_out = t_span[outputs[0] : outputs[-1] + 1]
             else:
-                sol.append(y1)
+                t_out = paddle.gather(t_span, paddle.to_tensor(outputs))
+            if self.interp == "cubic":
+                f1 = self._end_derivative(t0, t1, y1)
+            sol.write_many(outputs, self._dense_output(t0, t1, y0, y1, f0, f1, t_out))
+
+        # first same as last: the derivative at the end of this step is the first
+        # stage of the next one, None lets the next step evaluate it.
+        return y1, f1 if self.xde.fsal else None
+
+    def _checkpoint_segment_len(self, n_steps, y0):
+        """Number of steps per checkpointed segment, None if checkpointing is not used.
+
+        Only the states at the segment boundaries are kept for backward, and the steps of a
+        segment are recomputed when its gradient is needed. With k steps per segment, about
+        n_steps / k states plus the activations of k steps are alive at once, for one extra
+        forward pass. "auto" takes k = ceil(sqrt(n_steps)), which minimizes the sum. The
+        choice is recorded in `self.checkpoint_info`.
+        """
+        self.checkpoint_info = None
+        if self.checkpoint_every is None or not paddle.is_grad_enabled():
+            return None
+        if self.checkpoint_every == "auto":
+            every = max(math.ceil(math.sqrt(n_steps)), 1)
+        else:
+            every = int(self.checkpoint_every)
+
+        n_segments = math.ceil(n_steps / every)
+        self.checkpoint_info = {
+            "checkpoint_every": every,
+            "segments": n_segments,
+            # states kept alive between forward and backward
+            "stored_states": n_segments,
+            # steps whose activations are alive at once during backward
+            "live_steps": min(every, n_steps),
+            # steps run again during backward, i.e. one extra forward pass
+            "recomputed_steps": n_steps,
+        }
+        return every
+
+    def _checkpoint_params(self):
+        """Parameters passed to `CheckpointFunction`, the only ones whose gradients flow
+        through the recomputed segments."""
+        if self.checkpoint_params is not None:
+            params = list(self.checkpoint_params)
+        else:
+            params = list(self.xde.parameters())
+            for name in ["func", "f", "g"]:
+                fn = getattr(self.xde, name, None)
+                if fn is None or isinstance(fn, nn.Layer):
+                    continue
+                owner = func_owner(fn)
+                if not isinstance(owner, nn.Layer):
+                    raise ValueError(
+                        "checkpoint_every needs the {} of the xde to be an instance of "
+                        "nn.Layer or a bound method of one, to find its parameters; "
+                        "alternatively they can be specified explicitly via the "
+                        "`checkpoint_params` option.".format(name)
+                    )
+                params += owner.parameters()
+        unique = {id(p): p for p in params if not p.stop_gradient}
+        return list(unique.values())
+
+    def _get_history(self):
+        """Tensors carried from one step to the next by multistep solvers, which must be
+        passed across checkpointed segments."""
+        return ()
+
+    def _set_history(self, history):
+        pass
+
+    def _static_integrate(self, y0, time_grid, t_span, schedule):
+        """Run `_integrate` compiled into one static program.
+
+        The whole loop, including `move` and `fuse`, is traced by `paddle.jit.to_static`
+        on the first call. Programs are cached per `xde.func`, see `func_cache`, and reused by later solves
+        with the same solver, options, schedule, `save_at` mask and input shapes and
+        dtypes, the cached program being rebound to the current solver. Hooks only fire
+        while a program is traced, thus a solver with hooks registered, e.g. recording a
+        `SolverStats`, traces a program of its own, which is not cached.
+        """
+        if not isinstance(self.xde, BaseODE):
+            raise ValueError("to_static is only supported for ODEs.")
 
-            y0 = y1
+        func = self.xde.func
+        owner = func_owner(func)
+        cache = func_cache(_STATIC_CACHES, func)
 
-        sol = paddle.concat(sol, axis=-2)
+        save_at = tuple(SolutionBuffer.as_mask(self.save_at, len(t_span)))
+        buffer_shape = list(y0.shape)
+        if self.layout == "batch":
+            buffer_shape[-2] *= sum(save_at)
+        else:
+            buffer_shape.insert(0, sum(save_at))
+        key = (
+            type(self),
+            self.interp,
+            self.layout,
+            getattr(owner, "training", None),
+            schedule,
+            save_at,
+            tuple(buffer_shape),
+            tuple(y0.shape),
+            y0.dtype,
+            tuple(t_span.shape),
+            t_span.dtype,
+        )
+        with_hooks = any(self.hooks.has(event) for event in _EVENTS)
+        if key in cache and not with_hooks:
+            integrator, static_fn = cache[key]
+            integrator.solver = self
+            sol = static_fn(y0, time_grid, t_span)
+            # the cache must not keep `func` alive through the solver
+            integrator.solver = None
+            return sol
+
+        # Tracing replaces the forward of every layer it goes through by its converted
+        # version, keep the original ones so that eager calls of `func` do not pay for it.
+        layers = (
+            owner.sublayers(include_self=True) if isinstance(owner, nn.Layer) else []
+        )
+        forwards = [layer.__dict__.get("forward") for layer in layers]
+
+        integrator = _StaticIntegrator(self, schedule)
+        static_fn = paddle.jit.to_static(integrator, full_graph=True)
+        sol = static_fn(y0, time_grid, t_span)
+        integrator.solver = None
+        if not with_hooks:
+            cache[key] = (integrator, static_fn)
+
+        for layer, forward in zip(layers, forwards):
+            if forward is None:
+                layer.__dict__.pop("forward", None)
+            else:
+                layer.__dict__["forward"] = forward
         return sol
 
-    def rk4_step_func(self, t0, t1, y0, f0=None):
-        dt = t1 - t0
-        half_dt = dt * 0.5
-        t_half = t0 + half_dt
-
-        k1 = f0
-        if k1 is None:
-            k1 = self.move(t0, dt, y0)
-
-        k2 = self.move(t_half, half_dt, self.fuse(k1, half_dt, y0))
-        k3 = self.move(t_half, half_dt, self.fuse(k2, half_dt, y0))
-        k4 = self.move(t1, half_dt, self.fuse(k3, dt, y0))
-
-        return (
-            self.fuse(k1, dt, y0)
-            + 2 * self.fuse(k2, dt, y0)
-            + 2 * self.fuse(k3, dt, y0)
-            + self.fuse(k4, dt, y0)
-        ) * _one_sixth
-
-    def rk4_alt_step_func(self, t0, t1, y0, f0=None):
-        """Smaller error with slightly more compute."""
-        dt = t1 - t0
-
-        dt_one_third = dt * _one_third
-        dt_two_thirds = dt * _two_thirds
+    @staticmethod
+    def _locate_in_grid(grid_list, t_list):
+        """For every time in `t_list`, find the index i of the grid step (grid[i - 1], grid[i]]
+        containing it. Both lists are monotonic in the same direction."""
+        sign = 1.0 if grid_list[-1] >= grid_list[0] else -1.0
+        grid_list = [sign * g for g in grid_list]
+        return [
+            min(bisect.bisect_left(grid_list, sign * t), len(grid_list) - 1)
+            for t in t_list
+        ]
+
+    def _end_derivative(self, t0, t1, y1):
+        """Derivative at (t1, y1). For an xde supporting first same as last it is
+        evaluated like the first stage of the next step, so it can be reused there."""
+        if self.xde.fsal:
+            return self.move(t1, t1 - t0, y1)
+        return self.move(t1, paddle.zeros_like(t1), y1)
+
+    def _dense_output(self, t0, t1, y0, y1, f0, f1, t):
+        """Evaluate the interpolation of one step at several times.
+
+        :param t: [K] Tensor of times in [t0, t1].
+        :return: [K, *y0.shape] Tensor of states.
+        """
+        t = t.reshape([-1] + [1] * len(y0.shape))
+        if self.interp == "linear":
+            return y0 + (t - t0) / (t1 - t0) * (y1 - y0)
+        elif self.interp == "cubic":
+            return cubic_hermite_interp(t0, y0, f0, t1, y1, f1, t)
+        else:
+            return paddle.expand(y1.unsqueeze(0), [t.shape[0], *y1.shape])
 
-        t_one_third = t0 + dt_one_third
-        t_two_thirds = t0 + dt_two_thirds
+    def _runge_kutta_step(self, t0, t1, y0, f0, tableau):
+        """Take an explicit Runge-Kutta step described by a tableau of `_compile_tableau`.
 
-        k1 = f0
-        if k1 is None:
-            k1 = self.move(t0, dt, y0)
+        The stages are written into a preallocated stage-major buffer, stage j in slot j,
+        as in `AdaptiveRKSolver`. Every stage state and the solution are built by a single
+        `fuse` of the combined derivative, the combination of several stages being one
+        contraction of the buffer with the weights of the row.
 
-        k2 = self.move(t_one_third, dt_one_third, self.fuse(k1, dt_one_third, y0))
-        k3 = self.move(
-            t_two_thirds,
-            dt_one_third,
-            self.fuse(k1 - k2 * _one_third, dt, y0),
-        )
-        k4 = self.move(
-            t1,
-            t_one_third,
-            self.fuse(k1 - k2 + k3, dt, y0),
-        )
+        :param f0: [B, 1, D], optional derivative at (t0, y0), used as the first stage.
+        :return: (y1, f0), state at t1 and derivative at (t0, y0).
+        """
+        dt = t1 - t0
+        if f0 is None:
+            f0 = self.move(t0, dt, y0)
+
+        n_stages = len(tableau.alpha) + 1
+        if self.stages is None or self.stages.capacity != n_stages:
+            self.stages = HistoryBuffer(n_stages)
+        k = self.stages
+        k.reset()
+        k.push(f0)
+        stages = [f0]
+        for alpha_i, beta_i in zip(tableau.alpha, tableau.beta):
+            # Always step to the end time for the last node, in case of rounding.
+            ti = t1 if alpha_i == 1.0 else t0 + alpha_i * dt
+            yi = self.fuse(self._combine_stages(k, stages, beta_i), dt, y0)
+            stages.append(self.move(ti, dt, yi))
+            k.push(stages[-1])
+
+        y1 = self.fuse(self._combine_stages(k, stages, tableau.c_sol), dt, y0)
+        return y1, f0
 
-        return (
-            self.fuse(k1, dt, y0)
-            + 3 * self.fuse(k2, dt, y0)
-            + 3 * self.fuse(k3, dt, y0)
-            + self.fuse(k4, dt, y0)
-        ) * 0.125
+    @staticmethod
+    def _combine_stages(k, stages, row):
+        """Weighted sum of the stages with the nonzero coefficients `row` of a tableau,
+        `k` being the stage buffer and `stages` the list of the same stages."""
+        indices, weights = row
+        if len(indices) == 0:
+            return paddle.zeros_like(stages[0])
+        if len(indices) == 1:
+            j = indices[0]
+            return stages[j] if weights == 1.0 else stages[j] * weights
+        return k.dot_slots(weights)
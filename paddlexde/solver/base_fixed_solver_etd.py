@@ -0,0 +1,212 @@
+import math
+from typing import Union
+
+import paddle
+
+from ..xde.base_ode import BaseODE
+from ..xde.base_xde import BaseXDE
+from .base_fixed_solver import FixedSolver
+
+_PHI_MODES = ("expm", "krylov")
+
+# the scaled matrix of `_expm` has a norm below this, where the Pade approximant of
+# degree 6 is accurate to double precision
+_EXPM_MAX_NORM = 0.5
+_PADE_DEGREE = 6
+
+
+def _expm(matrix: paddle.Tensor) -> paddle.Tensor:
+    """Exponential of a [..., n, n] Tensor of matrices, by scaling and squaring of a
+    diagonal Pade approximant, differentiable by autograd."""
+    norm = float(matrix.abs().sum(axis=-1).max())
+    squarings = max(0, math.ceil(math.log2(norm / _EXPM_MAX_NORM))) if norm > 0 else 0
+    x = matrix / 2.0**squarings
+
+    eye = paddle.eye(matrix.shape[-1], dtype=matrix.dtype).expand_as(matrix)
+    q = _PADE_DEGREE
+    numerator, denominator, x_power, c = eye, eye, eye, 1.0
+    for k in range(1, q + 1):
+        c = c * (q - k + 1) / (k * (2 * q - k + 1))
+        x_power = paddle.matmul(x_power, x)
+        numerator = numerator + c * x_power
+        denominator = denominator + (-1) ** k * c * x_power
+    result = paddle.linalg.solve(denominator, numerator)
+    for _ in range(squarings):
+        result = paddle.matmul(result, result)
+    return result
+
+
+class ExponentialSolver(FixedSolver):
+    """Fixed-step exponential time differencing solver for semi-linear ODEs.
+
+    The ODE `dy/dt = func(t, y)` is split into `A y + N(t, y)`, the linear operator `A`
+    being given separately and `N = func - A y`. The linear part is integrated exactly by
+    the phi-functions `phi_0(z) = exp(z)`, `phi_k(z) = (phi_{k-1}(z) - 1 / (k-1)!) / z`
+    of `dt * A`, thus the step size is not limited by the stiffness of `A`.
+
+    Subclasses set `order`, `n_phi`, the highest phi-function used, and `step`.
+    """
+
+    order: int
+    n_phi: int
+
+    def __init__(
+        self,
+        xde: BaseXDE,
+        y0: paddle.Tensor,
+        linear_operator: Union[paddle.Tensor, callable] = None,
+        phi: str = "expm",
+        krylov_dim: int = 20,
+        **kwargs
+    ):
+        """
+        :param linear_operator: [D, D] Tensor `A` applied to the last axis of the state,
+                    i.e. `y @ A^T`, or a callable returning `A y` for a state `y` and
+                    acting on every sample (axis 0) separately, which needs "krylov".
+        :param phi: "expm" for the phi-functions of `dt * A` as [D, D] matrices, computed
+                    from one matrix exponential and cached per step size for a solve,
+                    "krylov" for their products with the vectors, from an Arnoldi
+                    decomposition of `A` per sample and vector.
+        :param krylov_dim: size of the Krylov subspaces of "krylov".
+        """
+        super(ExponentialSolver, self).__init__(xde=xde, y0=y0, **kwargs)
+        if not isinstance(xde, BaseODE):
+            raise ValueError("the exponential solvers only support ODEs.")
+        if self.to_static:
+            raise ValueError("to_static is not supported by the exponential solvers.")
+        if linear_operator is None:
+            raise ValueError("linear_operator must be given.")
+        if phi not in _PHI_MODES:
+            raise ValueError(
+                "phi must be one of {}, but got {}.".format(_PHI_MODES, phi)
+            )
+        if phi == "expm" and not isinstance(linear_operator, paddle.Tensor):
+            raise ValueError("phi='expm' needs linear_operator as a Tensor.")
+
+        self.linear_operator = linear_operator
+        self.phi = phi
+        self.krylov_dim = int(krylov_dim)
+        # phi-functions of the step sizes, kept for one solve
+        self.phi_cache = {}
+
+    def integrate(self, t_span: paddle.Tensor):
+        self.phi_cache = {}
+        return super(ExponentialSolver, self).integrate(t_span)
+
+    def linear(self, y: paddle.Tensor) -> paddle.Tensor:
+        """`A y`."""
+        if isinstance(self.linear_operator, paddle.Tensor):
+            return paddle.matmul(y, self.linear_operator, transpose_y=True)
+        return self.linear_operator(y)
+
+    def nonlinear(self, t, dt, y, f=None):
+        """`N(t, y) = func(t, y) - A y`, from the derivative `f` if it is given."""
+        if f is None:
+            f = self.move(t, dt, y)
+        return f - self.linear(y)
+
+    def phi_products(self, v: paddle.Tensor, dts: list) -> list:
+        """`[[phi_0(dt * A) v, ..., phi_p(dt * A) v] for dt in dts]`, p being `n_phi`.
+
+        :param dts: python floats.
+        """
+        if self.phi == "expm":
+            products = []
+            for dt in dts:
+                # [p + 1, D, D] -> [p + 1, *v.shape]
+                phis = self._phi_matrices(dt)
+                phis = phis.reshape(
+                    [phis.shape[0]] + [1] * (len(v.shape) - 2) + phis.shape[1:]
+                )
+                products.append(
+                    paddle.unbind(paddle.matmul(v.unsqueeze(0), phis, transpose_y=True))
+                )
+            return products
+        return self._krylov_phi_products(v, dts)
+
+    def _phi_matrices(self, dt):
+        key = (dt, paddle.is_grad_enabled())
+        if key not in self.phi_cache:
+            a = self.linear_operator.astype(self.dtype)
+            n, p = a.shape[0], self.n_phi
+            # [[dt * A, I, 0], [0, 0, I], [0, 0, 0]] of (p + 1) x (p + 1) blocks, the first
+            # row of blocks of its exponential is [phi_0, phi_1, ..., phi_p] of dt * A
+            eye = paddle.eye(n, dtype=a.dtype)
+            zeros = paddle.zeros_like(eye)
+            rows = []
+            for i in range(p + 1):
+                row = [zeros] * (p + 1)
+                if i == 0:
+                    row[0] = dt * a
+                if i < p:
+                    row[i + 1] = eye
+                rows.append(paddle.concat(row, axis=1))
+            exp = _expm(paddle.concat(rows, axis=0))
+            self.phi_cache[key] = paddle.stack(
+                [exp[:n, k * n : (k + 1) * n] for k in range(p + 1)]
+            )
+        return self.phi_cache[key]
+
+    def _krylov_phi_products(self, v, dts):
+        batch_size = v.shape[0]
+        n = int(v.numel()) // batch_size
+        m = min(self.krylov_dim, n)
+        p = self.n_phi
+
+        def _dot(x, y):
+            return (x * y).reshape([batch_size, -1]).sum(axis=1)
+
+        def _scale(x, s):
+            return x * s.reshape([-1] + [1] * (len(x.shape) - 1))
+
+        # Arnoldi decomposition A V_m = V_m H_m + h_{m+1, m} v_{m+1} e_m^T of every sample
+        beta = _dot(v, v).sqrt()
+        nonzero = (beta > 0).astype(v.dtype)
+        basis = [_scale(v, nonzero / (beta + (1 - nonzero)))]
+        h = [[None] * m for _ in range(m)]
+        tol = float(paddle.finfo(v.dtype).eps) * n
+        for j in range(m):
+            w = self.linear(basis[j])
+            w_norm = _dot(w, w).sqrt()
+            for i in range(j + 1):
+                h[i][j] = _dot(w, basis[i])
+                w = w - _scale(basis[i], h[i][j])
+            if j + 1 < m:
+                h[j + 1][j] = _dot(w, w).sqrt()
+                # the Krylov subspace is invariant, the next vectors are set to 0
+                invariant = (h[j + 1][j] <= tol * w_norm).astype(v.dtype)
+                h[j + 1][j] = h[j + 1][j] * (1 - invariant)
+                basis.append(_scale(w, (1 - invariant) / (h[j + 1][j] + invariant)))
+        zeros = paddle.zeros([batch_size], dtype=v.dtype)
+        hessenberg = paddle.stack(
+            [paddle.stack([zeros if x is None else x for x in row], 1) for row in h], 1
+        )
+        # [b, m, *v.shape[1:]]
+        basis = paddle.stack(basis, axis=1)
+
+        # phi_k(dt * A) v = beta * V_m phi_k(dt * H_m) e_1, from the exponential of
+        # [[dt * H_m, e_1, 0], [0, 0, I], [0, 0, 0]] (Sidje, "Expokit", 1998)
+        size = m + p
+        products = []
+        for dt in dts:
+            augmented = paddle.zeros([batch_size, size, size], dtype=v.dtype)
+            augmented[:, :m, :m] = dt * hessenberg
+            augmented[:, 0, m] = 1.0
+            for k in range(1, p):
+                augmented[:, m + k - 1, m + k] = 1.0
+            exp = _expm(augmented)
+            # [b, m, p + 1], phi_0(dt * H_m) e_1 being the first column of exp(dt * H_m)
+            coeffs = paddle.concat([exp[:, :m, :1], exp[:, :m, m:]], axis=2)
+            coeffs = _scale(coeffs, beta)
+            products.append(
+                [
+                    (
+                        basis
+                        * coeffs[:, :, k].reshape(
+                            [batch_size, m] + [1] * (len(v.shape) - 1)
+                        )
+                    ).sum(axis=1)
+                    for k in range(p + 1)
+                ]
+            )
+        return products
@@ -0,0 +1,28 @@
+import paddle
+
+from ..xde import BaseXDE
+from .base_adaptive_solver_rk import _ButcherTableau
+from .base_fixed_solver import FixedSolver, _compile_tableau
+
+
+class FixedRKSolver(FixedSolver):
+    """Fixed-step explicit Runge-Kutta solver defined by its Butcher tableau.
+
+    Subclasses only set `order` and `tableau`, a `_ButcherTableau` whose `alpha` are the
+    nodes c_2, ..., c_s, `beta` the rows of the Runge-Kutta matrix and `c_sol` the weights
+    of the solution. `c_error` is not used.
+    """
+
+    order: int
+    tableau: _ButcherTableau
+
+    def __init__(self, xde: BaseXDE, y0: paddle.Tensor, **kwargs):
+        super(FixedRKSolver, self).__init__(xde=xde, y0=y0, **kwargs)
+
+        # Compiled once per tableau, dtype and place, and shared by the solvers
+        self.compiled_tableau = _compile_tableau(
+            self.tableau, y0.dtype, paddle.get_device()
+        )
+
+    def step(self, t0, t1, y0, f0=None):
+        return self._runge_kutta_step(t0, t1, y0, f0, self.compiled_tableau)
@@ -1,67 +1,161 @@
-import abc
+import multiprocessing
 
+import numpy as np
 import paddle
+import scipy.linalg
+import scipy.sparse
 from scipy.integrate import solve_ivp
 
+from .base_adaptive_solver import AdaptiveSolver
+from .newton_krylov import Linearization
+from .solution_buffer import SolutionBuffer
 
-class ScipyWrapperODESolver(metaclass=abc.ABCMeta):
+# methods of `solve_ivp` which use the Jacobian
+_JACOBIAN_METHODS = ("BDF", "Radau", "LSODA")
+
+# the solver of the worker processes, inherited from the parent at fork
+_WORKER_SOLVER = None
+
+
+class ScipyWrapperODESolver(AdaptiveSolver):
     def __init__(
         self,
-        func,
-        y0,
+        xde,
+        y0: paddle.Tensor,
         rtol,
         atol,
         min_step=0,
         max_step=float("inf"),
         solver="LSODA",
-        **unused_kwargs
+        vectorized=False,
+        jac=True,
+        sparse_jac=False,
+        processes=None,
+        dtype=paddle.float32,
+        **kwargs
     ):
-        unused_kwargs.pop("norm", None)
-        unused_kwargs.pop("grid_points", None)
-        unused_kwargs.pop("eps", None)
-        del unused_kwargs
+        """Solver calling `scipy.integrate.solve_ivp`, on the host and without gradients.
+
+        The batch is flattened into one system, whose Jacobian is block diagonal when the
+        samples (axis 0 of `y0`) are independent, which the options below assume.
 
-        self.dtype = y0.dtype
-        self.device = y0.device
+        :param solver: method of `solve_ivp`, e.g. "LSODA", "BDF", "Radau" or "RK45".
+        :param vectorized: evaluate the columns requested at once by `solve_ivp`, e.g. for
+                    the finite difference Jacobians, stacked along the batch in one call.
+        :param jac: compute the Jacobian of the methods using it by `paddle.autograd`,
+                    as the blocks of the samples, see `Linearization.jacobian_blocks`.
+        :param sparse_jac: return the Jacobian as a sparse block diagonal matrix, which
+                    keeps the LU factorizations of "BDF" and "Radau" linear in the batch.
+        :param processes: solve the samples separately in a pool of `processes` worker
+                    processes, forked from the current one. The evaluations of the workers
+                    are not counted by the "func" hooks.
+        """
+        super(ScipyWrapperODESolver, self).__init__(
+            xde=xde, dtype=dtype, y0=y0, **kwargs
+        )
         self.shape = y0.shape
-        self.y0 = y0.detach().cpu().numpy().reshape(-1)
         self.rtol = rtol
         self.atol = atol
         self.min_step = min_step
         self.max_step = max_step
         self.solver = solver
-        self.func = convert_func_to_numpy(func, self.shape, self.device, self.dtype)
+        self.vectorized = vectorized
+        self.jac = jac and solver in _JACOBIAN_METHODS
+        self.sparse_jac = sparse_jac
+        self.processes = processes
+
+    def _before_integrate(self, t_span):
+        pass
+
+    def step(self, next_t):
+        raise NotImplementedError(
+            "the scipy solvers integrate the whole t_span at once"
+        )
 
     def integrate(self, t_span):
-        if t_span.numel() == 1:
-            return paddle.to_tensor(self.y0)[None].astype(self.dtype)
+        global _WORKER_SOLVER
+        solution = SolutionBuffer(
+            self.y0, len(t_span), layout=self.layout, save_at=self.save_at
+        )
+        solution.write(0, self.y0)
+        if len(t_span) == 1:
+            return solution.finalize()
+        self.move = self.hooks.wrap_move(self.xde.move)
         t_span = t_span.detach().cpu().numpy()
+        y0 = self.y0.detach().cpu().numpy()
+
+        if self.processes is None:
+            ys = self._solve(t_span, y0)
+        else:
+            _WORKER_SOLVER = self
+            try:
+                with multiprocessing.get_context("fork").Pool(self.processes) as pool:
+                    ys = pool.starmap(
+                        _solve_sample, [(t_span, y0[i : i + 1]) for i in range(len(y0))]
+                    )
+            finally:
+                _WORKER_SOLVER = None
+            ys = np.concatenate(ys, axis=1)
+
+        ys = paddle.to_tensor(ys).astype(self.y0.dtype)
+        for i in range(1, len(t_span)):
+            solution.write(i, ys[i])
+        return solution.finalize()
+
+    def _solve(self, t_span, y0):
+        """Solve from the [b, ...] array `y0` through `t_span`, returning the [T, b, ...]
+        array of the states."""
+        shape = y0.shape
+        options = {"min_step": self.min_step} if self.solver == "LSODA" else {}
+        if self.jac:
+            options["jac"] = self._jacobian(shape)
         sol = solve_ivp(
-            self.func,
-            t_span=[t_span.min(), t_span.max()],
-            y0=self.y0,
+            self._derivative(shape),
+            t_span=[t_span[0], t_span[-1]],
+            y0=y0.reshape(-1),
             t_eval=t_span,
             method=self.solver,
+            vectorized=self.vectorized,
             rtol=self.rtol,
             atol=self.atol,
-            min_step=self.min_step,
             max_step=self.max_step,
+            **options
         )
-        sol = paddle.to_tensor(sol.y).T.astype(self.dtype)
-        sol = sol.reshape(-1, *self.shape)
-        return sol
+        if not sol.success:
+            raise RuntimeError("{} failed: {}".format(self.solver, sol.message))
+        return sol.y.T.reshape([len(t_span), *shape])
+
+    def _derivative(self, shape):
+        """`fun` of `solve_ivp` for states of the given shape, flattened."""
+        dtype = self.y0.dtype
+
+        def _fun(t, y):
+            t = paddle.to_tensor(t, dtype=self.dtype)
+            # with `vectorized`, y is [n, k] and its k columns are stacked along the batch
+            columns = y.T.reshape([-1, y.shape[0]])
+            y_k = paddle.to_tensor(columns).astype(dtype)
+            y_k = y_k.reshape([len(columns) * shape[0], *shape[1:]])
+            with paddle.no_grad():
+                f = self.move(t, 0, y_k)
+            f = f.cpu().numpy().reshape(columns.shape)
+            return f[0] if y.ndim == 1 else f.T
+
+        return _fun
+
+    def _jacobian(self, shape):
+        """`jac` of `solve_ivp` for states of the given shape, flattened."""
+        dtype = self.y0.dtype
 
-    @classmethod
-    def valid_callbacks(cls):
-        return set()
+        def _jac(t, y):
+            t = paddle.to_tensor(t, dtype=self.dtype)
+            y = paddle.to_tensor(y).astype(dtype).reshape(shape)
+            blocks = Linearization(self.move, t, 0, y).jacobian_blocks().cpu().numpy()
+            if self.sparse_jac:
+                return scipy.sparse.block_diag(blocks, format="csc")
+            return scipy.linalg.block_diag(*blocks)
 
+        return _jac
 
-def convert_func_to_numpy(func, shape, device, dtype):
-    def np_func(t, y):
-        t = paddle.to_tensor(t).astype(dtype)
-        y = paddle.reshape(paddle.to_tensor(y).astype(dtype), shape)
-        with paddle.no_grad():
-            f = func(t, y)
-        return f.detach().cpu().numpy().reshape(-1)
 
-    return np_func
+def _solve_sample(t_span, y0):
+    return _WORKER_SOLVER._solve(t_span, y0)
@@ -1,4 +1,10 @@
 from .adams import AdamsBashforthMoulton
+from .etd1 import ETD1
+from .etdrk4 import ETDRK4
 from .euler import Euler
 from .midpoint import Midpoint
+from .ralston import Ralston
+from .reversible_heun import ReversibleHeun
 from .rk4 import RK4
+from .rk38 import RK38
+from .ssprk3 import SSPRK3
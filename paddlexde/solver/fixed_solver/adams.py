@@ -1,10 +1,11 @@
-import collections
 import warnings
 
 import paddle
 
 from ...utils.ode_utils import _linf_norm, compute_error_ratio
-from ..base_fixed_solver import FixedSolver
+from ..base_fixed_solver import FixedSolver, _compile_tableau
+from ..history_buffer import HistoryBuffer
+from .rk38 import _RK38_TABLEAU
 
 _BASHFORTH_COEFFICIENTS = [
     [],  # order 0
@@ -440,12 +441,13 @@ _DIVISOR = [
     102181884343418880000,
 ]
 
+# python floats, rotated to the slots of the history by `HistoryBuffer.dot`
 _BASHFORTH_DIVISOR = [
-    paddle.to_tensor([b / divisor for b in bashforth], dtype=paddle.float64)
+    tuple(b / divisor for b in bashforth)
     for bashforth, divisor in zip(_BASHFORTH_COEFFICIENTS, _DIVISOR)
 ]
 _MOULTON_DIVISOR = [
-    paddle.to_tensor([m / divisor for m in moulton], dtype=paddle.float64)
+    tuple(m / divisor for m in moulton)
     for moulton, divisor in zip(_MOULTON_COEFFICIENTS, _DIVISOR)
 ]
 
@@ -486,12 +488,14 @@ class AdamsBashforthMoulton(FixedSolver):
         self.implicit = implicit
         self.max_iters = max_iters
         self.max_order = int(max_order)
-        self.prev_f = collections.deque(maxlen=self.max_order - 1)
-        self.prev_f = None
-        self.prev_t = None
+        # derivatives at the previous grid points, newest first
+        self.prev_f = HistoryBuffer(max(self.max_order - 1, 1))
 
-        self.bashforth = [x for x in _BASHFORTH_DIVISOR]
-        self.moulton = [x for x in _MOULTON_DIVISOR]
+        self.bashforth = _BASHFORTH_DIVISOR
+        self.moulton = _MOULTON_DIVISOR
+        self.bootstrap_tableau = _compile_tableau(
+            _RK38_TABLEAU, y0.dtype, paddle.get_device()
+        )
 
     def _has_converged(self, y0, y1):
         """Checks that each element is within the error tolerance."""
@@ -500,41 +504,28 @@ class AdamsBashforthMoulton(FixedSolver):
         )
         return error_ratio < 1
 
-    def step(self, t0, t1, y0):
+    def step(self, t0, t1, y0, f0=None):
         dt = t1 - t0
-        f0 = self.move(t0, dt, y0)
-        if self.prev_f is None:
-            self.prev_f = f0
-        else:
-            self.prev_f = paddle.concat([f0, self.prev_f])[: self.max_order - 1]
-            # paddle.concat([])
+        if f0 is None:
+            f0 = self.move(t0, dt, y0)
+        self.prev_f.push(f0)
         order = min(len(self.prev_f), self.max_order - 1)
         if order < _MIN_ORDER - 1:
-            # Compute using RK4.
-            return self.rk4_alt_step_func(t0, t1, y0, f0=f0), f0
+            # Bootstrap the history with a step of the 3/8 rule.
+            return self._runge_kutta_step(t0, t1, y0, f0, self.bootstrap_tableau)
         else:
             # Adams-Bashforth predictor.
-            # bashforth is float64 so cast back
-            bashforth_coeffs = self.bashforth[order]
-            bashforth_coeffs = bashforth_coeffs.astype(self.dtype)
-            dy = paddle.sum(
-                paddle.dot(bashforth_coeffs, self.prev_f), axis=0, keepdim=True
-            )
+            dy = self.prev_f.dot(self.bashforth[order])
 
             # Adams-Moulton corrector.
             if self.implicit:
-                # moulton is float64 so cast back
-                moulton_coeffs = self.moulton[order + 1].astype(self.dtype)
-                delta = paddle.sum(
-                    paddle.dot(moulton_coeffs[1:], self.prev_f), axis=0, keepdim=True
-                )
+                moulton_coeffs = self.moulton[order + 1]
+                delta = self.prev_f.dot(moulton_coeffs[1:])
                 converged = False
                 for _ in range(self.max_iters):
                     dy_old = dy
                     f = self.move(t1, dt, self.fuse(dy, dt, y0))
-                    dy = (
-                        moulton_coeffs[0] * f
-                    ) + delta  # moulton is float64 so cast back
+                    dy = moulton_coeffs[0] * f + delta
                     converged = self._has_converged(dy_old, dy)
                     if converged:
                         break
@@ -542,6 +533,16 @@ class AdamsBashforthMoulton(FixedSolver):
                     warnings.warn(
                         "Functional iteration did not converge. Solution may be incorrect."
                     )
-                    self.prev_f.pop()
-                self.prev_f = paddle.concat([f, self.prev_f])[: self.max_order - 1]
+                    # lower the order of the next steps
+                    self.prev_f.drop_oldest()
             return self.fuse(dy, dt, y0), f0
+
+    def _get_history(self):
+        if len(self.prev_f) == 0:
+            return ()
+        return (self.prev_f.values(),)
+
+    def _set_history(self, history):
+        self.prev_f.clear()
+        if len(history) > 0:
+            self.prev_f.load(history[0])
@@ -0,0 +1,17 @@
+from ..base_fixed_solver_etd import ExponentialSolver
+
+
+class ETD1(ExponentialSolver):
+    """Exponential Euler, `y1 = phi_0(dt A) y0 + dt phi_1(dt A) N(t0, y0)`."""
+
+    order = 1
+    n_phi = 1
+
+    def step(self, t0, t1, y0, f0=None):
+        dt = t1 - t0
+        if f0 is None:
+            f0 = self.move(t0, dt, y0)
+        h = dt.item()
+        ((exp_y0, _),) = self.phi_products(y0, [h])
+        ((_, phi1_n0),) = self.phi_products(self.nonlinear(t0, dt, y0, f0), [h])
+        return exp_y0 + h * phi1_n0, f0
@@ -0,0 +1,39 @@
+from ..base_fixed_solver_etd import ExponentialSolver
+
+
+class ETDRK4(ExponentialSolver):
+    """Fourth order exponential Runge-Kutta solver of Cox and Matthews, "Exponential
+    time differencing for stiff systems", 2002, with three evaluations of `N` per step
+    besides the first one."""
+
+    order = 4
+    n_phi = 3
+
+    def step(self, t0, t1, y0, f0=None):
+        dt = t1 - t0
+        if f0 is None:
+            f0 = self.move(t0, dt, y0)
+        h = dt.item()
+        half = 0.5 * h
+        t_half = t0 + 0.5 * dt
+
+        # phi[i][k] = phi_k(dt_i A) v, dt_i being dt / 2 and dt
+        phi_y0 = self.phi_products(y0, [half, h])
+        n0 = self.nonlinear(t0, dt, y0, f0)
+        phi_n0 = self.phi_products(n0, [half, h])
+
+        a = phi_y0[0][0] + half * phi_n0[0][1]
+        phi_na = self.phi_products(self.nonlinear(t_half, dt, a), [half, h])
+        b = phi_y0[0][0] + half * phi_na[0][1]
+        nb = self.nonlinear(t_half, dt, b)
+        phi_nb = self.phi_products(nb, [half, h])
+        ((exp_a, *_),) = self.phi_products(a, [half])
+        c = exp_a + half * (2 * phi_nb[0][1] - phi_n0[0][1])
+        ((_, *phi_nc),) = self.phi_products(self.nonlinear(t1, dt, c), [h])
+
+        # weights phi_1 - 3 phi_2 + 4 phi_3, 2 phi_2 - 4 phi_3 (twice), 4 phi_3 - phi_2
+        _, p1, p2, p3 = phi_n0[1]
+        dy = p1 - 3 * p2 + 4 * p3
+        dy = dy + 2 * (phi_na[1][2] + phi_nb[1][2]) - 4 * (phi_na[1][3] + phi_nb[1][3])
+        dy = dy + 4 * phi_nc[2] - phi_nc[1]
+        return phi_y0[1][0] + h * dy, f0
@@ -0,0 +1,16 @@
+from ..base_adaptive_solver_rk import _ButcherTableau
+from ..base_fixed_solver_rk import FixedRKSolver
+
+_RALSTON_TABLEAU = _ButcherTableau(
+    alpha=(2 / 3,),
+    beta=((2 / 3,),),
+    c_sol=(1 / 4, 3 / 4),
+    c_error=None,
+)
+
+
+class Ralston(FixedRKSolver):
+    """Second order method with the minimum truncation error bound."""
+
+    order = 2
+    tableau = _RALSTON_TABLEAU
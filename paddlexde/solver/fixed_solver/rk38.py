@@ -0,0 +1,20 @@
+from ..base_adaptive_solver_rk import _ButcherTableau
+from ..base_fixed_solver_rk import FixedRKSolver
+
+_RK38_TABLEAU = _ButcherTableau(
+    alpha=(1 / 3, 2 / 3, 1.0),
+    beta=(
+        (1 / 3,),
+        (-1 / 3, 1.0),
+        (1.0, -1.0, 1.0),
+    ),
+    c_sol=(1 / 8, 3 / 8, 3 / 8, 1 / 8),
+    c_error=None,
+)
+
+
+class RK38(FixedRKSolver):
+    """Kutta's 3/8 rule, smaller error than the classic RK4 with slightly more compute."""
+
+    order = 4
+    tableau = _RK38_TABLEAU
@@ -1,10 +1,20 @@
-from ..base_fixed_solver import FixedSolver
+from ..base_adaptive_solver_rk import _ButcherTableau
+from ..base_fixed_solver_rk import FixedRKSolver
 
+_RK4_TABLEAU = _ButcherTableau(
+    alpha=(1 / 2, 1 / 2, 1.0),
+    beta=(
+        (1 / 2,),
+        (0.0, 1 / 2),
+        (0.0, 0.0, 1.0),
+    ),
+    c_sol=(1 / 6, 1 / 3, 1 / 3, 1 / 6),
+    c_error=None,
+)
 
-class RK4(FixedSolver):
-    order = 4
 
-    def step(self, t0, t1, y0):
-        f0 = self.move(t0, t1 - t0, y0)
-        # return self.rk4_step_func(t0, t1, y0, f0=f0)
-        return self.rk4_alt_step_func(t0, t1, y0, f0=f0), f0
+class RK4(FixedRKSolver):
+    """The classic fourth-order Runge-Kutta method, see `RK38` for the 3/8 rule."""
+
+    order = 4
+    tableau = _RK4_TABLEAU
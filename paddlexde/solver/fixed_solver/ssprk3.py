@@ -0,0 +1,19 @@
+from ..base_adaptive_solver_rk import _ButcherTableau
+from ..base_fixed_solver_rk import FixedRKSolver
+
+_SSPRK3_TABLEAU = _ButcherTableau(
+    alpha=(1.0, 1 / 2),
+    beta=(
+        (1.0,),
+        (1 / 4, 1 / 4),
+    ),
+    c_sol=(1 / 6, 1 / 6, 2 / 3),
+    c_error=None,
+)
+
+
+class SSPRK3(FixedRKSolver):
+    """Strong stability preserving Runge-Kutta method of Shu and Osher."""
+
+    order = 3
+    tableau = _SSPRK3_TABLEAU
@@ -0,0 +1,159 @@
+from typing import Sequence
+
+import paddle
+
+
+def _ring_load(values, capacity):
+    # values are newest first, slots are filled oldest first
+    data = paddle.zeros([capacity, *values.shape[1:]], dtype=values.dtype)
+    data[: values.shape[0]] = values.flip(0)
+    return data
+
+
+class _RingLoad(paddle.autograd.PyLayer):
+    @staticmethod
+    def forward(ctx, values, capacity):
+        ctx.length = values.shape[0]
+        return _ring_load(values, capacity)
+
+    @staticmethod
+    def backward(ctx, grad_data):
+        return grad_data[: ctx.length].flip(0)
+
+
+class _RingWrite(paddle.autograd.PyLayer):
+    @staticmethod
+    def forward(ctx, data, value, slot):
+        ctx.slot = slot
+        data[slot] = value
+        return data
+
+    @staticmethod
+    def backward(ctx, grad_data):
+        # the overwritten value does not reach the outputs anymore
+        grad_value = grad_data[ctx.slot]
+        grad_data = grad_data.clone()
+        grad_data[ctx.slot] = 0
+        return grad_data, grad_value
+
+
+class _RingDot(paddle.autograd.PyLayer):
+    @staticmethod
+    def forward(ctx, data, coeffs):
+        ctx.coeffs = coeffs
+        return paddle.tensordot(coeffs, data, axes=1)
+
+    @staticmethod
+    def backward(ctx, grad_out):
+        if len(ctx.coeffs.shape) == 2:
+            return paddle.tensordot(ctx.coeffs.t(), grad_out, axes=1)
+        return ctx.coeffs.reshape([-1] + [1] * len(grad_out.shape)) * grad_out
+
+
+class HistoryBuffer:
+    def __init__(self, capacity: int):
+        """Fixed-capacity ring buffer of the latest values of a multistep method.
+
+        The values are stored in one preallocated [capacity, *value.shape] Tensor. Pushing
+        a value overwrites the slot of the oldest one, and `dot` contracts the buffer with
+        coefficients rotated to the slots, so no per-step copy of the history is made.
+        Writes and contractions go through PyLayers which save no tensor for backward,
+        thus gradients flow back to the pushed values despite the in-place writes. With
+        gradients disabled, they are plain in-place writes and matmuls.
+
+        :param capacity: maximum number of values kept.
+        """
+        self.capacity = capacity
+        self.clear()
+
+    def __len__(self):
+        return self.length
+
+    def clear(self):
+        self.data = None
+        self.reset()
+        # rotated coefficients, keyed by (coeffs, head)
+        self.rotated = {}
+
+    def reset(self):
+        """Empty the buffer but keep its storage, the next values are written into it
+        without gradients, and into a new storage with gradients, see `push`."""
+        self.head = -1  # slot of the newest value
+        self.length = 0
+
+    def push(self, value: paddle.Tensor):
+        """Add the newest value, dropping the oldest one if the buffer is full."""
+        if self.data is None or (
+            self.length == 0
+            and (paddle.is_grad_enabled() or self.data.shape[1:] != value.shape)
+        ):
+            # with gradients, a new storage per fill, which the graphs of the previous
+            # fills do not share
+            return self.load(value.unsqueeze(0))
+        self.head = (self.head + 1) % self.capacity
+        if paddle.is_grad_enabled():
+            self.data = _RingWrite.apply(self.data, value, self.head)
+        else:
+            self.data[self.head] = value
+        self.length = min(self.length + 1, self.capacity)
+
+    def drop_oldest(self):
+        self.length = max(self.length - 1, 0)
+
+    def dot(self, coeffs: Sequence[float], cache: bool = True) -> paddle.Tensor:
+        """Compute `sum(coeffs[i] * value_i)`, value_0 being the newest value.
+
+        :param coeffs: tuple of python floats, at most `len(self)` of them.
+        :param cache: keep the rotated coefficients for the next calls, disable it for
+                    coefficients which are used once.
+        """
+        if len(coeffs) > self.length:
+            raise ValueError(
+                "{} coefficients for a history of length {}.".format(
+                    len(coeffs), self.length
+                )
+            )
+        key = (coeffs, self.head)
+        rotated = self.rotated.get(key)
+        if rotated is None:
+            slots = [0.0] * self.capacity
+            for i, c in enumerate(coeffs):
+                slots[(self.head - i) % self.capacity] = c
+            rotated = paddle.to_tensor(slots, dtype=self.data.dtype)
+            if cache:
+                self.rotated[key] = rotated
+        return self.dot_slots(rotated)
+
+    def dot_slots(self, weights: paddle.Tensor) -> paddle.Tensor:
+        """Compute `sum(weights[j] * data[j])` with weights given per slot rather than per
+        value. After `reset`, the j-th pushed value is written into slot j, until the
+        buffer wraps around.
+
+        Only the slots of the values in the buffer are contracted while they are the first
+        ones, so that the slots left by a previous fill, e.g. the stages of a rejected
+        step which overflowed to inf, do not turn the zero weights into NaN.
+
+        :param weights: [capacity] Tensor with the dtype of the values, or [m, capacity]
+                    for m contractions at once, stacked along a new axis 0.
+        """
+        data = self.data
+        if self.length < self.capacity and self.head == self.length - 1:
+            data = data[: self.length]
+            weights = weights[..., : self.length]
+        if paddle.is_grad_enabled():
+            return _RingDot.apply(data, weights)
+        return paddle.tensordot(weights, data, axes=1)
+
+    def values(self) -> paddle.Tensor:
+        """[len(self), *value.shape] Tensor of the values, newest first."""
+        slots = [(self.head - i) % self.capacity for i in range(self.length)]
+        return paddle.gather(self.data, paddle.to_tensor(slots))
+
+    def load(self, values: paddle.Tensor):
+        """Replace the content of the buffer by `values`, newest first, see `values`."""
+        if paddle.is_grad_enabled():
+            self.data = _RingLoad.apply(values, self.capacity)
+        else:
+            self.data = _ring_load(values, self.capacity)
+        self.head = values.shape[0] - 1
+        self.length = values.shape[0]
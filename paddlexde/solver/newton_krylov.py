@@ -0,0 +1,337 @@
+import abc
+import math
+from typing import Union
+
+import numpy as np
+import paddle
+
+
+class Linearization:
+    def __init__(self, move: callable, t: paddle.Tensor, dt, y: paddle.Tensor):
+        """Derivative of `move(t, dt, y)` wrt `y` at a fixed point, without forming it.
+
+        The derivative is evaluated once with gradients, and its graph is kept to compute
+        vector-Jacobian products by backward, and Jacobian-vector products by the double
+        backward trick: `J^T u` is linear in a dummy `u`, thus `J v` is its gradient wrt
+        `u` along `v`. When an op of `move` has no double backward, the Jacobian-vector
+        products fall back to finite differences of `move` along `v`. The products are
+        constants for autograd, only the dependence on `y` at the point is linearized.
+        """
+        self.move = move
+        self.t = t
+        self.dt = dt
+        with paddle.set_grad_enabled(True):
+            self.y = y.detach()
+            self.y.stop_gradient = False
+            self.f = move(t, dt, self.y).reshape(y.shape)
+        self.double_backward = True
+        # `f` does not depend on `y`, e.g. a constant derivative
+        self.constant = self.f.stop_gradient
+        self.u = None
+        self.jt_u = None
+
+    def vjp(self, w: paddle.Tensor) -> paddle.Tensor:
+        """`J^T w` for a Tensor `w` with the shape of `y`."""
+        if self.constant:
+            return paddle.zeros_like(w)
+        with paddle.set_grad_enabled(True):
+            (grad,) = paddle.autograd.grad(
+                self.f, self.y, grad_outputs=w.detach(), retain_graph=True
+            )
+        return paddle.zeros_like(w) if grad is None else grad.detach()
+
+    def jvp(self, v: paddle.Tensor) -> paddle.Tensor:
+        """`J v` for a Tensor `v` with the shape of `y`."""
+        if self.constant:
+            return paddle.zeros_like(v)
+        if self.double_backward:
+            try:
+                with paddle.set_grad_enabled(True):
+                    if self.jt_u is None:
+                        self.u = paddle.zeros_like(self.f)
+                        self.u.stop_gradient = False
+                        (self.jt_u,) = paddle.autograd.grad(
+                            self.f, self.y, grad_outputs=self.u, create_graph=True
+                        )
+                    # the double backward of some ops needs the gradient wrt `y` too
+                    grad, _ = paddle.autograd.grad(
+                        self.jt_u,
+                        [self.u, self.y],
+                        grad_outputs=v.detach(),
+                        retain_graph=True,
+                        allow_unused=True,
+                    )
+                return grad.detach()
+            except RuntimeError:
+                self.double_backward = False
+        return self._finite_difference(v)
+
+    def _finite_difference(self, v):
+        with paddle.no_grad():
+            v_norm = float(paddle.linalg.norm(v))
+            if v_norm == 0.0:
+                return paddle.zeros_like(v)
+            y = self.y.detach()
+            eps = (
+                math.sqrt(paddle.finfo(y.dtype).eps)
+                * (1.0 + float(paddle.linalg.norm(y)))
+                / v_norm
+            )
+            f = self.move(self.t, self.dt, y + eps * v).reshape(y.shape)
+            return (f - self.f.detach()) / eps
+
+    def jacobian_blocks(self) -> paddle.Tensor:
+        """[b, n, n] Tensor of the Jacobians of the samples, the axis 0 of `y` being the
+        batch and n the size of a sample, computed row by row with n backward passes.
+        The derivatives coupling different samples are dropped."""
+        batch_size = self.y.shape[0]
+        n = int(np.prod(self.y.shape[1:]))
+        if self.constant:
+            return paddle.zeros([batch_size, n, n], dtype=self.y.dtype)
+        rows = []
+        for i in range(n):
+            e = paddle.zeros([batch_size, n], dtype=self.f.dtype)
+            e[:, i] = 1
+            rows.append(self.vjp(e.reshape(self.y.shape)).reshape([batch_size, n]))
+        return paddle.stack(rows, axis=1)
+
+
+def gmres(
+    matvec: callable,
+    b: paddle.Tensor,
+    tol: float = 1e-5,
+    restart: int = 20,
+    max_iter: int = 100,
+) -> paddle.Tensor:
+    """Solve `matvec(x) = b` by restarted GMRES from `x = 0`.
+
+    The Krylov basis is orthogonalized by classical Gram-Schmidt, twice, and the small
+    least-squares problems are solved on the host with Givens rotations, so every
+    iteration reads one vector of inner products back to the host.
+
+    :param tol: relative tolerance on the residual, `|b - matvec(x)| <= tol * |b|`.
+    :param restart: number of iterations between restarts, the size of the basis.
+    :param max_iter: maximum number of iterations, the last iterate is returned.
+    """
+    b_norm = float(paddle.linalg.norm(b))
+    x = paddle.zeros_like(b)
+    if b_norm == 0.0:
+        return x
+    # a new basis vector below roundoff ends the Krylov space
+    eps = float(paddle.finfo(b.dtype).eps)
+    n_iter = 0
+    r = b
+    x_prev, beta_prev = x, float("inf")
+    while True:
+        beta = float(paddle.linalg.norm(r))
+        if beta <= tol * b_norm or n_iter >= max_iter:
+            return x
+        if beta >= beta_prev:
+            # the restarts stagnate at the attainable accuracy
+            return x_prev
+        basis = [(r / beta).flatten()]
+        hessenberg = np.zeros([restart + 1, restart])
+        cs, sn = np.zeros(restart), np.zeros(restart)
+        g = np.zeros(restart + 1)
+        g[0] = beta
+        k = 0
+        while k < restart and n_iter < max_iter:
+            w = matvec(basis[k].reshape(b.shape)).flatten()
+            v = paddle.stack(basis)
+            w_norm = paddle.linalg.norm(w)
+            h = paddle.mv(v, w)
+            w = w - paddle.mv(v.t(), h)
+            h2 = paddle.mv(v, w)
+            w = w - paddle.mv(v.t(), h2)
+            column = paddle.concat(
+                [h + h2, paddle.linalg.norm(w).reshape([1]), w_norm.reshape([1])]
+            ).numpy()
+            breakdown = column[k + 1] <= eps * column[k + 2]
+            if breakdown:
+                column[k + 1] = 0.0
+            # rotate the new column of the Hessenberg matrix to upper triangular
+            for i in range(k):
+                column[i], column[i + 1] = (
+                    cs[i] * column[i] + sn[i] * column[i + 1],
+                    -sn[i] * column[i] + cs[i] * column[i + 1],
+                )
+            denom = np.hypot(column[k], column[k + 1])
+            cs[k], sn[k] = (
+                (1.0, 0.0)
+                if denom == 0
+                else (
+                    column[k] / denom,
+                    column[k + 1] / denom,
+                )
+            )
+            hessenberg[: k + 1, k] = column[: k + 1]
+            hessenberg[k, k] = denom
+            g[k], g[k + 1] = cs[k] * g[k], -sn[k] * g[k]
+            k += 1
+            n_iter += 1
+            if abs(g[k]) <= tol * b_norm or breakdown:
+                break
+            basis.append(w / float(column[k]))
+        y = np.linalg.lstsq(hessenberg[:k, :k], g[:k], rcond=None)[0]
+        update = paddle.mv(
+            paddle.stack(basis[:k]).t(), paddle.to_tensor(y, dtype=b.dtype)
+        )
+        x_prev, beta_prev = x, beta
+        x = x + update.reshape(b.shape)
+        r = b - matvec(x)
+
+
+# power iterations of `LinearSolver.spectral_radius`
+_POWER_ITERATIONS = 10
+
+
+class LinearSolver(metaclass=abc.ABCMeta):
+    def __init__(self):
+        """Solver of the linear systems `(I - scale * J) x = b` of the simplified Newton
+        iterations of implicit methods, `J` being the Jacobian of a `Linearization`.
+
+        The Jacobian is only updated by `update`, and the matrix by `factorize` when
+        `scale` changes, so both are reused across Newton iterations, stages and steps.
+        `n_updates` and `n_factorizations` count them.
+        """
+        self.linearization = None
+        self.scale = None
+        self.n_updates = 0
+        self.n_factorizations = 0
+        self.radius = None
+
+    def update(self, linearization: Linearization):
+        """Use the Jacobian of `linearization`, the matrix is factorized again."""
+        self.linearization = linearization
+        self.scale = None
+        self.radius = None
+        self.n_updates += 1
+
+    def spectral_radius(self) -> float:
+        """Estimate of the largest magnitude of the eigenvalues of `J`, by power
+        iterations from a fixed vector, kept until the next `update`."""
+        if self.radius is None:
+            y = self.linearization.y
+            v = np.random.RandomState(0).uniform(0.5, 1.5, y.shape)
+            v = paddle.to_tensor(v, dtype=y.dtype)
+            self.radius = 0.0
+            for _ in range(_POWER_ITERATIONS):
+                v = v / paddle.linalg.norm(v)
+                v = self._jacobian_product(v)
+                self.radius = float(paddle.linalg.norm(v))
+                if self.radius == 0.0:
+                    break
+        return self.radius
+
+    def _jacobian_product(self, v):
+        return self.linearization.jvp(v)
+
+    def factorize(self, scale: float):
+        """Prepare the solves of `(I - scale * J) x = b`."""
+        if scale != self.scale:
+            self.scale = scale
+            self.n_factorizations += 1
+            self._factorize(scale)
+
+    @abc.abstractmethod
+    def _factorize(self, scale):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def solve(self, b: paddle.Tensor) -> paddle.Tensor:
+        """Solve `(I - scale * J) x = b`, differentiable wrt `b`."""
+        raise NotImplementedError
+
+
+class DenseLinearSolver(LinearSolver):
+    def __init__(self):
+        """Direct solver by the LU factorization of the [n, n] matrix of every sample of
+        the batch, see `Linearization.jacobian_blocks`. Forming the Jacobian costs n
+        backward passes, which suits states of up to a few thousand values per sample."""
+        super(DenseLinearSolver, self).__init__()
+        self.jacobian = None
+
+    def update(self, linearization):
+        super(DenseLinearSolver, self).update(linearization)
+        self.jacobian = linearization.jacobian_blocks()
+
+    def _factorize(self, scale):
+        n = self.jacobian.shape[-1]
+        eye = paddle.eye(n, dtype=self.jacobian.dtype)
+        lu, pivots = paddle.linalg.lu(eye - scale * self.jacobian)
+        p, self.lower, self.upper = paddle.linalg.lu_unpack(lu, pivots)
+        self.permutation = p.transpose([0, 2, 1])
+
+    def _jacobian_product(self, v):
+        product = paddle.matmul(self.jacobian, v.reshape([v.shape[0], -1, 1]))
+        return product.reshape(v.shape)
+
+    def solve(self, b):
+        shape = b.shape
+        x = paddle.matmul(self.permutation, b.reshape([shape[0], -1, 1]))
+        x = paddle.linalg.triangular_solve(
+            self.lower, x, upper=False, unitriangular=True
+        )
+        x = paddle.linalg.triangular_solve(self.upper, x, upper=True)
+        return x.reshape(shape)
+
+
+class _KrylovSolve(paddle.autograd.PyLayer):
+    @staticmethod
+    def forward(ctx, b, solver):
+        ctx.solver = solver
+        ctx.linearization = solver.linearization
+        ctx.scale = solver.scale
+        return solver._gmres(b, ctx.linearization.jvp, ctx.scale)
+
+    @staticmethod
+    def backward(ctx, grad_x):
+        # the adjoint system has the transposed matrix
+        return ctx.solver._gmres(grad_x, ctx.linearization.vjp, ctx.scale)
+
+
+class KrylovLinearSolver(LinearSolver):
+    def __init__(self, tol: float = 1e-5, restart: int = 20, max_iter: int = 100):
+        """Matrix-free solver by GMRES, with the Jacobian-vector products of the
+        `Linearization`, for states too large to form the Jacobian. Nothing is factorized,
+        the graph of the linearization is reused instead. The gradients wrt `b` solve
+        the transposed system with vector-Jacobian products.
+
+        :param tol, restart, max_iter: see `gmres`.
+        """
+        super(KrylovLinearSolver, self).__init__()
+        self.tol = tol
+        self.restart = restart
+        self.max_iter = max_iter
+
+    def _factorize(self, scale):
+        pass
+
+    def _gmres(self, b, product, scale):
+        def _matvec(v):
+            return v - scale * product(v)
+
+        return gmres(
+            _matvec, b, tol=self.tol, restart=self.restart, max_iter=self.max_iter
+        )
+
+    def solve(self, b):
+        if paddle.is_grad_enabled() and not b.stop_gradient:
+            return _KrylovSolve.apply(b, self)
+        return self._gmres(b, self.linearization.jvp, self.scale)
+
+
+_LINEAR_SOLVERS = {"dense": DenseLinearSolver, "krylov": KrylovLinearSolver}
+
+
+def make_linear_solver(linear_solver: Union[str, LinearSolver]) -> LinearSolver:
+    """Build the linear solver named `linear_solver`, or return `linear_solver` itself."""
+    if isinstance(linear_solver, LinearSolver):
+        return linear_solver
+    if linear_solver not in _LINEAR_SOLVERS:
+        raise ValueError(
+            "linear_solver must be one of {} or a LinearSolver, but got {}.".format(
+                list(_LINEAR_SOLVERS), linear_solver
+            )
+        )
+    return _LINEAR_SOLVERS[linear_solver]()
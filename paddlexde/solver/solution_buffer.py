@@ -0,0 +1,128 @@
+from typing import Sequence, Union
+
+import paddle
+
+_LAYOUTS = ("batch", "time")
+
+
+class SolutionBuffer:
+    def __init__(
+        self,
+        y0: paddle.Tensor,
+        length: int,
+        layout: str = "batch",
+        save_at: Union[Sequence[bool], paddle.Tensor] = None,
+    ):
+        """Preallocated storage for the states produced along `t_span`.
+
+        The buffer is allocated once and every saved state is written into its slot, so no
+        list of states is kept alive and no concat is needed at the end of the solve. Writes
+        go through `__setitem__`, thus gradients flow back to the written states.
+
+        :param y0: [B, L, D] Tensor of initial state, used for the shape and dtype of the buffer.
+        :param length: number of time points in `t_span`.
+        :param layout: "batch" stores the states along axis -2, i.e. [B, T * L, D], which is the
+                        same result as `paddle.concat(sol, axis=-2)`. "time" stores the states
+                        along a new leading axis, i.e. [T, B, L, D].
+        :param save_at: optional [T] bool mask, only the time points set to True are stored.
+        """
+        if layout not in _LAYOUTS:
+            raise ValueError(
+                "layout must be one of {}, but got {}.".format(_LAYOUTS, layout)
+            )
+        if layout == "batch" and len(y0.shape) < 2:
+            raise ValueError(
+                "batch layout stacks states along axis -2, y0 must have at least 2 dims."
+            )
+
+        save_at = self.as_mask(save_at, length)
+
+        # slots[i] is the position of the i-th time point in the buffer, or None if not saved.
+        self.slots = []
+        num_saved = 0
+        for s in save_at:
+            self.slots.append(num_saved if s else None)
+            num_saved += int(s)
+
+        self.layout = layout
+        self.num_saved = num_saved
+        self.step_len = y0.shape[-2] if layout == "batch" else 1
+
+        if layout == "batch":
+            shape = list(y0.shape)
+            shape[-2] = shape[-2] * num_saved
+        else:
+            shape = [num_saved, *y0.shape]
+        self.data = paddle.empty(shape, dtype=y0.dtype)
+
+    @staticmethod
+    def as_mask(save_at, length):
+        """Convert `save_at` to a list of python bools of the given length."""
+        if save_at is None:
+            return [True] * length
+        elif isinstance(save_at, paddle.Tensor):
+            save_at = save_at.astype("bool").tolist()
+        else:
+            save_at = [bool(s) for s in save_at]
+        if len(save_at) != length:
+            raise ValueError(
+                "save_at must have the same length as t_span ({}), but got {}.".format(
+                    length, len(save_at)
+                )
+            )
+        return save_at
+
+    def saved(self, i: int) -> bool:
+        return self.slots[i] is not None
+
+    def write(self, i: int, y: paddle.Tensor):
+        """Write the state of the i-th time point, does nothing if it is not saved."""
+        slot = self.slots[i]
+        if slot is None:
+            return
+        if self.layout == "batch":
+            start = slot * self.step_len
+            self.data[..., start : start + self.step_len, :] = y
+        else:
+            self.data[slot] = y
+
+    def write_many(self, indices: Sequence[int], ys: paddle.Tensor):
+        """Write the states of several saved, consecutive time points at once.
+
+        :param indices: increasing indices of saved time points, their slots are consecutive.
+        :param ys: [len(indices), *y0.shape] Tensor of states.
+        """
+        if len(indices) == 1:
+            return self.write(indices[0], ys[0])
+        start = self.slots[indices[0]]
+        stop = start + len(indices)
+        if self.layout == "batch":
+            # [K, B, L, D] -> [B, K * L, D]
+            perm = list(range(1, len(ys.shape) - 1))
+            perm.insert(len(perm) - 1, 0)
+            perm.append(len(ys.shape) - 1)
+            ys = ys.transpose(perm)
+            ys = ys.reshape(
+                [*ys.shape[:-3], len(indices) * self.step_len, ys.shape[-1]]
+            )
+            self.data[..., start * self.step_len : stop * self.step_len, :] = ys
+        else:
+            self.data[start:stop] = ys
+
+    def read(self, i: int, data: paddle.Tensor = None) -> paddle.Tensor:
+        """State of the i-th time point, None if it is not saved.
+
+        :param data: optional Tensor laid out as the buffer, e.g. the gradient of the
+                    solution, read instead of the buffer.
+        """
+        slot = self.slots[i]
+        if slot is None:
+            return None
+        data = self.data if data is None else data
+        if self.layout == "batch":
+            start = slot * self.step_len
+            return data[..., start : start + self.step_len, :]
+        return data[slot]
+
+    def finalize(self) -> paddle.Tensor:
+        return self.data
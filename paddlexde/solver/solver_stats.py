@@ -0,0 +1,182 @@
+import contextlib
+import time
+
+import paddle
+
+_EVENTS = ("func", "step")
+
+
+class _HookHandle:
+    def __init__(self, hooks, event, fn):
+        self.hooks = hooks
+        self.event = event
+        self.fn = fn
+
+    def remove(self):
+        if self.fn in self.hooks[self.event]:
+            self.hooks[self.event].remove(self.fn)
+
+
+class SolverHooks:
+    def __init__(self):
+        """Registry of the callbacks fired by a solver.
+
+        Events:
+            "func": `fn(t, y, dy, elapsed)` after every evaluation of the derivative,
+                    `elapsed` being the host wall time of the evaluation in seconds.
+            "step": `fn(t0, t1, accepted, attempted)` after every step, `accepted` and
+                    `attempted` are python bools, or bool Tensors in the sync-free and
+                    per-sample modes of `AdaptiveRKSolver`, where a step is attempted for
+                    some samples only.
+
+        Firing an event without registered hooks costs one dict lookup, and the
+        derivative is only timed when a "func" hook is registered. Hooks do not fire
+        inside `to_static` programs, nor when checkpointed steps are recomputed during
+        backward, see `suspend`.
+        """
+        self.hooks = {event: [] for event in _EVENTS}
+        self.suspended = False
+
+    def register(self, event: str, fn: callable) -> _HookHandle:
+        """Register `fn` for `event`, returns a handle whose `remove` unregisters it."""
+        if event not in self.hooks:
+            raise ValueError(
+                "event must be one of {}, but got {}.".format(_EVENTS, event)
+            )
+        self.hooks[event].append(fn)
+        return _HookHandle(self.hooks, event, fn)
+
+    def has(self, event: str) -> bool:
+        return len(self.hooks[event]) > 0
+
+    def fire(self, event: str, *args):
+        if self.suspended:
+            return
+        for fn in self.hooks[event]:
+            fn(*args)
+
+    @contextlib.contextmanager
+    def suspend(self):
+        """Do not fire any event in the block, e.g. while steps already reported are
+        run again."""
+        suspended = self.suspended
+        self.suspended = True
+        try:
+            yield
+        finally:
+            self.suspended = suspended
+
+    def wrap_move(self, move: callable) -> callable:
+        """Return `move` timed for the "func" hooks, or `move` itself without them."""
+        if not self.has("func"):
+            return move
+
+        def _move(t0, dt, y0):
+            start = time.perf_counter()
+            dy = move(t0, dt, y0)
+            self.fire("func", t0, y0, dy, time.perf_counter() - start)
+            return dy
+
+        return _move
+
+
+def _count(value):
+    """Number of True values of a python bool or a bool Tensor."""
+    if isinstance(value, paddle.Tensor):
+        return value.astype("int64").sum()
+    return int(value)
+
+
+class SolverStats:
+    def __init__(self):
+        """Statistics of a solve, see `record_stats`.
+
+        Attributes:
+            nfe: number of evaluations of the derivative, calls of `func` with the whole
+                (or working) batch.
+            n_steps: number of attempted steps, `n_accepted + n_rejected`. In the
+                per-sample mode of `AdaptiveRKSolver`, every sample counts its own steps.
+            n_accepted, n_rejected: numbers of accepted and rejected steps, rejected steps
+                only happen with adaptive solvers.
+            times: host wall time in seconds of the phases "total" (the whole solve),
+                "func" (evaluations of the derivative) and "solver" (the rest). Device
+                work is asynchronous, thus only "total" includes the device time.
+            peak_memory: peak of the device memory allocated during the solve in bytes,
+                sampled after every step, None on CPU.
+        """
+        self.nfe = 0
+        self.n_steps = 0
+        self.n_accepted = 0
+        self.n_rejected = 0
+        self.times = {"total": 0.0, "func": 0.0, "solver": 0.0}
+        self.peak_memory = None
+        self.handles = []
+
+    def __repr__(self):
+        return (
+            "SolverStats(nfe={}, n_steps={}, n_accepted={}, n_rejected={}, "
+            "times={}, peak_memory={})".format(
+                self.nfe,
+                self.n_steps,
+                self.n_accepted,
+                self.n_rejected,
+                {k: round(v, 6) for k, v in self.times.items()},
+                self.peak_memory,
+            )
+        )
+
+    def attach(self, solver):
+        hooks = getattr(solver, "hooks", None)
+        if hooks is None:
+            # a solver without hooks, only the total time is recorded
+            return
+        self.handles.append(hooks.register("func", self._on_func))
+        self.handles.append(hooks.register("step", self._on_step))
+
+    def detach(self):
+        for handle in self.handles:
+            handle.remove()
+        self.handles = []
+
+    def _on_func(self, t, y, dy, elapsed):
+        self.nfe += 1
+        self.times["func"] += elapsed
+
+    def _on_step(self, t0, t1, accepted, attempted):
+        if isinstance(accepted, paddle.Tensor) or isinstance(attempted, paddle.Tensor):
+            rejected = ~paddle.to_tensor(accepted) & paddle.to_tensor(attempted)
+        else:
+            rejected = attempted and not accepted
+        self.n_steps = self.n_steps + _count(attempted)
+        self.n_accepted = self.n_accepted + _count(accepted)
+        self.n_rejected = self.n_rejected + _count(rejected)
+        if self.peak_memory is not None:
+            self.peak_memory = max(
+                self.peak_memory, paddle.device.cuda.memory_allocated()
+            )
+
+    def finalize(self):
+        """Read the counters accumulated as Tensors back to python ints."""
+        for name in ["n_steps", "n_accepted", "n_rejected"]:
+            setattr(self, name, int(getattr(self, name)))
+        self.times["solver"] = max(self.times["total"] - self.times["func"], 0.0)
+
+
+@contextlib.contextmanager
+def record_stats(solver, stats: SolverStats = None):
+    """Record the statistics of the solves run by `solver` in the block into `stats`,
+    does nothing if `stats` is None."""
+    if stats is None:
+        yield
+        return
+    on_gpu = "gpu" in str(paddle.get_device())
+    if on_gpu:
+        stats.peak_memory = paddle.device.cuda.memory_allocated()
+    stats.attach(solver)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.times["total"] += time.perf_counter() - start
+        stats.detach()
+        stats.finalize()
@@ -0,0 +1,161 @@
+from typing import Sequence, Union
+
+import paddle
+
+# error ratios are floored, so that a zero error gives the largest growth instead of nan
+_MIN_ERROR_RATIO = 1e-10
+
+
+class StepController:
+    def __init__(
+        self,
+        betas: Sequence[float] = (1.0,),
+        safety: float = 0.9,
+        ifactor: float = 10.0,
+        dfactor: float = 0.2,
+    ):
+        """Step-size controller filtering the error ratios of the last accepted steps.
+
+        The next step size is `dt * safety * prod(err_{n-i} ** (-betas[i] / order))` with
+        the error ratios `err_n, err_{n-1}, ...` of the current and previous accepted steps,
+        see [1]_. `betas=(1,)` is the plain integral controller of `optimal_step_size`.
+        After a rejected step, the step size is reduced by the integral controller alone,
+        and the next accepted step may not grow it. All the updates are Tensor ops, so
+        the controller works with the sync-free and per-sample modes of `AdaptiveRKSolver`.
+
+        References
+        ----------
+        .. [1] G. Söderlind, "Digital filters in adaptive time-stepping", ACM Trans. Math.
+               Softw. 29 (2003).
+
+        :param betas: filter coefficients of the current and previous error ratios.
+        :param safety: safety factor applied to the proposed step size.
+        :param ifactor: maximum growth of the step size.
+        :param dfactor: maximum decrease of the step size.
+        """
+        self.betas = tuple(float(b) for b in betas)
+        self.safety = safety
+        self.ifactor = ifactor
+        self.dfactor = dfactor
+        self.reset()
+
+    def reset(self):
+        # error ratios of the previous accepted steps, newest first, and whether the last
+        # step was rejected, created with the shape of the first error ratio
+        self.errors = None
+        self.rejected = None
+        self.n_rejected = 0
+
+    def propose(self, dt, error_ratio, accept_step, order, mask=None, index=None):
+        """Propose the size of the step following a step of size `dt`.
+
+        :param dt: size of the step, a scalar or [b] Tensor.
+        :param error_ratio: error ratio of the step, with the shape of `dt`.
+        :param accept_step: bool Tensor, or python bool, whether the step is accepted.
+        :param order: order of the error estimate.
+        :param mask: optional bool Tensor, the steps which are not masked leave the state
+                    of the controller unchanged.
+        :param index: optional [b] indices of the samples in a batch of per-sample steps.
+        :return: Tensor of the proposed step sizes, with the shape of `dt`.
+        """
+        error_ratio = paddle.fmax(
+            error_ratio.astype(dt.dtype), paddle.full_like(dt, _MIN_ERROR_RATIO)
+        )
+        if not isinstance(accept_step, paddle.Tensor):
+            accept_step = paddle.to_tensor(accept_step)
+        accept_step = paddle.broadcast_to(accept_step, dt.shape)
+        active = paddle.ones_like(accept_step)
+        if mask is not None:
+            active = active & mask
+        if self.errors is None:
+            # previous error ratios are neutral until steps are accepted
+            self.errors = [paddle.ones_like(error_ratio)] * (len(self.betas) - 1)
+            # int64 rather than bool, which gather and scatter do not support
+            self.rejected = paddle.zeros_like(error_ratio, dtype="int64")
+            self.n_rejected = paddle.zeros_like(error_ratio, dtype="int64")
+        errors = [self._select(e, index) for e in self.errors]
+        rejected_before = self._select(self.rejected, index).astype("bool")
+
+        factor = self.safety * error_ratio ** (-self.betas[0] / order)
+        for beta, previous in zip(self.betas[1:], errors):
+            factor = factor * previous ** (-beta / order)
+        # after a rejection, shrink with the integral controller alone, then do not grow
+        factor_rejected = self.safety * error_ratio ** (-1.0 / order)
+        factor = paddle.where(accept_step, factor, factor_rejected)
+        ones = paddle.ones_like(factor)
+        factor = paddle.where(rejected_before, paddle.fmin(factor, ones), factor)
+        # an accepted step with an error ratio below 1 is not shrunk
+        dfactor = paddle.where(error_ratio < 1, ones, self.dfactor * ones)
+        factor = paddle.fmin(self.ifactor * ones, paddle.fmax(factor, dfactor))
+
+        # only the accepted steps enter the history, masked steps change nothing
+        accepted = accept_step & active
+        rejected = ~accept_step & active
+        shifted = [error_ratio] + errors[:-1]
+        errors = [paddle.where(accepted, new, e) for e, new in zip(errors, shifted)]
+        self.errors = [
+            self._scatter(e, new, index) for e, new in zip(self.errors, errors)
+        ]
+        self.rejected = self._scatter(
+            self.rejected,
+            (rejected | (rejected_before & ~active)).astype("int64"),
+            index,
+        )
+        self.n_rejected = self._scatter(
+            self.n_rejected,
+            self._select(self.n_rejected, index) + rejected.astype("int64"),
+            index,
+        )
+        return dt * factor
+
+    @staticmethod
+    def _select(tensor, index):
+        return tensor if index is None else paddle.gather(tensor, index)
+
+    @staticmethod
+    def _scatter(tensor, values, index):
+        return values if index is None else paddle.scatter(tensor, index, values)
+
+
+class IController(StepController):
+    def __init__(self, **kwargs):
+        """Integral controller, the proposals of `optimal_step_size` with the limit after
+        a rejected step."""
+        super(IController, self).__init__(betas=(1.0,), **kwargs)
+
+
+class PIController(StepController):
+    def __init__(self, beta1: float = 0.7, beta2: float = -0.4, **kwargs):
+        """Proportional-integral controller of Gustafsson, with the coefficients of
+        Hairer and Wanner by default."""
+        super(PIController, self).__init__(betas=(beta1, beta2), **kwargs)
+
+
+class PIDController(StepController):
+    def __init__(
+        self,
+        beta1: float = 0.49,
+        beta2: float = -0.34,
+        beta3: float = 0.10,
+        **kwargs,
+    ):
+        """Proportional-integral-derivative controller over the last three error ratios."""
+        super(PIDController, self).__init__(betas=(beta1, beta2, beta3), **kwargs)
+
+
+_CONTROLLERS = {"I": IController, "PI": PIController, "PID": PIDController}
+
+
+def make_controller(
+    controller: Union[str, StepController], safety, ifactor, dfactor
+) -> StepController:
+    """Build the controller named `controller`, or return `controller` itself."""
+    if isinstance(controller, StepController):
+        return controller
+    if controller not in _CONTROLLERS:
+        raise ValueError(
+            "controller must be one of {} or a StepController, but got {}.".format(
+                list(_CONTROLLERS), controller
+            )
+        )
+    return _CONTROLLERS[controller](safety=safety, ifactor=ifactor, dfactor=dfactor)
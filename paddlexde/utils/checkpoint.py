@@ -0,0 +1,62 @@
+import paddle
+
+
+class CheckpointFunction(paddle.autograd.PyLayer):
+    """Run `run_fn` without keeping its activations, and recompute them in backward.
+
+    Only the inputs are saved. In backward, `run_fn` is run again with gradient enabled
+    from the saved inputs (and the saved random state), then the gradients of the inputs
+    and of the parameters used by `run_fn` are computed through the recomputed graph.
+    The parameters are passed after the inputs, so that the outputs are connected to them
+    even if no input requires gradient.
+    """
+
+    @staticmethod
+    def forward(ctx, run_fn, num_inputs, *args):
+        ctx.run_fn = run_fn
+        ctx.num_inputs = num_inputs
+        ctx.rng_state = paddle.get_rng_state()
+        ctx.stop_gradients = [x.stop_gradient for x in args[:num_inputs]]
+        ctx.save_for_backward(*args)
+
+        with paddle.no_grad():
+            outputs = run_fn(*args[:num_inputs])
+        return outputs
+
+    @staticmethod
+    def backward(ctx, *grad_outputs):
+        args = ctx.saved_tensor()
+        params = args[ctx.num_inputs :]
+        inputs = []
+        for x, stop_gradient in zip(args[: ctx.num_inputs], ctx.stop_gradients):
+            x = x.detach()
+            x.stop_gradient = stop_gradient
+            inputs.append(x)
+
+        rng_state = paddle.get_rng_state()
+        paddle.set_rng_state(ctx.rng_state)
+        with paddle.set_grad_enabled(True):
+            outputs = ctx.run_fn(*inputs)
+        paddle.set_rng_state(rng_state)
+
+        if isinstance(outputs, paddle.Tensor):
+            outputs = (outputs,)
+        tensors, grads = [], []
+        for output, grad in zip(outputs, grad_outputs):
+            if not output.stop_gradient and grad is not None:
+                tensors.append(output)
+                grads.append(grad)
+
+        wrt = [x for x in inputs if not x.stop_gradient] + list(params)
+        if len(tensors) > 0 and len(wrt) > 0:
+            wrt_grads = paddle.grad(tensors, wrt, grads, allow_unused=True)
+        else:
+            wrt_grads = [None] * len(wrt)
+        wrt_grads = iter(wrt_grads)
+
+        input_grads = [None if x.stop_gradient else next(wrt_grads) for x in inputs]
+        param_grads = [
+            paddle.zeros_like(p) if grad is None else grad
+            for p, grad in zip(params, wrt_grads)
+        ]
+        return (*input_grads, *param_grads)
@@ -1,13 +1,35 @@
+import inspect
+
+
 def flat_to_shape(tensor, length, shapes, numels):
     tensor_list = []
     total = 0
 
     for shape, num_ele in zip(shapes, numels):
         next_total = total + num_ele
-        # It's important that this be view((...)), not view(...). Else when length=(), shape=() it fails.
-        if len(shape) == 0:
-            tensor_list.append(tensor[..., total:next_total].reshape((*length, 0)))
-        else:
-            tensor_list.append(tensor[..., total:next_total].reshape((*length, *shape)))
+        # a 0-D shape gives a scalar for each of the leading `length` dimensions
+        tensor_list.append(tensor[..., total:next_total].reshape([*length, *shape]))
         total = next_total
     return tuple(tensor_list)
+
+
+def func_owner(func):
+    """The Layer or object a `func` belongs to, its instance for a bound method."""
+    return func.__self__ if inspect.ismethod(func) else func
+
+
+def func_cache(registry, func):
+    """The cache dict of `func` in `registry`, a `weakref.WeakKeyDictionary`, so that the
+    cache is dropped with `func` and no attribute is set on it.
+
+    A bound method is a new object at every attribute access, thus it is keyed on its
+    instance and function. A callable which cannot be weakly referenced gets a new, empty
+    cache.
+    """
+    owner = func_owner(func)
+    key = func.__func__ if owner is not func else None
+    try:
+        caches = registry.setdefault(owner, {})
+    except TypeError:
+        return {}
+    return caches.setdefault(key, {})
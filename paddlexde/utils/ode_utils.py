@@ -19,6 +19,16 @@ def _mixed_norm(tensor_tuple):
     return max([_rms_norm(tensor) for tensor in tensor_tuple])
 
 
+def per_sample_norm(norm, tensor):
+    """Apply `norm` to every sample of the [b, ...] Tensor `tensor`, returning a [b] Tensor."""
+    tensor = tensor.reshape([tensor.shape[0], -1])
+    if norm is _rms_norm:
+        return tensor.abs().pow(2).mean(axis=1).sqrt()
+    if norm is _linf_norm:
+        return tensor.abs().max(axis=1)
+    return paddle.stack([paddle.to_tensor(norm(sample)) for sample in tensor])
+
+
 def sort_tvals(tvals, t0):
     # TODO: add warning if tvals come before t0?
     tvals = tvals[tvals >= t0]
@@ -49,22 +59,37 @@ def interp_fit(y0, y1, y_mid, f0, f1, dt):
     return [e, d, c, b, a]
 
 
+def hermite_fit(y0, y1, f0, f1, dt):
+    """Fit coefficients for cubic Hermite interpolation, from the values and derivatives
+    at both ends of the interval, see `interp_fit` for the arguments and the result."""
+    dy = y1 - y0
+    return [
+        y0,
+        dt * f0,
+        3 * dy - dt * (2 * f0 + f1),
+        dt * (f0 + f1) - 2 * dy,
+    ]
+
+
 def interp_evaluate(coefficients, t0, t1, t):
     """Evaluate polynomial interpolation at the given time point.
 
     Args:
         coefficients: list of Tensor coefficients as created by `interp_fit`.
-        t0: scalar float64 Tensor giving the start of the interval.
-        t1: scalar float64 Tensor giving the end of the interval.
+        t0: scalar float64 Tensor giving the start of the interval, or one start per
+            sample, shaped to broadcast against the coefficients.
+        t1: scalar float64 Tensor giving the end of the interval, or one end per sample.
         t: scalar float64 Tensor giving the desired interpolation point.
 
     Returns:
         Polynomial interpolation of the coefficients at time `t`.
     """
 
-    assert (t0 <= t) & (
-        t <= t1
-    ), "invalid interpolation, fails `t0 <= t <= t1`: {}, {}, {}".format(t0, t, t1)
+    assert (
+        (t0 <= t) & (t <= t1)
+    ).all(), "invalid interpolation, fails `t0 <= t <= t1`: {}, {}, {}".format(
+        t0, t, t1
+    )
     x = (t - t0) / (t1 - t0)
     x = x.astype(coefficients[0].dtype)
 
@@ -77,6 +102,28 @@ def interp_evaluate(coefficients, t0, t1, t):
     return total
 
 
+def interp_evaluate_many(coefficients, t0, t1, t):
+    """Evaluate polynomial interpolation at several time points with one Horner pass.
+
+    Args:
+        coefficients: list of Tensor coefficients as created by `interp_fit`.
+        t0: scalar float64 Tensor giving the start of the interval.
+        t1: scalar float64 Tensor giving the end of the interval.
+        t: [n] float64 Tensor giving the desired interpolation points, in [t0, t1].
+
+    Returns:
+        [n, *coefficient.shape] Tensor of the polynomial interpolation at the points `t`.
+    """
+    x = (t - t0) / (t1 - t0)
+    x = x.astype(coefficients[0].dtype)
+    x = x.reshape([-1] + [1] * len(coefficients[0].shape))
+
+    total = coefficients[-1]
+    for coefficient in reversed(coefficients[:-1]):
+        total = total * x + coefficient
+    return total
+
+
 def compute_error_ratio(error_estimate, rtol, atol, y0, y1, norm):
     error_tol = atol + rtol * paddle.fmax(y0.abs(), y1.abs())
     return norm(error_estimate / error_tol).abs()
@@ -84,12 +131,14 @@ def compute_error_ratio(error_estimate, rtol, atol, y0, y1, norm):
 
 @paddle.no_grad()
 def optimal_step_size(last_step, error_ratio, safety, ifactor, dfactor, order):
-    """Calculate the optimal size for the next step."""
-    if error_ratio == 0:
-        return last_step * ifactor
-    if error_ratio < 1:
-        dfactor = paddle.to_tensor(1, dtype=last_step.dtype)
+    """Calculate the optimal size for the next step.
+
+    Written without python branches on `error_ratio`, so it does not sync with the host. A
+    zero `error_ratio` gives an infinite factor, which is clipped to `ifactor`.
+    """
     error_ratio = error_ratio.astype(last_step.dtype)
+    ones = paddle.ones_like(error_ratio)
+    dfactor = paddle.where(error_ratio < 1, ones, dfactor * ones)
     exponent = paddle.to_tensor(order, dtype=last_step.dtype).reciprocal()
     factor = paddle.fmin(
         ifactor, paddle.fmax(safety / error_ratio**exponent, dfactor)
@@ -16,6 +16,8 @@ class BaseDDE(BaseXDE):
     Base class for all DDEs.
     """
 
+    fsal = True
+
     def __init__(
         self,
         func: Union[nn.Layer, callable],
@@ -11,6 +11,8 @@ class BaseODE(BaseXDE):
     Base class for all ODEs.
     """
 
+    fsal = True
+
     def __init__(
         self,
         func: Union[nn.Layer, callable],
@@ -10,6 +10,10 @@ class BaseXDE(ABC, nn.Layer):
     Base class for all ODEs.
     """
 
+    # Whether `move` does not depend on `dt`, so that the derivative evaluated at the end of
+    # a step can be reused as the first stage of the next step (first same as last).
+    fsal: bool = False
+
     def __init__(
         self,
         name,
@@ -86,18 +90,16 @@ class BaseXDE(ABC, nn.Layer):
     def flatten(self, input):
         raise NotImplementedError
 
-    # def format(self, sol):
-    #     """_summary_
+    def format(self, sol):
+        """Format the solution returned by the solver.
 
-    #     Args:
-    #         sol (list): pred_len * [B, 1, D]
+        Args:
+            sol (paddle.Tensor): the solution buffer, see `SolutionBuffer`.
 
-    #     Returns:
-    #         _type_: _description_
-    #     """
-    #     # [pred_len, batch_size, D]
-    #     sol = paddle.concat(sol, axis=-2)
-    #     return sol
+        Returns:
+            paddle.Tensor: the formatted solution, returned as is by default.
+        """
+        return sol
 
     def on_integrate_step_end(self, y0=None, y1=None, t0=None, t1=None):
         pass
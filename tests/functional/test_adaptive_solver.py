@@ -1,16 +1,31 @@
+import functools
+import math
 import unittest
 
 import paddle
 
-from paddlexde.functional import odeint, odeint_adjoint
+from paddlexde.functional import odeint, odeint_adjoint, odeint_event
 from paddlexde.solver.adaptive_solver import (
+    SDIRK4,
+    TRBDF2,
+    AdaptiveAdamsBashforthMoulton,
     AdaptiveHeun,
+    AutoSwitch,
     Bosh3,
     Dopri5,
     Dopri8,
     Fehlberg2,
 )
-from tests.testing_utils import construct_problem
+from paddlexde.solver.base_adaptive_solver import AdaptiveSolver
+from paddlexde.solver.base_adaptive_solver_rk import _STEP_CACHES
+from paddlexde.solver.base_scipy_solver import ScipyWrapperODESolver
+from paddlexde.solver.newton_krylov import DenseLinearSolver
+from paddlexde.solver.solver_stats import SolverStats, record_stats
+from paddlexde.solver.step_controller import StepController
+from paddlexde.utils.misc import func_cache
+from paddlexde.utils.ode_utils import _rms_norm, interp_evaluate_many, optimal_step_size
+from paddlexde.xde import BaseODE
+from tests.testing_utils import SineXDE, VanDerPolXDE, construct_problem
 
 
 class TestAdaptiveSolversSineForODE(unittest.TestCase):
@@ -31,23 +46,40 @@ class TestAdaptiveSolversSineForODE(unittest.TestCase):
 
     def test_bosh3(self):
         y = odeint(self.f, self.y0, self.t, solver=Bosh3)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
     def test_dopri5(self):
         y = odeint(self.f, self.y0, self.t, solver=Dopri5)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
+
+    def test_dopri5_sync_every(self):
+        options = {"norm": _rms_norm, "sync_every": 4}
+        y = odeint(self.f, self.y0, self.t, solver=Dopri5, options=options)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
     def test_dopri8(self):
         y = odeint(self.f, self.y0, self.t, solver=Dopri8)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
     def test_fehlberg2(self):
         y = odeint(self.f, self.y0, self.t, solver=Fehlberg2)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
     def test_adaptive_heun(self):
         y = odeint(self.f, self.y0, self.t, solver=AdaptiveHeun)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
+
+    def test_adaptive_adams(self):
+        for pece in [True, False]:
+            options = {"norm": _rms_norm, "pece": pece}
+            y = odeint(
+                self.f,
+                self.y0,
+                self.t,
+                solver=AdaptiveAdamsBashforthMoulton,
+                options=options,
+            )
+            assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
 
 class TestAdaptiveSolversLinearForODE(unittest.TestCase):
@@ -68,23 +100,573 @@ class TestAdaptiveSolversLinearForODE(unittest.TestCase):
 
     def test_bosh3(self):
         y = odeint(self.f, self.y0, self.t, solver=Bosh3)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
     def test_dopri5(self):
         y = odeint(self.f, self.y0, self.t, solver=Dopri5)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
     def test_dopri8(self):
         y = odeint(self.f, self.y0, self.t, solver=Dopri8)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
     def test_fehlberg2(self):
         y = odeint(self.f, self.y0, self.t, solver=Fehlberg2)
-        assert paddle.allclose(self.sol, y, rtol=4e-3)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
 
     def test_adaptive_heun(self):
         y = odeint(self.f, self.y0, self.t, solver=AdaptiveHeun)
-        assert paddle.allclose(self.sol, y, rtol=1e-2)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=1e-2)
+
+    def test_adaptive_adams(self):
+        y = odeint(self.f, self.y0, self.t, solver=AdaptiveAdamsBashforthMoulton)
+        assert paddle.allclose(self.sol, y.transpose([1, 0, 2]), rtol=4e-3)
+
+
+class TestAdaptiveAdamsOrder(unittest.TestCase):
+    def test_nfe(self):
+        # y' = cos(t) * y, y(t) = exp(sin(t)), over a long horizon
+        t = paddle.linspace(0, 20, 11, dtype=paddle.float64)
+        y0 = paddle.ones([1, 1], dtype=paddle.float64)
+        xde = BaseODE(lambda t, y: paddle.cos(t) * y, y0=y0, t_span=t)
+        xde.nfe = 0
+
+        def move(t0, dt, y0):
+            xde.nfe += 1
+            return xde.call_func(t0, y0)
+
+        xde.move = move
+        s = AdaptiveAdamsBashforthMoulton(
+            xde=xde,
+            y0=y0,
+            rtol=1e-7,
+            atol=1e-7,
+            norm=_rms_norm,
+            dtype=paddle.float64,
+        )
+        y = s.integrate(t)
+        assert paddle.allclose(y.reshape([-1]), paddle.exp(paddle.sin(t)), atol=1e-4)
+        # the order is raised above the one of the starting steps
+        assert 1 < s.order
+        # at most 2 evaluations per attempted step
+        assert xde.nfe < 1000
+
+
+class TestAdaptiveSolversRejectedStep(unittest.TestCase):
+    def test_overflowing_first_step(self):
+        # the huge first step overflows the stages to inf and is rejected, the retries
+        # must not read the stages of the rejected attempts
+        y0 = paddle.ones([1, 1, 1], dtype=paddle.float64)
+        t = paddle.to_tensor([0.0, 0.5], dtype=paddle.float64)
+        options = {"norm": _rms_norm, "first_step": 1e10}
+        for grad_enabled in [False, True]:
+            for solver in [Bosh3, Dopri5, Dopri8]:
+                with paddle.set_grad_enabled(grad_enabled):
+                    y = odeint(
+                        lambda t, y: y**2, y0, t, solver=solver, options=options
+                    )
+                # y(t) = 1 / (1 - t)
+                assert abs(y[-1].item() - 2.0) < 1e-5
+
+
+class TestAdaptiveSolversPerSample(unittest.TestCase):
+    def setUp(self):
+        # y' = -r * y, with the decay rate r of every sample carried in the state
+        self.rates = paddle.to_tensor([0.1, 1.0, 10.0, 100.0], dtype=paddle.float64)
+        self.y0 = paddle.stack([paddle.ones_like(self.rates), self.rates], axis=-1)
+        self.t = paddle.linspace(0, 2, 6, dtype=paddle.float64)
+        self.nfe = 0
+
+    def func(self, t, y):
+        self.nfe += y.shape[0]
+        return paddle.concat([-y[:, 1:] * y[:, :1], paddle.zeros_like(y[:, 1:])], -1)
+
+    def integrate(self, per_sample):
+        options = {"norm": _rms_norm, "per_sample": per_sample}
+        xde = BaseODE(self.func, y0=self.y0, t_span=self.t)
+        s = Dopri5(
+            xde=xde, y0=self.y0, rtol=1e-6, atol=1e-8, dtype=paddle.float64, **options
+        )
+        return s, s.integrate(self.t)
+
+    def test_per_sample(self):
+        s, y = self.integrate(per_sample=True)
+        exact = paddle.exp(-self.rates.unsqueeze(0) * self.t.unsqueeze(-1))
+        assert paddle.allclose(y[:, :, 0], exact, atol=1e-5)
+
+        # the stiffer samples take more steps, without forcing them on the others
+        nfe = s.sample_stats["nfe"].tolist()
+        assert nfe == sorted(nfe) and nfe[0] < nfe[-1]
+        assert sum(nfe) == self.nfe
+
+        per_sample_nfe = self.nfe
+        self.nfe = 0
+        self.integrate(per_sample=False)
+        assert per_sample_nfe < self.nfe
+
+
+class TestAdaptiveSolversDenseOutput(unittest.TestCase):
+    def integrate(self, solver, per_point, save_at=None):
+        y0 = paddle.ones([2, 3])
+        t = paddle.linspace(0, 10, 500)
+        xde = BaseODE(lambda t, y: paddle.cos(t) * y, y0=y0, t_span=t)
+        s = solver(
+            xde=xde, y0=y0, rtol=1e-5, atol=1e-7, norm=_rms_norm, save_at=save_at
+        )
+        if per_point:
+            s._write_outputs = functools.partial(AdaptiveSolver._write_outputs, s)
+        return s.integrate(t)
+
+    def test_batched_dense_output(self):
+        save_at = [i % 3 != 1 for i in range(500)]
+        for solver in [Bosh3, Dopri5]:
+            for mask in [None, save_at]:
+                y = self.integrate(solver, per_point=False, save_at=mask)
+                y_ref = self.integrate(solver, per_point=True, save_at=mask)
+                assert y.shape == y_ref.shape
+                assert paddle.allclose(y, y_ref, atol=1e-5)
+
+    def test_dopri8_continuous_extension(self):
+        class Dopri8Midpoint(Dopri8):
+            dense = None
+
+        y0 = paddle.ones([2, 3], dtype="float64")
+        t = paddle.linspace(0, 10, 500, dtype="float64")
+        exact = paddle.exp(paddle.sin(t)).reshape([-1, 1, 1])
+        errors = []
+        for solver in [Dopri8, Dopri8Midpoint]:
+            xde = BaseODE(lambda t, y: paddle.cos(t) * y, y0=y0, t_span=t)
+            s = solver(xde=xde, y0=y0, rtol=1e-6, atol=1e-8, norm=_rms_norm)
+            errors.append((s.integrate(t) - exact).abs().max().item())
+        # the steps are the same, only the outputs between them differ
+        assert errors[0] < 0.1 * errors[1]
+
+    def test_dopri8_dense_order(self):
+        # local error of the continuous extension inside one step of size h
+        t0 = 0.3
+        y0 = paddle.full([1, 1], math.exp(math.sin(t0)), dtype="float64")
+        xde = BaseODE(lambda t, y: paddle.cos(t) * y, y0=y0, t_span=paddle.ones([2]))
+        s = Dopri8(xde=xde, y0=y0, rtol=1e-6, atol=1e-8, norm=_rms_norm)
+        s.move = xde.move
+        errors = []
+        for h in [0.2, 0.1, 0.05]:
+            t0_, dt, t1 = [
+                paddle.to_tensor(v, dtype="float64") for v in (t0, h, t0 + h)
+            ]
+            f0 = xde.move(t0_, dt, y0)
+            y1, f1, _, k = s._runge_kutta_step(y0, f0, t0_, dt, t1, s.compiled_tableau)
+            coeffs = s._interp_fit(y0, y1, f0, f1, k, dt)
+            t = t0 + h * paddle.linspace(0.05, 0.95, 19, dtype="float64")
+            y = interp_evaluate_many(coeffs, t0_, t1, t).reshape([-1])
+            errors.append((y - paddle.exp(paddle.sin(t))).abs().max().item())
+        # an extension of order 5, O(h ** 6) locally
+        for e0, e1 in zip(errors, errors[1:]):
+            assert abs(math.log2(e0 / e1) - 6) < 0.5
+
+
+class TestAdaptiveSolversController(unittest.TestCase):
+    def func(self, t, y):
+        # forced, lightly damped oscillator
+        self.nfe += 1
+        x, v = y[:, :1], y[:, 1:]
+        return paddle.concat([v, -(1 + 0.5 * paddle.sin(3 * t)) * x - 0.05 * v], -1)
+
+    def integrate(self, controller, **options):
+        self.nfe = 0
+        y0 = paddle.to_tensor([[2.0, 0.0]], dtype=paddle.float64)
+        t = paddle.linspace(0, 30, 31, dtype=paddle.float64)
+        xde = BaseODE(self.func, y0=y0, t_span=t)
+        s = Dopri5(
+            xde=xde,
+            y0=y0,
+            rtol=1e-6,
+            atol=1e-6,
+            norm=_rms_norm,
+            controller=controller,
+            dtype=paddle.float64,
+            **options
+        )
+        return s, s.integrate(t)
+
+    def test_integral_controller(self):
+        dt = paddle.to_tensor([0.1, 0.1, 0.1], dtype=paddle.float64)
+        error_ratio = paddle.to_tensor([0.0, 0.5, 4.0], dtype=paddle.float64)
+        controller = StepController(betas=(1.0,), safety=0.9, ifactor=10.0, dfactor=0.2)
+        dt_next = controller.propose(dt, error_ratio, error_ratio <= 1, order=5)
+        for i in range(3):
+            expected = optimal_step_size(
+                dt[i],
+                error_ratio[i],
+                0.9,
+                paddle.to_tensor(10.0, dtype=dt.dtype),
+                0.2,
+                5,
+            )
+            assert paddle.allclose(dt_next[i], expected)
+        assert controller.n_rejected.tolist() == [0, 0, 1]
+
+        # the step following a rejection does not grow
+        dt_next = controller.propose(dt, error_ratio, True, order=5)
+        assert paddle.allclose(
+            dt_next[:2],
+            paddle.to_tensor([1.0, 0.1 * 0.9 * 0.5**-0.2], dtype=dt.dtype),
+        )
+        assert dt_next.tolist()[2] <= 0.1
+
+    def test_pi_pid_controllers(self):
+        s, y_ref = self.integrate("I")
+        n_rejected = int(s.controller.n_rejected)
+        for controller in ["PI", "PID"]:
+            s, y = self.integrate(controller)
+            assert int(s.controller.n_rejected) < n_rejected
+            assert paddle.allclose(y, y_ref, atol=1e-4)
+
+    def test_controller_modes(self):
+        _, y_ref = self.integrate("PI")
+        for options in [{"sync_every": 4}, {"per_sample": True}]:
+            s, y = self.integrate("PI", **options)
+            assert paddle.allclose(y, y_ref, atol=1e-4)
+
+
+class TestAdaptiveSolversStats(unittest.TestCase):
+    def setUp(self):
+        self.nfe = 0
+
+    def func(self, t, y):
+        self.nfe += 1
+        return paddle.cos(t) * y
+
+    def test_stats(self):
+        y0 = paddle.ones([2, 1, 3])
+        t = paddle.linspace(0, 5, 20)
+        for solver, options in [
+            (Dopri5, {}),
+            (Dopri5, {"sync_every": 4}),
+            (Dopri5, {"per_sample": True}),
+            (AdaptiveAdamsBashforthMoulton, {}),
+        ]:
+            self.nfe = 0
+            options = {"norm": _rms_norm, **options}
+            y, stats = odeint(
+                self.func, y0, t, solver=solver, options=options, return_stats=True
+            )
+            assert stats.nfe == self.nfe
+            assert stats.n_steps == stats.n_accepted + stats.n_rejected
+            assert stats.n_accepted > 0
+            assert stats.times["total"] >= stats.times["func"] > 0
+
+    def test_hooks(self):
+        y0 = paddle.ones([2, 3])
+        t = paddle.linspace(0, 5, 20)
+        xde = BaseODE(self.func, y0=y0, t_span=t)
+        s = Dopri5(xde=xde, y0=y0, rtol=1e-5, atol=1e-7, norm=_rms_norm)
+        steps, removed = [], []
+        s.hooks.register("step", lambda t0, t1, *args: steps.append(args))
+        handle = s.hooks.register("step", lambda *args: removed.append(args))
+        handle.remove()
+        s.integrate(t)
+        assert len(steps) > 0 and all(attempted for _, attempted in steps)
+        assert len(removed) == 0
+        with self.assertRaises(ValueError):
+            s.hooks.register("unknown", print)
+
+
+class TestAdaptiveSolversWarmStart(unittest.TestCase):
+    def setUp(self):
+        self.func = SineXDE()
+        self.y0 = paddle.ones([2, 3])
+        self.t = paddle.linspace(1, 4, 10)
+
+    def solve(self, **options):
+        options = {"norm": _rms_norm, **options}
+        return odeint(
+            self.func,
+            self.y0,
+            self.t,
+            solver=Dopri5,
+            options=options,
+            return_stats=True,
+        )
+
+    def test_warm_start(self):
+        y_ref, cold = self.solve()
+        _, first = self.solve(warm_start=True)
+        cache = func_cache(_STEP_CACHES, self.func)
+        assert len(cache) == 1
+        y, warm = self.solve(warm_start=True)
+        # no select_initial_step, which evaluates the derivative once
+        assert warm.nfe < cold.nfe
+        assert paddle.allclose(y, y_ref, rtol=1e-4)
+
+        # a cached step size which is rejected is replaced
+        key = list(cache)[0]
+        cache[key] = 100.0
+        self.solve(warm_start=True)
+        assert cache[key] < 100.0
+
+    def test_warm_start_bound_method(self):
+        model = SineXDE()
+        options = {"norm": _rms_norm, "warm_start": True}
+        nfe = []
+        for _ in range(2):
+            _, stats = odeint(
+                model.forward,
+                self.y0,
+                self.t,
+                solver=Dopri5,
+                options=options,
+                return_stats=True,
+            )
+            nfe.append(stats.nfe)
+        # the step size is cached for the method of this instance
+        assert len(func_cache(_STEP_CACHES, model.forward)) == 1
+        assert nfe[1] < nfe[0]
+
+    def test_f0(self):
+        _, stats = self.solve()
+        f0 = self.func(self.t[0], self.y0)
+        _, stats_f0 = self.solve(f0=f0)
+        assert stats_f0.nfe == stats.nfe - 1
+
+
+class TestAdaptiveSolversTableau(unittest.TestCase):
+    def make(self, solver, dtype):
+        y0 = paddle.ones([2, 3], dtype=dtype)
+        xde = BaseODE(SineXDE(), y0=y0, t_span=paddle.linspace(0, 1, 2))
+        return solver(xde=xde, y0=y0, rtol=1e-5, atol=1e-7, norm=_rms_norm)
+
+    def test_compiled_once(self):
+        for solver in [Bosh3, Dopri5, Dopri8, Fehlberg2, AdaptiveHeun]:
+            n_stages = len(solver.tableau.alpha) + 1
+            tableau = self.make(solver, paddle.float32).compiled_tableau
+            assert self.make(solver, paddle.float32).compiled_tableau is tableau
+            n_dense = 0 if solver.dense is None else len(solver.dense)
+            assert tableau.weights.shape == [n_stages + 2 + n_dense, n_stages]
+            assert tableau.weights.dtype == paddle.float32
+            # the rows are padded with zeros after the stages they combine
+            for i, beta_i in enumerate(tableau.beta):
+                assert (beta_i[i + 1 :] == 0).all()
+
+            tableau64 = self.make(solver, paddle.float64).compiled_tableau
+            assert tableau64.weights.dtype == paddle.float64
+            assert paddle.allclose(
+                tableau64.c_sol, paddle.to_tensor(solver.tableau.c_sol, "float64")
+            )
+        assert self.make(Dopri5, paddle.float32).compiled_tableau.fsal_solution
+        assert not self.make(Fehlberg2, paddle.float32).compiled_tableau.fsal_solution
+
+
+class FallXDE(paddle.nn.Layer):
+    """Falling bodies, y = [height, velocity], the ground is hit at sqrt(2 * h0 / g)."""
+
+    def __init__(self):
+        super(FallXDE, self).__init__()
+        self.g = paddle.create_parameter(
+            shape=[1],
+            dtype=paddle.float32,
+            default_initializer=paddle.nn.initializer.Constant(9.81),
+        )
+
+    def forward(self, t, y):
+        return paddle.concat([y[:, 1:], -self.g * paddle.ones_like(y[:, 1:])], axis=1)
+
+
+class TestAdaptiveSolversEvent(unittest.TestCase):
+    def setUp(self):
+        self.func = FallXDE()
+        self.h0 = paddle.to_tensor([1.0, 4.0, 100.0])
+        self.t_span = paddle.to_tensor([0.0, 3.0])
+
+    def solve(self, xdeint, **kwargs):
+        y0 = paddle.stack([self.h0, paddle.zeros_like(self.h0)], axis=1)
+        return xdeint(
+            self.func,
+            y0,
+            self.t_span,
+            event_fn=lambda t, y: y[:, 0],
+            solver=Dopri5,
+            rtol=1e-6,
+            atol=1e-8,
+            **kwargs
+        )
+
+    def test_event_times(self):
+        with paddle.no_grad():
+            event_t, y_event = self.solve(odeint_event)
+        t_ground = paddle.sqrt(2 * self.h0 / 9.81)
+        # the last body does not reach the ground before the end of the integration
+        expected = paddle.concat([t_ground[:2], self.t_span[1:]])
+        assert paddle.allclose(event_t, expected, rtol=1e-5)
+        assert paddle.allclose(y_event[:2, 0], paddle.zeros([2]), atol=1e-5)
+        assert abs(y_event[2, 0].item() - (100.0 - 9.81 * 9 / 2)) < 1e-3
+
+    def test_event_gradients(self):
+        self.h0.stop_gradient = False
+        for xdeint in [odeint_event, odeint_adjoint]:
+            event_t, y_event = self.solve(xdeint)
+            (event_t[:2].sum() + y_event[:2, 1].sum()).backward()
+            g = 9.81
+            h0 = self.h0[:2]
+            # d t_ground / d h0 = 1 / sqrt(2 g h0), and the impact velocity -sqrt(2 g h0)
+            expected_h0 = 1 / paddle.sqrt(2 * g * h0) - paddle.sqrt(g / (2 * h0))
+            expected_g = (
+                -0.5 * paddle.sqrt(2 * h0) * g**-1.5 - paddle.sqrt(h0 / (2 * g))
+            ).sum(keepdim=True)
+            assert paddle.allclose(self.h0.grad[:2], expected_h0, rtol=1e-4)
+            assert paddle.allclose(self.func.g.grad, expected_g, rtol=1e-4)
+            self.h0.clear_grad()
+            self.func.g.clear_grad()
+
+
+class TestAdaptiveSolversStiff(unittest.TestCase):
+    def test_stiff_problems(self):
+        for ode in ["robertson", "vanderpol"]:
+            f, y0, t, sol = construct_problem(ode=ode)
+            for solver in [TRBDF2, SDIRK4]:
+                for linear_solver in ["dense", "krylov"]:
+                    options = {"norm": _rms_norm, "linear_solver": linear_solver}
+                    y, stats = odeint(
+                        f,
+                        y0,
+                        t,
+                        solver=solver,
+                        rtol=1e-5,
+                        atol=1e-8,
+                        options=options,
+                        return_stats=True,
+                    )
+                    assert paddle.allclose(
+                        sol, y.transpose([1, 0, 2]), rtol=1e-2, atol=1e-6
+                    )
+                    # Dopri5 takes thousands of steps
+                    assert stats.n_steps < 100
+
+    def test_jacobian_reuse(self):
+        f, y0, t, sol = construct_problem(ode="robertson")
+        linear_solver = DenseLinearSolver()
+        options = {"norm": _rms_norm, "linear_solver": linear_solver}
+        y, stats = odeint(
+            f,
+            y0,
+            t,
+            solver=TRBDF2,
+            rtol=1e-5,
+            atol=1e-8,
+            options=options,
+            return_stats=True,
+        )
+        assert linear_solver.n_updates < stats.n_accepted
+        assert linear_solver.n_factorizations < stats.n_steps
+
+    def test_gradients(self):
+        paddle.seed(1)
+        f, y0, t, sol = construct_problem(ode="linear")
+        grads = []
+        for solver, options in [
+            (Dopri5, {}),
+            (SDIRK4, {"linear_solver": "dense"}),
+            (SDIRK4, {"linear_solver": "krylov"}),
+        ]:
+            f.A.clear_gradient()
+            options = {"norm": _rms_norm, **options}
+            y = odeint(f, y0, t, solver=solver, rtol=1e-6, atol=1e-8, options=options)
+            y.sum().backward()
+            grads.append(f.A.grad.clone())
+        for grad in grads[1:]:
+            assert paddle.allclose(grad, grads[0], rtol=1e-3, atol=1e-3)
+
+
+class ProtheroRobinsonXDE(paddle.nn.Layer):
+    """y' = -lambda(t) * (y - cos(t)) - sin(t), solved by y = cos(t) from y = 1 at t = 0,
+    and stiff while lambda(t) is large, around t = 3."""
+
+    def forward(self, t, y):
+        stiffness = 1 + 1000 * paddle.exp(-((t - 3) ** 2))
+        return -stiffness * (y - paddle.cos(t)) - paddle.sin(t)
+
+
+class TestAdaptiveSolversAutoSwitch(unittest.TestCase):
+    def test_switching(self):
+        y0 = paddle.ones([2, 1])
+        t = paddle.linspace(0, 6, 20)
+        xde = BaseODE(ProtheroRobinsonXDE(), y0=y0, t_span=t)
+        nfe = {}
+        for solver in [Dopri5, AutoSwitch]:
+            s = solver(xde=xde, y0=y0, rtol=1e-5, atol=1e-7, norm=_rms_norm)
+            stats = SolverStats()
+            if solver is AutoSwitch:
+                with self.assertLogs(
+                    "paddlexde.solver.adaptive_solver.auto_switch", "INFO"
+                ), record_stats(s, stats):
+                    y = s.integrate(t)
+            else:
+                with record_stats(s, stats):
+                    y = s.integrate(t)
+            nfe[solver] = stats.nfe
+            expected = paddle.cos(t).reshape([-1, 1, 1]).expand_as(y)
+            assert paddle.allclose(y, expected, atol=1e-4)
+        # to the implicit solver in the stiff interval, then back
+        assert [stiff for _, stiff, _ in s.switches] == [True, False]
+        assert 1 < s.switches[0][0] < 3 < s.switches[1][0] < 6
+        assert nfe[AutoSwitch] < nfe[Dopri5]
+
+    def test_stiff_problem(self):
+        f, y0, t, sol = construct_problem(ode="robertson")
+        y = odeint(f, y0, t, solver=AutoSwitch, rtol=1e-5, atol=1e-8)
+        assert paddle.allclose(sol, y.transpose([1, 0, 2]), rtol=1e-2, atol=1e-6)
+
+
+class TestScipySolver(unittest.TestCase):
+    def test_methods(self):
+        for ode, methods in [
+            ("sine", ["LSODA", "RK45", "BDF", "Radau"]),
+            ("robertson", ["LSODA", "BDF", "Radau"]),
+        ]:
+            f, y0, t, sol = construct_problem(ode=ode)
+            for method in methods:
+                options = {"norm": _rms_norm, "solver": method}
+                y = odeint(
+                    f,
+                    y0,
+                    t,
+                    solver=ScipyWrapperODESolver,
+                    rtol=1e-7,
+                    atol=1e-9,
+                    options=options,
+                )
+                assert paddle.allclose(
+                    sol, y.transpose([1, 0, 2]), rtol=1e-4, atol=1e-6
+                )
+
+    def test_batch_options(self):
+        f = VanDerPolXDE(mu=10.0)
+        y0 = paddle.to_tensor([[[2.0, 0.0]], [[1.0, 0.0]], [[0.5, 0.5]]])
+        t = paddle.linspace(0, 5, 10)
+        ys, nfe = [], []
+        for options in [
+            {},
+            {"sparse_jac": True},
+            {"processes": 2},
+            {"jac": False},
+            {"jac": False, "vectorized": True},
+        ]:
+            options = {"norm": _rms_norm, "solver": "BDF", **options}
+            f.nfe = 0
+            y = odeint(
+                f,
+                y0,
+                t,
+                solver=ScipyWrapperODESolver,
+                rtol=1e-6,
+                atol=1e-8,
+                options=options,
+            )
+            ys.append(y)
+            nfe.append(f.nfe)
+        for y in ys[1:]:
+            assert paddle.allclose(y, ys[0], rtol=1e-3, atol=1e-4)
+        # the columns of the finite difference Jacobians are evaluated in one call
+        assert nfe[4] < nfe[3]
 
 
 if __name__ == "__main__":
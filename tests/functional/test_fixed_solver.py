@@ -1,9 +1,35 @@
+import math
 import unittest
 
+import numpy as np
 import paddle
+import scipy.integrate
+import scipy.linalg
 
-from paddlexde.functional import odeint, odeint_adjoint
-from paddlexde.solver.fixed_solver import RK4, AdamsBashforthMoulton, Euler, Midpoint
+from paddlexde.functional import (
+    init_shooting_states,
+    multiple_shooting,
+    odeint,
+    odeint_adjoint,
+    odeint_reversible,
+    parareal,
+)
+from paddlexde.solver.base_fixed_solver import _STATIC_CACHES
+from paddlexde.solver.fixed_solver import (
+    ETD1,
+    ETDRK4,
+    RK4,
+    RK38,
+    SSPRK3,
+    AdamsBashforthMoulton,
+    Euler,
+    Midpoint,
+    Ralston,
+    ReversibleHeun,
+)
+from paddlexde.utils.misc import func_cache
+from paddlexde.utils.ode_utils import _rms_norm
+from paddlexde.xde import BaseODE
 from tests.testing_utils import construct_problem
 
 
@@ -44,5 +70,719 @@ class TestFixedSolversConstantForODE(unittest.TestCase):
             assert paddle.allclose(self.sol, y, rtol=1e-2)
 
 
+class TestFixedSolversSolutionBuffer(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        f, y0, t, sol = construct_problem(
+            dtype=paddle.float32,
+            ode="constant",
+            reverse=False,
+        )
+        self.f = f
+        self.y0 = y0.unsqueeze(-2)  # [B, 1, D]
+        self.t = t  # [T]
+        self.sol = sol  # [B, T, D]
+
+    def test_batch_layout(self):
+        y = odeint(self.f, self.y0, self.t, solver=RK4)
+        assert y.shape == self.sol.shape
+        assert paddle.allclose(self.sol, y, rtol=1e-2)
+
+    def test_time_layout(self):
+        y = odeint(
+            self.f,
+            self.y0,
+            self.t,
+            solver=RK4,
+            options={"norm": _rms_norm, "layout": "time"},
+        )
+        assert y.shape == [len(self.t), *self.y0.shape]
+        assert paddle.allclose(self.sol, y.squeeze(-2).transpose([1, 0, 2]), rtol=1e-2)
+
+    def test_save_at(self):
+        save_at = [i % 3 == 0 for i in range(len(self.t))]
+        y = odeint(
+            self.f,
+            self.y0,
+            self.t,
+            solver=RK4,
+            options={"norm": _rms_norm, "save_at": save_at},
+        )
+        assert y.shape == [1, sum(save_at), 1]
+        assert paddle.allclose(self.sol[:, ::3], y, rtol=1e-2)
+
+    def test_backward(self):
+        y = odeint(self.f, self.y0, self.t, solver=RK4)
+        y.sum().backward()
+        assert self.f.a.grad is not None
+        assert self.f.b.grad is not None
+        self.f.clear_gradients()
+
+
+class TestFixedSolversSubStep(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        f, y0, t, sol = construct_problem(
+            dtype=paddle.float32,
+            ode="sine",
+            reverse=False,
+        )
+        self.f = f
+        self.y0 = y0.unsqueeze(-2)  # [B, 1, D]
+        self.t = t  # [T]
+        self.sol = sol  # [B, T, D]
+
+    def test_n_steps(self):
+        xde = BaseODE(self.f, y0=self.y0, t_span=self.t)
+        s = RK4(xde=xde, y0=self.y0, rtol=1e-7, atol=1e-9, norm=_rms_norm)
+        s.integrate(self.t)
+        assert s.n_steps == len(self.t) - 1
+
+        s = RK4(
+            xde=xde, y0=self.y0, rtol=1e-7, atol=1e-9, norm=_rms_norm, step_size=0.1
+        )
+        y = s.integrate(self.t)
+        assert s.n_steps == 70
+        assert y.shape == self.sol.shape
+
+    def test_step_size(self):
+        for interp in ["linear", "cubic"]:
+            options = {"norm": _rms_norm, "interp": interp}
+            y = odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+            err = (y - self.sol).abs().max()
+
+            options["step_size"] = 0.05
+            y = odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+            # bounded by the float32 rounding of the exact solution
+            assert (y - self.sol).abs().max() < err * 0.1
+
+    def test_cubic_nfe(self):
+        nfe = {}
+        for interp in ["linear", "cubic"]:
+            xde = BaseODE(self.f, y0=self.y0, t_span=self.t)
+            xde.nfe = 0
+
+            def move(t0, dt, y0):
+                xde.nfe += 1
+                return xde.call_func(t0, y0)
+
+            xde.move = move
+            options = {"norm": _rms_norm, "interp": interp, "step_size": 0.05}
+            s = RK4(xde=xde, y0=self.y0, rtol=1e-7, atol=1e-9, **options)
+            s.integrate(self.t)
+            nfe[interp] = xde.nfe
+        # the derivative used by the cubic interpolation is reused by the next step
+        assert nfe["cubic"] == nfe["linear"]
+
+
+class TestFixedSolversTableau(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        f, y0, t, sol = construct_problem(
+            dtype=paddle.float32,
+            ode="sine",
+            reverse=False,
+        )
+        self.f = f
+        self.y0 = y0.unsqueeze(-2)  # [B, 1, D]
+        self.t = t  # [T]
+
+    def test_convergence_order(self):
+        # y' = cos(t) * y, y(t) = exp(sin(t)), in float64 to resolve the error of RK4
+        y0 = paddle.ones([1, 1, 1], dtype=paddle.float64)
+        t = paddle.linspace(0, 2, 3, dtype=paddle.float64)
+        for solver in [Ralston, SSPRK3, RK38, RK4, ReversibleHeun]:
+            errs = []
+            for step_size in [0.1, 0.05]:
+                options = {"norm": _rms_norm, "step_size": step_size}
+                y = odeint(
+                    lambda t, y: paddle.cos(t) * y,
+                    y0,
+                    t,
+                    solver=solver,
+                    options=options,
+                )
+                errs.append(abs(y[0, -1, 0].item() - math.exp(math.sin(2.0))))
+            # halving the step size divides the error by about 2 ** order
+            assert errs[0] / errs[1] > 2 ** (solver.order - 0.5)
+
+    def test_nfe(self):
+        for solver, stages in [(Ralston, 2), (SSPRK3, 3), (RK38, 4)]:
+            xde = BaseODE(self.f, y0=self.y0, t_span=self.t)
+            xde.nfe = 0
+
+            def move(t0, dt, y0):
+                xde.nfe += 1
+                return xde.call_func(t0, y0)
+
+            xde.move = move
+            s = solver(xde=xde, y0=self.y0, rtol=1e-7, atol=1e-9, norm=_rms_norm)
+            s.integrate(self.t)
+            assert xde.nfe == s.n_steps * stages
+
+    def test_quadrature(self):
+        # one step of y' = t^4 is the Simpson rule for RK4 and the 3/8 rule for RK38
+        y0 = paddle.zeros([1, 1, 1], dtype=paddle.float64)
+        t = paddle.to_tensor([0.0, 1.0], dtype=paddle.float64)
+        for solver, expected in [(RK4, 5 / 24), (RK38, 11 / 54)]:
+            y = odeint(
+                lambda t, y: t**4 * paddle.ones_like(y),
+                y0,
+                t,
+                solver=solver,
+                options={"norm": _rms_norm},
+            )
+            assert abs(y[0, -1, 0].item() - expected) < 1e-12
+
+
+class TestFixedSolversAdams(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        f, y0, t, sol = construct_problem(
+            dtype=paddle.float32,
+            ode="constant",
+            reverse=False,
+        )
+        self.f = f
+        self.y0 = y0.unsqueeze(-2).detach()  # [B, 1, D]
+        self.t = t  # [T]
+        self.sol = sol  # [B, T, D]
+
+    def test_convergence(self):
+        # y' = cos(t) * y, y(t) = exp(sin(t))
+        y0 = paddle.ones([1, 1, 1], dtype=paddle.float64)
+        t = paddle.linspace(0, 2, 3, dtype=paddle.float64)
+        for implicit in [False, True]:
+            errs = []
+            for step_size in [0.1, 0.05]:
+                options = {
+                    "norm": _rms_norm,
+                    "step_size": step_size,
+                    "implicit": implicit,
+                    "max_order": 5,
+                }
+                y = odeint(
+                    lambda t, y: paddle.cos(t) * y,
+                    y0,
+                    t,
+                    solver=AdamsBashforthMoulton,
+                    options=options,
+                )
+                errs.append(abs(y[0, -1, 0].item() - math.exp(math.sin(2.0))))
+            assert errs[0] / errs[1] > 2**3
+
+    def test_history_capacity(self):
+        xde = BaseODE(self.f, y0=self.y0, t_span=self.t)
+        s = AdamsBashforthMoulton(
+            xde=xde, y0=self.y0, norm=_rms_norm, step_size=0.1, max_order=5
+        )
+        y = s.integrate(self.t)
+        assert paddle.allclose(self.sol, y, rtol=1e-2)
+        assert len(s.prev_f) == 4
+        assert s.prev_f.data.shape == [4, *self.y0.shape]
+
+    def test_checkpoint_every(self):
+        options = {"norm": _rms_norm, "step_size": 0.1, "implicit": True}
+        y = odeint(
+            self.f, self.y0, self.t, solver=AdamsBashforthMoulton, options=options
+        )
+        y.sum().backward()
+        grad = self.f.b.grad.clone()
+        self.f.clear_gradients()
+
+        options["checkpoint_every"] = 4
+        y_ckpt = odeint(
+            self.f, self.y0, self.t, solver=AdamsBashforthMoulton, options=options
+        )
+        y_ckpt.sum().backward()
+        assert paddle.allclose(y, y_ckpt)
+        assert paddle.allclose(grad, self.f.b.grad, rtol=1e-4)
+        self.f.clear_gradients()
+
+
+class TestFixedSolversCheckpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        f, y0, t, sol = construct_problem(
+            dtype=paddle.float32,
+            ode="constant",
+            reverse=False,
+        )
+        self.f = f
+        self.y0 = y0.unsqueeze(-2).detach()  # [B, 1, D]
+        self.t = t  # [T]
+        self.sol = sol  # [B, T, D]
+
+    def test_checkpoint_every(self):
+        for interp in ["linear", "cubic"]:
+            options = {"norm": _rms_norm, "interp": interp, "step_size": 0.1}
+            y = odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+            y.sum().backward()
+            grad = self.f.b.grad.clone()
+            self.f.clear_gradients()
+
+            for checkpoint_every in [3, "auto"]:
+                options["checkpoint_every"] = checkpoint_every
+                y_ckpt = odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+                y_ckpt.sum().backward()
+                assert paddle.allclose(y, y_ckpt)
+                assert paddle.allclose(grad, self.f.b.grad, rtol=1e-4)
+                self.f.clear_gradients()
+
+    def test_checkpoint_params(self):
+        class Net(paddle.nn.Layer):
+            def __init__(self):
+                super(Net, self).__init__()
+                self.linear = paddle.nn.Linear(3, 3)
+
+            def forward(self, t, y):
+                return paddle.tanh(self.linear(y))
+
+        net = Net()
+        y0 = paddle.rand([2, 1, 3])
+        t = paddle.linspace(0, 1, 5)
+        options = {"norm": _rms_norm, "step_size": 0.1}
+        for func, params in [
+            (net, None),
+            (net.forward, None),
+            (lambda t, y: net(t, y), net.parameters()),
+        ]:
+            grads = []
+            for checkpoint_every in [None, 2]:
+                y = odeint(
+                    func,
+                    y0,
+                    t,
+                    solver=RK4,
+                    options=dict(
+                        options,
+                        checkpoint_every=checkpoint_every,
+                        checkpoint_params=params,
+                    ),
+                )
+                y.sum().backward()
+                grads.append(net.linear.weight.grad.clone())
+                net.clear_gradients()
+            assert grads[0].abs().sum() > 0
+            assert paddle.allclose(grads[0], grads[1], rtol=1e-5)
+
+        # the parameters of a closure cannot be found
+        with self.assertRaises(ValueError):
+            odeint(
+                lambda t, y: net(t, y),
+                y0,
+                t,
+                solver=RK4,
+                options=dict(options, checkpoint_every=2),
+            )
+
+    def test_checkpoint_info(self):
+        xde = BaseODE(self.f, y0=self.y0, t_span=self.t)
+        s = RK4(
+            xde=xde,
+            y0=self.y0,
+            rtol=1e-7,
+            atol=1e-9,
+            norm=_rms_norm,
+            step_size=0.1,
+            checkpoint_every="auto",
+        )
+        s.integrate(self.t)
+        # 70 steps are split into segments of ceil(sqrt(70)) = 9 steps
+        assert s.checkpoint_info["checkpoint_every"] == 9
+        assert s.checkpoint_info["segments"] == 8
+
+    def test_checkpoint_hooks(self):
+        counts = []
+        for checkpoint_every in [None, 3]:
+            xde = BaseODE(self.f, y0=self.y0, t_span=self.t)
+            s = RK4(
+                xde=xde,
+                y0=self.y0,
+                rtol=1e-7,
+                atol=1e-9,
+                norm=_rms_norm,
+                step_size=0.1,
+                checkpoint_every=checkpoint_every,
+            )
+            nfe, steps = [], []
+            s.hooks.register("func", lambda t, y, dy, elapsed: nfe.append(t))
+            s.hooks.register("step", lambda t0, t1, *args: steps.append(t0))
+            s.integrate(self.t).sum().backward()
+            self.f.clear_gradients()
+            counts.append((len(nfe), len(steps)))
+        # the steps recomputed during backward are not reported again
+        assert counts[0] == counts[1] == (70 * 4, 70)
+
+
+class TestFixedSolversToStatic(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        f, y0, t, sol = construct_problem(
+            npts=5,
+            dtype=paddle.float32,
+            ode="constant",
+            reverse=False,
+        )
+        self.f = f
+        self.y0 = y0.unsqueeze(-2).detach()  # [B, 1, D]
+        self.t = t  # [T]
+        self.sol = sol  # [B, T, D]
+
+    def test_to_static(self):
+        options = {"norm": _rms_norm, "step_size": 0.5}
+        y = odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+        y.sum().backward()
+        grad = self.f.b.grad.clone()
+        self.f.clear_gradients()
+
+        options["to_static"] = True
+        for _ in range(2):
+            y_static = odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+            y_static.sum().backward()
+            assert paddle.allclose(y, y_static, rtol=1e-5)
+            assert paddle.allclose(grad, self.f.b.grad, rtol=1e-4)
+            self.f.clear_gradients()
+        # the second call reuses the program compiled by the first one
+        assert len(func_cache(_STATIC_CACHES, self.f)) == 1
+
+    def test_to_static_cache_key(self):
+        options = {"norm": _rms_norm, "step_size": 0.5}
+        for save_at in [None, [False, True, True, True, True]]:
+            options["save_at"] = save_at
+            y = odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+            y_static = odeint(
+                self.f,
+                self.y0,
+                self.t,
+                solver=RK4,
+                options=dict(options, to_static=True),
+            )
+            assert y_static.shape == y.shape
+            assert paddle.allclose(y, y_static, rtol=1e-5)
+
+    def test_to_static_bound_method(self):
+        class Model(paddle.nn.Layer):
+            def __init__(self):
+                super(Model, self).__init__()
+                self.net = paddle.nn.Linear(3, 3)
+
+            def rhs(self, t, y):
+                return paddle.tanh(self.net(y))
+
+        model = Model()
+        y0 = paddle.rand([2, 1, 3])
+        options = {"norm": _rms_norm, "step_size": 0.5}
+        y = odeint(model.rhs, y0, self.t, solver=RK4, options=options)
+        options["to_static"] = True
+        for _ in range(2):
+            y_static = odeint(model.rhs, y0, self.t, solver=RK4, options=options)
+            assert paddle.allclose(y, y_static, rtol=1e-5)
+        # the program is cached for the method of this instance
+        assert len(func_cache(_STATIC_CACHES, model.rhs)) == 1
+
+    def test_to_static_stats(self):
+        options = {"norm": _rms_norm, "step_size": 0.5}
+        _, stats = odeint(
+            self.f, self.y0, self.t, solver=RK4, options=options, return_stats=True
+        )
+        options["to_static"] = True
+        odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+        for _ in range(2):
+            # the hooks of every new solver fire, even if a program is cached
+            _, stats_static = odeint(
+                self.f, self.y0, self.t, solver=RK4, options=options, return_stats=True
+            )
+            assert stats_static.nfe == stats.nfe > 0
+            assert stats_static.n_steps == stats.n_steps > 0
+
+
+class TestFixedSolversStats(unittest.TestCase):
+    def test_stats(self):
+        nfe = []
+
+        def func(t, y):
+            nfe.append(t)
+            return paddle.cos(t) * y
+
+        y0 = paddle.ones([2, 1, 3])
+        t = paddle.linspace(0, 5, 11)
+        options = {"norm": _rms_norm, "step_size": 0.1}
+        for solver, n_stages in [(Euler, 1), (RK4, 4)]:
+            nfe.clear()
+            y, stats = odeint(
+                func, y0, t, solver=solver, options=options, return_stats=True
+            )
+            assert stats.n_steps == stats.n_accepted == 50
+            assert stats.n_rejected == 0
+            assert stats.nfe == len(nfe) == 50 * n_stages
+
+
+class RingDiffusion(paddle.nn.Layer):
+    """y' = A y + sin(y) + cos(t), A being a stiff diffusion on a ring of n nodes."""
+
+    def __init__(self, n=16, diffusivity=100.0):
+        super(RingDiffusion, self).__init__()
+        eye = paddle.eye(n, dtype=paddle.float64)
+        self.A = diffusivity * (
+            paddle.roll(eye, 1, axis=0) + paddle.roll(eye, -1, axis=0) - 2 * eye
+        )
+
+    def forward(self, t, y):
+        return (
+            paddle.matmul(y, self.A, transpose_y=True) + paddle.sin(y) + paddle.cos(t)
+        )
+
+    def y_exact(self, y0, t):
+        a = self.A.numpy()
+
+        def fun(t, y):
+            y = y.reshape(y0.shape)
+            return (y @ a.T + np.sin(y) + np.cos(t)).reshape(-1)
+
+        result = scipy.integrate.solve_ivp(
+            fun,
+            (t[0].item(), t[-1].item()),
+            y0.numpy().reshape(-1),
+            method="Radau",
+            t_eval=t.numpy(),
+            rtol=1e-12,
+            atol=1e-13,
+        )
+        # [B, T, D], the batch layout of the fixed solvers
+        return (
+            paddle.to_tensor(result.y.T)
+            .reshape([-1, *y0.shape])
+            .transpose([1, 0, 2, 3])
+            .reshape([y0.shape[0], -1, y0.shape[-1]])
+        )
+
+
+class TestFixedSolversExponential(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        self.f = RingDiffusion()
+        n = self.f.A.shape[0]
+        x = paddle.arange(n, dtype=paddle.float64) * 2 * math.pi / n
+        self.y0 = paddle.stack([paddle.sin(x), paddle.cos(x)]).unsqueeze(1)
+        self.t = paddle.linspace(0, 1, 5, dtype=paddle.float64)
+        self.sol = self.f.y_exact(self.y0, self.t)
+
+    def test_linear_exact(self):
+        # without the nonlinear part, a single step is exact
+        y = odeint(
+            lambda t, y: paddle.matmul(y, self.f.A, transpose_y=True),
+            self.y0,
+            self.t[::4],
+            solver=ETD1,
+            options={
+                "norm": _rms_norm,
+                "step_size": 1.0,
+                "linear_operator": self.f.A,
+            },
+        )
+        expected = paddle.matmul(
+            self.y0,
+            paddle.to_tensor(scipy.linalg.expm(self.f.A.numpy())),
+            transpose_y=True,
+        )
+        assert paddle.allclose(y[:, -1:], expected, rtol=1e-8, atol=1e-10)
+
+    def test_convergence_order(self):
+        for solver in [ETD1, ETDRK4]:
+            errs = []
+            for step_size in [0.125, 0.0625]:
+                options = {
+                    "norm": _rms_norm,
+                    "step_size": step_size,
+                    "linear_operator": self.f.A,
+                }
+                y = odeint(self.f, self.y0, self.t, solver=solver, options=options)
+                errs.append((y - self.sol).abs().max().item())
+            # halving the step size divides the error by about 2 ** order
+            assert errs[0] / errs[1] > 2 ** (solver.order - 0.5)
+        assert errs[-1] < 1e-5
+        # the step sizes are far beyond the stability region of RK4
+        y = odeint(self.f, self.y0, self.t, solver=RK4, options=options)
+        assert not (y - self.sol).abs().max().item() < 1
+
+    def test_krylov(self):
+        ys = []
+        for phi, linear_operator in [
+            ("expm", self.f.A),
+            ("krylov", lambda y: paddle.matmul(y, self.f.A, transpose_y=True)),
+        ]:
+            options = {
+                "norm": _rms_norm,
+                "step_size": 0.125,
+                "linear_operator": linear_operator,
+                "phi": phi,
+            }
+            ys.append(odeint(self.f, self.y0, self.t, solver=ETDRK4, options=options))
+        assert paddle.allclose(ys[0], ys[1], rtol=1e-8, atol=1e-10)
+
+
+class TestFixedSolversReversible(unittest.TestCase):
+    def setUp(self):
+        paddle.seed(0)
+        self.f = paddle.nn.Sequential(
+            paddle.nn.Linear(3, 16), paddle.nn.Tanh(), paddle.nn.Linear(16, 3)
+        )
+        self.func = lambda t, y: self.f(y) * paddle.cos(t)
+        self.y0 = paddle.rand([2, 1, 3])
+        self.t = paddle.linspace(0, 2, 7)
+
+    def test_reverse_step(self):
+        xde = BaseODE(self.func, y0=self.y0, t_span=self.t)
+        s = ReversibleHeun(xde=xde, y0=self.y0, rtol=1e-7, atol=1e-9, norm=_rms_norm)
+        grid = paddle.linspace(0, 2, 41)
+        y = self.y0
+        for i in range(1, len(grid)):
+            y, _ = s.step(grid[i - 1 : i], grid[i : i + 1], y)
+        for i in range(len(grid) - 1, 0, -1):
+            y = s.reverse_step(grid[i - 1 : i], grid[i : i + 1], y)
+        assert paddle.allclose(y, self.y0, atol=1e-5)
+
+    def test_gradients(self):
+        self.y0.stop_gradient = False
+        for interp in ["linear", "cubic"]:
+            options = {"norm": _rms_norm, "step_size": 0.05, "interp": interp}
+            results = []
+            for xdeint, kwargs in [
+                (odeint, {}),
+                (odeint_reversible, {"adjoint_params": self.f.parameters()}),
+            ]:
+                self.f.clear_gradients()
+                self.y0.clear_gradient()
+                y = xdeint(
+                    self.func,
+                    self.y0,
+                    self.t,
+                    solver=ReversibleHeun,
+                    options=options,
+                    **kwargs,
+                )
+                (y**2).sum().backward()
+                grads = [self.y0.grad] + [p.grad for p in self.f.parameters()]
+                results.append([y] + [g.clone() for g in grads])
+            # the same gradients as the backpropagation through the steps
+            for direct, reversible in zip(*results):
+                assert paddle.allclose(direct, reversible, rtol=1e-4, atol=1e-5)
+
+
+class TestFixedSolversParareal(unittest.TestCase):
+    def setUp(self):
+        paddle.seed(0)
+        self.f = paddle.nn.Sequential(
+            paddle.nn.Linear(4, 16), paddle.nn.Tanh(), paddle.nn.Linear(16, 4)
+        )
+        self.func = lambda t, y: self.f(y) - 0.5 * y
+        self.y0 = paddle.rand([2, 1, 4])
+        self.t = paddle.linspace(0, 8, 17)
+        self.fine_options = {"step_size": 0.02}
+        self.sol = odeint(
+            self.func,
+            self.y0,
+            self.t,
+            solver=RK4,
+            options={"norm": _rms_norm, "layout": "time", **self.fine_options},
+        )
+
+    def test_convergence(self):
+        ys = []
+        for processes in [None, 2]:
+            y, stats = parareal(
+                self.func,
+                self.y0,
+                self.t,
+                n_slices=8,
+                coarse_options={"step_size": 0.1},
+                fine_options=self.fine_options,
+                rtol=1e-5,
+                atol=1e-6,
+                processes=processes,
+                return_stats=True,
+            )
+            assert stats.converged
+            # fewer iterations than slices, i.e. than the serial solve
+            assert stats.iterations < 8
+            assert stats.serial_time > 0 and stats.ideal_speedup > 0
+            assert paddle.allclose(y, self.sol, rtol=1e-4, atol=1e-5)
+            ys.append(y)
+        assert paddle.allclose(ys[0], ys[1])
+
+    def test_exact_after_all_iterations(self):
+        # after as many iterations as slices, the result is the serial fine solve
+        y, stats = parareal(
+            self.func,
+            self.y0,
+            self.t,
+            n_slices=4,
+            coarse_options={"step_size": 0.5},
+            fine_options=self.fine_options,
+            rtol=0.0,
+            atol=0.0,
+            layout="batch",
+            return_stats=True,
+        )
+        assert stats.iterations == 4 and stats.converged
+        sol = self.sol.transpose([1, 0, 2, 3]).reshape(y.shape)
+        assert paddle.allclose(y, sol, rtol=1e-5, atol=1e-6)
+
+
+class TestFixedSolversMultipleShooting(unittest.TestCase):
+    def setUp(self):
+        paddle.seed(0)
+        self.f = paddle.nn.Sequential(
+            paddle.nn.Linear(3, 16), paddle.nn.Tanh(), paddle.nn.Linear(16, 3)
+        )
+        self.func = lambda t, y: self.f(y) * paddle.cos(t)
+        self.y0 = paddle.rand([2, 1, 3])
+        self.options = {"norm": _rms_norm, "step_size": 0.01, "layout": "time"}
+
+    def test_continuous(self):
+        # from the states of the serial solve, the segments continue each other
+        for t in [paddle.linspace(0, 4, 13), paddle.linspace(0, 2, 13) ** 2]:
+            sol = odeint(self.func, self.y0, t, solver=RK4, options=self.options)
+            states = init_shooting_states(
+                self.func, self.y0, t, 4, solver=RK4, options=self.options
+            )
+            assert states.shape == [3, 2, 1, 3] and not states.stop_gradient
+            y, defects = multiple_shooting(
+                self.func, self.y0, t, states, solver=RK4, options=self.options
+            )
+            assert defects.shape == [3, 2, 1, 3]
+            assert paddle.allclose(y, sol, rtol=1e-3, atol=1e-4)
+            assert paddle.allclose(defects, paddle.zeros_like(defects), atol=1e-4)
+
+    def test_training(self):
+        t = paddle.linspace(0, 4, 9)
+        states = init_shooting_states(
+            self.func, self.y0, t, 4, options={"step_size": 0.5}
+        )
+        options = {"norm": _rms_norm, "step_size": 0.1}
+        optimizer = paddle.optimizer.Adam(0.01, parameters=[states])
+        penalties = []
+        for _ in range(50):
+            _, defects = multiple_shooting(
+                self.func, self.y0, t, states, solver=RK4, options=options
+            )
+            penalty = (defects**2).mean()
+            penalty.backward()
+            optimizer.step()
+            optimizer.clear_grad()
+            penalties.append(penalty.item())
+        assert penalties[-1] < 0.1 * penalties[0]
+
+    def test_segments(self):
+        t = paddle.linspace(0, 4, 10)
+        with self.assertRaises(ValueError):
+            init_shooting_states(self.func, self.y0, t, 4)
+        with self.assertRaises(ValueError):
+            multiple_shooting(
+                self.func, self.y0, t, paddle.zeros([2, 2, 3]), solver=RK4
+            )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,7 @@ import math
 
 import numpy as np
 import paddle
+import scipy.integrate
 import scipy.linalg
 
 
@@ -70,18 +71,80 @@ class LinearXDE(paddle.nn.Layer):
         )
 
 
+def _reference_solution(fun, y0, t):
+    """Solution at the times `t` from t = 0 by scipy's Radau, for the stiff problems."""
+    t_numpy = t.detach().cpu().numpy().astype(np.float64)
+    result = scipy.integrate.solve_ivp(
+        fun,
+        (0.0, t_numpy.max()),
+        y0,
+        method="Radau",
+        t_eval=t_numpy,
+        rtol=1e-10,
+        atol=1e-12,
+    )
+    return paddle.to_tensor(result.y.T, dtype=paddle.float32)
+
+
+class RobertsonXDE(paddle.nn.Layer):
+    """Robertson's chemical kinetics, stiff with rate constants over 9 orders of
+    magnitude, from y = (1, 0, 0) at t = 0."""
+
+    def __init__(self, k1=0.04, k2=3e7, k3=1e4):
+        super(RobertsonXDE, self).__init__()
+        self.k1, self.k2, self.k3 = k1, k2, k3
+        self.nfe = 0
+
+    def forward(self, t, y, **kwargs):
+        self.nfe += 1
+        y1, y2, y3 = y[..., 0:1], y[..., 1:2], y[..., 2:3]
+        dy1 = -self.k1 * y1 + self.k3 * y2 * y3
+        dy3 = self.k2 * y2**2
+        return paddle.concat([dy1, -dy1 - dy3, dy3], axis=-1)
+
+    def y_exact(self, t):
+        def fun(_, y):
+            dy1 = -self.k1 * y[0] + self.k3 * y[1] * y[2]
+            dy3 = self.k2 * y[1] ** 2
+            return [dy1, -dy1 - dy3, dy3]
+
+        return _reference_solution(fun, [1.0, 0.0, 0.0], t)
+
+
+class VanDerPolXDE(paddle.nn.Layer):
+    """Van der Pol oscillator, stiff for a large `mu`, from y = (2, 0) at t = 0."""
+
+    def __init__(self, mu=1000.0):
+        super(VanDerPolXDE, self).__init__()
+        self.mu = mu
+        self.nfe = 0
+
+    def forward(self, t, y, **kwargs):
+        self.nfe += 1
+        y1, y2 = y[..., 0:1], y[..., 1:2]
+        return paddle.concat([y2, self.mu * (1 - y1**2) * y2 - y1], axis=-1)
+
+    def y_exact(self, t):
+        def fun(_, y):
+            return [y[1], self.mu * (1 - y[0] ** 2) * y[1] - y[0]]
+
+        return _reference_solution(fun, [2.0, 0.0], t)
+
+
 PROBLEMS = {"constant": ConstantXDE, "linear": LinearXDE, "sine": SineXDE}
+STIFF_PROBLEMS = {"robertson": RobertsonXDE, "vanderpol": VanDerPolXDE}
 DTYPES = (paddle.float32, paddle.float64, paddle.complex64)
 DEVICES = ["cpu"]
 FIXED_METHODS = ("euler", "midpoint", "rk4", "explicit_adams", "implicit_adams")
 ADAMS_METHODS = ("explicit_adams", "implicit_adams")
 ADAPTIVE_METHODS = ("adaptive_heun", "fehlberg2", "bosh3", "dopri5", "dopri8")
+IMPLICIT_METHODS = ("trbdf2", "sdirk4")
 SCIPY_METHODS = ("scipy_solver",)
-METHODS = FIXED_METHODS + ADAPTIVE_METHODS + SCIPY_METHODS
+METHODS = FIXED_METHODS + ADAPTIVE_METHODS + IMPLICIT_METHODS + SCIPY_METHODS
 
 
 def construct_problem(npts=10, ode="constant", reverse=False, dtype=paddle.float32):
-    f = PROBLEMS[ode]()
+    f = {**PROBLEMS, **STIFF_PROBLEMS}[ode]()
 
     t_points = paddle.linspace(1, 8, npts, dtype=paddle.float32)
     sol = f.y_exact(t_points).astype(dtype)